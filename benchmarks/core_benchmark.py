@@ -0,0 +1,138 @@
+"""Benchmark the simulation core on synthetic shops of increasing size.
+
+Each scale runs in a fresh process so its peak memory is measured on its own.
+Results are printed and optionally saved as JSON, to compare against a
+previous run's results:
+
+    python -m benchmarks.core_benchmark --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from shop_forecasting.event_calendars import CalendarQueue, HeapEventCalendar
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import CompletionLogger
+
+DEFAULT_SCALES = [1_000, 100_000, 1_000_000]
+OPERATIONS_PER_ROUTER = 10
+CALENDARS = {"heap": HeapEventCalendar, "calendar": CalendarQueue}
+ROW_FORMAT = (
+    "{operations:>12,} {build_seconds:>9.2f} {release_seconds:>9.2f} "
+    "{run_seconds:>9.2f} {events_per_second:>12,.0f} {peak_rss_mb:>10.1f}"
+)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def run_scale(operations: int, seed: int, calendar: str, compact: bool) -> dict:
+    """Build, release and run one synthetic shop, timing each phase."""
+    num_routers = max(operations // OPERATIONS_PER_ROUTER, 1)
+    start = time.perf_counter()
+    factory = generate_shop(
+        seed=seed,
+        num_work_centers=max(num_routers // 100, 5),
+        num_routers=num_routers,
+        operations_per_router=(OPERATIONS_PER_ROUTER, OPERATIONS_PER_ROUTER),
+        prioritizer_mix={"fifo": 1, "spt": 1, "edd": 1},
+        logger=CompletionLogger(),
+        event_queue=CALENDARS[calendar](),
+        compact=compact,
+    )
+    built = time.perf_counter()
+    factory.release()
+    released = time.perf_counter()
+    summary = factory.run()
+    finished = time.perf_counter()
+    return {
+        "operations": operations,
+        "build_seconds": built - start,
+        "release_seconds": released - built,
+        "run_seconds": finished - released,
+        "events": summary.events_processed,
+        "events_per_second": summary.events_per_second,
+        "simulated_hours": summary.elapsed_hours,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    before = {row["operations"]: row for row in baseline["results"]}
+    print("\nCompared to {} ({})".format(baseline_path, baseline["revision"]))
+    for row in results["results"]:
+        old = before.get(row["operations"])
+        if old is None:
+            continue
+        print(
+            "{:>12,} ops  events/s x{:.2f}  peak memory x{:.2f}".format(
+                row["operations"],
+                row["events_per_second"] / old["events_per_second"],
+                row["peak_rss_mb"] / old["peak_rss_mb"],
+            )
+        )
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--calendar", choices=sorted(CALENDARS), default="heap")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args(argv)
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "calendar": args.calendar,
+        "compact": args.compact,
+        "results": [],
+    }
+    print(
+        "{:>12} {:>9} {:>9} {:>9} {:>12} {:>10}".format(
+            "operations", "build s", "release s", "run s", "events/s", "peak MB"
+        )
+    )
+    for operations in args.scales:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            row = executor.submit(
+                run_scale, operations, args.seed, args.calendar, args.compact
+            ).result()
+        results["results"].append(row)
+        print(ROW_FORMAT.format(**row))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare the memory used by open operations in each planning object layout.
+
+Usage: python -m benchmarks.memory_benchmark [NUM_OPERATIONS]
+"""
+import gc
+import sys
+import tracemalloc
+
+from shop_forecasting.compact import (
+    OperationStore,
+    SlottedRouter,
+    SlottedRouterOperation,
+    SlottedWorkCenter,
+)
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+
+OPERATIONS_PER_ROUTER = 10
+NUM_WORK_CENTERS = 10
+
+
+def build(num_operations, router_type, operation_type, work_center_type, store):
+    factory = Factory()
+    work_centers = [
+        work_center_type(
+            name="wc{}".format(i), prioritizer=FifoPrioritizer(), factory=factory
+        )
+        for i in range(NUM_WORK_CENTERS)
+    ]
+    operation_store = OperationStore() if store else None
+    for order_number in range(num_operations // OPERATIONS_PER_ROUTER):
+        router = router_type(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        steps = {
+            10 * (i + 1): (work_centers[(order_number + i) % NUM_WORK_CENTERS], i + 0.5)
+            for i in range(OPERATIONS_PER_ROUTER)
+        }
+        if operation_store is not None:
+            operation_store.add_router(router, steps)
+        else:
+            router.operations = {
+                seq: operation_type(work_center, router, seq, hours)
+                for seq, (work_center, hours) in steps.items()
+            }
+    return factory, operation_store
+
+
+layouts = {
+    "dataclasses": (Router, RouterOperation, WorkCenter, False),
+    "slotted": (SlottedRouter, SlottedRouterOperation, SlottedWorkCenter, False),
+    "struct of arrays": (SlottedRouter, None, SlottedWorkCenter, True),
+}
+
+
+def measure(num_operations, layout):
+    gc.collect()
+    tracemalloc.start()
+    model = build(num_operations, *layout)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+    return used
+
+
+def main(num_operations):
+    print("{:,} operations".format(num_operations))
+    baseline = None
+    for name, layout in layouts.items():
+        used = measure(num_operations, layout)
+        baseline = baseline or used
+        print(
+            "{:<18}{:>10.1f} MB{:>8.0f} B/op{:>8.1%} of dataclasses".format(
+                name, used / 2 ** 20, used / num_operations, used / baseline
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
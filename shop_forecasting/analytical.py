@@ -0,0 +1,244 @@
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from math import inf, isinf, sqrt
+from typing import Any, Dict, List, Optional
+
+from shop_forecasting.compact import StoredOperations
+from shop_forecasting.planning_objects import Factory
+
+
+def waiting_hours(
+    utilization: float,
+    num_slots: float,
+    service_hours: float,
+    arrival_scv: float = 1.0,
+    service_scv: float = 1.0,
+) -> float:
+    """Approximate mean hours in queue at a station of ``num_slots`` servers.
+
+    Uses the Allen-Cunneen approximation for G/G/m queues, with Sakasegawa's
+    approximation of the M/M/m waiting time; both are exact for M/M/1.  The
+    squared coefficients of variation (SCV) describe the variability of the
+    times between arrivals and of service times.  Stations loaded at or beyond
+    capacity wait forever.
+    """
+    if isinf(num_slots) or utilization <= 0:
+        return 0.0
+    if utilization >= 1:
+        return inf
+    return (
+        (arrival_scv + service_scv)
+        / 2
+        * utilization ** (sqrt(2 * (num_slots + 1)) - 1)
+        / (num_slots * (1 - utilization))
+        * service_hours
+    )
+
+
+@dataclass
+class StationEstimate:
+    """Steady state estimates of one work center, taken as a multi-server station.
+
+    Service hours are clock hours per visit, stretched by the fraction of time
+    a shift calendar leaves the work center available.
+    """
+
+    name: str
+    num_slots: float
+    visits: int
+    arrival_rate: float
+    service_hours: float
+    service_scv: float
+    utilization: float
+    waiting_hours: float
+
+    @property
+    def flow_hours(self) -> float:
+        return self.waiting_hours + self.service_hours
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "work_center": self.name,
+            "num_slots": self.num_slots,
+            "visits": self.visits,
+            "arrival_rate": self.arrival_rate,
+            "service_hours": self.service_hours,
+            "service_scv": self.service_scv,
+            "utilization": self.utilization,
+            "waiting_hours": self.waiting_hours,
+            "flow_hours": self.flow_hours,
+        }
+
+
+@dataclass
+class AnalyticalForecast:
+    """The outcome of ``estimate``: station estimates and order lead times."""
+
+    horizon_hours: float
+    stations: Dict[str, StationEstimate]
+    lead_times: Dict[int, float]
+
+    def bottlenecks(self, threshold: float = 0.85) -> List[StationEstimate]:
+        """Stations loaded to at least ``threshold``, most utilized first."""
+        loaded = [
+            station
+            for station in self.stations.values()
+            if station.utilization >= threshold
+        ]
+        return sorted(loaded, key=lambda station: station.utilization, reverse=True)
+
+    def needs_simulation(self, threshold: float = 0.85) -> bool:
+        """Whether any station is loaded close enough to capacity that queueing
+        approximations become unreliable and the full simulation should run."""
+        return bool(self.bottlenecks(threshold))
+
+    def station_rows(self) -> List[Dict[str, Any]]:
+        return [station.as_dict() for station in self.stations.values()]
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _remaining_operations(factory: Factory, stations: Dict[str, int]):
+    """Station index, clock hours and router position of every operation not
+    yet reached, from each router's current operation on, as array columns."""
+    station_index = array("i")
+    hours = array("d")
+    router_position = array("i")
+    # station index of each of a store's work centers, by store
+    store_stations: Dict[int, List[int]] = {}
+    for position, router in enumerate(factory.routers):
+        operations = router.operations
+        current = router.current_sequence
+        if current == router._complete_sentinel:
+            continue
+        if isinstance(operations, StoredOperations):
+            store = operations._store
+            start, stop = operations._start, operations._stop
+            first = bisect_left(store.sequence_numbers, current, start, stop)
+            try:
+                mapping = store_stations[id(store)]
+            except KeyError:
+                mapping = store_stations[id(store)] = [
+                    stations[work_center.name] for work_center in store.work_centers
+                ]
+            station_index.extend(
+                mapping[i] for i in store.work_center_index[first:stop]
+            )
+            hours.extend(store.wall_clock_hours[first:stop])
+            router_position.extend([position] * (stop - first))
+            continue
+        for sequence_number in sorted(operations):
+            if sequence_number < current:
+                continue
+            operation = operations[sequence_number]
+            station_index.append(stations[operation.work_center.name])
+            hours.append(operation.wall_clock_hours)
+            router_position.append(position)
+    return station_index, hours, router_position
+
+
+def estimate(
+    factory: Factory,
+    horizon_hours: float,
+    arrival_scv: float = 1.0,
+    use_numpy: Optional[bool] = None,
+) -> AnalyticalForecast:
+    """Estimate utilization, queueing and lead times without simulating.
+
+    Every remaining operation of the model is taken to arrive at its work
+    center at an even rate over ``horizon_hours``, with times between arrivals
+    of squared coefficient of variation ``arrival_scv`` (1 for Poisson
+    arrivals).  Each work center is a station of ``num_slots`` servers whose
+    service times are the operations' clock hours, slowed down by the share
+    of time its shift calendar (ignoring downtime) leaves it working.  An
+    order's lead time is the sum of the waiting and service hours along the
+    rest of its router; orders visiting an overloaded station never finish.
+
+    Per-station totals and lead times are computed with NumPy when it is
+    installed, unless ``use_numpy`` is false.
+    """
+    if horizon_hours <= 0:
+        raise ValueError("horizon_hours must be positive, got {}".format(horizon_hours))
+    np = _numpy() if use_numpy is None or use_numpy else None
+    if use_numpy and np is None:
+        raise ImportError("use_numpy requires numpy")
+
+    work_centers = list(factory.work_centers.values())
+    stations = {work_center.name: i for i, work_center in enumerate(work_centers)}
+    station_index, hours, router_position = _remaining_operations(factory, stations)
+    availability = [
+        1.0
+        if work_center.shift_calendar is None
+        else work_center.shift_calendar.capacity_per_period
+        / work_center.shift_calendar.period
+        for work_center in work_centers
+    ]
+
+    size = len(work_centers)
+    if np is not None:
+        index = np.frombuffer(station_index, dtype=np.intc)
+        clock_hours = np.frombuffer(hours, dtype="f8")
+        visits = np.bincount(index, minlength=size).tolist()
+        totals = np.bincount(index, weights=clock_hours, minlength=size).tolist()
+        squares = np.bincount(
+            index, weights=clock_hours * clock_hours, minlength=size
+        ).tolist()
+    else:
+        visits = [0] * size
+        totals = [0.0] * size
+        squares = [0.0] * size
+        for i, operation_hours in zip(station_index, hours):
+            visits[i] += 1
+            totals[i] += operation_hours
+            squares[i] += operation_hours * operation_hours
+
+    estimates = {}
+    waits = []
+    for i, work_center in enumerate(work_centers):
+        count = visits[i]
+        mean = totals[i] / count if count else 0.0
+        scv = max(squares[i] / count / (mean * mean) - 1, 0.0) if mean else 0.0
+        arrival_rate = count / horizon_hours
+        service_hours = mean / availability[i]
+        num_slots = work_center.num_slots
+        utilization = (
+            0.0 if isinf(num_slots) else arrival_rate * service_hours / num_slots
+        )
+        wait = waiting_hours(utilization, num_slots, service_hours, arrival_scv, scv)
+        waits.append(wait)
+        estimates[work_center.name] = StationEstimate(
+            name=work_center.name,
+            num_slots=num_slots,
+            visits=count,
+            arrival_rate=arrival_rate,
+            service_hours=service_hours,
+            service_scv=scv,
+            utilization=utilization,
+            waiting_hours=wait,
+        )
+
+    routers = factory.routers
+    if np is not None:
+        flow = np.array(waits)[index] + clock_hours / np.array(availability)[index]
+        order_hours = np.bincount(
+            np.frombuffer(router_position, dtype=np.intc),
+            weights=flow,
+            minlength=len(routers),
+        ).tolist()
+    else:
+        order_hours = [0.0] * len(routers)
+        for i, operation_hours, position in zip(station_index, hours, router_position):
+            order_hours[position] += waits[i] + operation_hours / availability[i]
+    lead_times = {
+        router.order_number: order_hours[position]
+        for position, router in enumerate(routers)
+        if router.current_sequence != router._complete_sentinel
+    }
+    return AnalyticalForecast(horizon_hours, estimates, lead_times)
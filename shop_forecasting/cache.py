@@ -0,0 +1,250 @@
+import os
+import pickle
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Optional
+
+from shop_forecasting.compact import StoredOperations
+from shop_forecasting.planning_objects import Factory
+from shop_forecasting.util import CompletionLogger
+
+# bump whenever simulation results for the same model may change
+FINGERPRINT_VERSION = 2
+
+_missing = object()
+
+
+def _state(obj: Any) -> str:
+    """A stable description of an object's type and data attributes."""
+    if obj is None:
+        return "None"
+    attributes = sorted(
+        (name, repr(value))
+        for name, value in vars(obj).items()
+        if not callable(value)
+    )
+    return "{}.{}{}".format(type(obj).__module__, type(obj).__qualname__, attributes)
+
+
+def _function_name(function: Callable) -> str:
+    """A stable description of a function, whose repr changes from run to run.
+
+    Functions defined at module or class level are identified by name, others
+    (partials, attribute getters) by their pickle.  Raises ``ValueError`` for
+    lambdas and nested functions, which may share a name yet differ.
+    """
+    name = getattr(function, "__qualname__", None)
+    if name is not None and "<" not in name:
+        return "{}.{}".format(function.__module__, name)
+    try:
+        return pickle.dumps(function, protocol=4).hex()
+    except (pickle.PicklingError, AttributeError, TypeError):
+        raise ValueError(
+            "cannot fingerprint {!r}, use a module level function".format(function)
+        ) from None
+
+
+def fingerprint(factory: Factory, *params: Any) -> str:
+    """A stable hash of an unreleased shop model and any forecast parameters.
+
+    The hash covers the time base, batching of coincident completions, the
+    type of event queue and its tie key, the work centers (slots, time ratios,
+    shift calendars and the type and state of their prioritizers), the routers
+    and every operation, including due dates, plus the ``repr`` of each
+    parameter.  Operations kept in an ``OperationStore`` are hashed straight
+    from its arrays; others are packed into arrays first, so hashing a million
+    operations takes a fraction of a second.
+    """
+    if not factory.event_queue.empty() or any(
+        not work_center.queue.empty() for work_center in factory.work_centers.values()
+    ):
+        raise ValueError("only unreleased models can be fingerprinted")
+
+    digest = blake2b(digest_size=20)
+
+    def add(text: str) -> None:
+        digest.update(text.encode())
+        digest.update(b"\0")
+
+    add(str(FINGERPRINT_VERSION))
+    add(repr(factory.elapsed_hours))
+    add(repr(factory.time_base))
+    add(repr(factory.batch_coincident))
+    add(_state(factory.event_queue))
+    tie_key = getattr(factory.event_queue, "_tie_key", None)
+    add("None" if tie_key is None else _function_name(tie_key))
+    for param in params:
+        add(repr(param))
+    for name, work_center in factory.work_centers.items():
+        add(type(work_center).__qualname__)
+        add(name)
+        add(repr((work_center.num_slots, work_center.time_passage_ratio)))
+        add(_state(work_center.prioritizer))
+        calendar = work_center.shift_calendar
+        if calendar is not None:
+            add(
+                repr(
+                    (
+                        calendar.period,
+                        calendar.offset,
+                        calendar.shifts,
+                        calendar._down_starts,
+                        calendar._down_ends,
+                    )
+                )
+            )
+
+    routers = array("q")
+    stores: Dict[int, Any] = {}
+    hours = array("d")
+    sequence_numbers = array("q")
+    due_dates = array("d")
+    names = []
+    for router in factory.routers:
+        routers.extend((router.order_number, router.item_number))
+        routers.append(router.current_sequence)
+        operations = router.operations
+        if isinstance(operations, StoredOperations):
+            stores.setdefault(id(operations._store), operations._store)
+            routers.extend((-1, operations._start, operations._stop))
+            continue
+        routers.extend((len(operations), 0, 0))
+        for sequence_number, operation in operations.items():
+            sequence_numbers.append(sequence_number)
+            hours.append(operation.hours)
+            due_dates.append(getattr(operation, "due_date", float("nan")))
+            names.append(operation.work_center.name)
+    for column in (routers, sequence_numbers, hours, due_dates):
+        digest.update(column.tobytes())
+    add("\0".join(names))
+
+    for store in stores.values():
+        for column in (
+            store.hours,
+            store.sequence_numbers,
+            store.work_center_index,
+            store.router_index,
+            store.due_dates,
+        ):
+            digest.update(column.tobytes())
+        add("\0".join(work_center.name for work_center in store.work_centers))
+        routers = array("q", (router.order_number for router in store.routers))
+        digest.update(routers.tobytes())
+    return digest.hexdigest()
+
+
+def completion_forecast(factory: Factory) -> Dict[int, float]:
+    """Completion hours of each order, from running a fork of a model."""
+    fork = factory.fork(CompletionLogger())
+    fork.release()
+    fork.run()
+    return fork.logger.completions
+
+
+class ResultCache:
+    """Results stored by key in memory and, optionally, in a directory on disk.
+
+    The most recently used ``memo_size`` results are kept in memory and are
+    returned as the same objects each time.  Results on disk are pickled one
+    file per key, and the least recently used files (by modification time,
+    renewed on every hit) are deleted once the directory holds more than
+    ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = 256 * 2 ** 20,
+        memo_size: int = 64,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo: "OrderedDict[str, Any]" = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pickle")
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memo[key] = value
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = self._memo[key]
+        except KeyError:
+            value = self._load(key)
+            if value is _missing:
+                self.misses += 1
+                return default
+            self._remember(key, value)
+        else:
+            self._memo.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _load(self, key: str) -> Any:
+        if self.directory is None:
+            return _missing
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached_file:
+                value = pickle.load(cached_file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _missing
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        partial = "{}.{}.partial".format(path, os.getpid())
+        with open(partial, "wb") as cached_file:
+            pickle.dump(value, cached_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pickle"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def cached(
+        self,
+        factory: Factory,
+        compute: Callable[..., Any] = completion_forecast,
+        *params: Any
+    ) -> Any:
+        """The result of ``compute(factory, *params)``, computed only on a miss.
+
+        Results are keyed by the model's fingerprint, the name of ``compute``
+        and the parameters.
+        """
+        key = fingerprint(
+            factory, "{}.{}".format(compute.__module__, compute.__qualname__), *params
+        )
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = compute(factory, *params)
+            self.put(key, value)
+        return value
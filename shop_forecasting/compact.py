@@ -0,0 +1,235 @@
+from array import array
+from bisect import bisect_left
+from copy import copy
+from math import isnan
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.util import slotted
+
+# variants of the planning objects without a per-instance dictionary
+SlottedRouterOperation = slotted(RouterOperation, "SlottedRouterOperation")
+SlottedRouter = slotted(Router, "SlottedRouter")
+SlottedWorkCenter = slotted(WorkCenter, "SlottedWorkCenter")
+
+
+class OperationView:
+    """One operation of an ``OperationStore``, usable as a ``RouterOperation``.
+
+    Views are created on demand and hold nothing but their position in the
+    store, so two views of the same operation compare equal.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "OperationStore", index: int):
+        self._store = store
+        self._index = index
+
+    __repr__ = RouterOperation.__repr__
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OperationView):
+            return NotImplemented
+        return self._store is other._store and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._index))
+
+    @property
+    def work_center(self) -> WorkCenter:
+        store = self._store
+        return store.work_centers[store.work_center_index[self._index]]
+
+    @property
+    def router(self) -> Router:
+        store = self._store
+        return store.routers[store.router_index[self._index]]
+
+    @property
+    def sequence_number(self) -> int:
+        return self._store.sequence_numbers[self._index]
+
+    @property
+    def hours(self) -> float:
+        return self._store.hours[self._index]
+
+    @hours.setter
+    def hours(self, hours: float) -> None:
+        self._store.set_hours(self._index, hours)
+
+    @property
+    def wall_clock_hours(self) -> float:
+        return self._store.wall_clock_hours[self._index]
+
+    @property
+    def due_date(self) -> float:
+        store = self._store
+        due_date = store.due_dates[store.router_index[self._index]]
+        if isnan(due_date):
+            raise AttributeError("due_date")
+        return due_date
+
+    @due_date.setter
+    def due_date(self, due_date: float) -> None:
+        store = self._store
+        store.due_dates[store.router_index[self._index]] = due_date
+
+    def _fork(self, memo: Dict[int, Any]) -> "OperationView":
+        return OperationView(self._store._fork(memo), self._index)
+
+
+class StoredOperations(Mapping):
+    """A router's operations, stored contiguously in an ``OperationStore``."""
+
+    __slots__ = ("_store", "_start", "_stop")
+
+    def __init__(self, store: "OperationStore", start: int, stop: int):
+        self._store = store
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[int]:
+        sequence_numbers = self._store.sequence_numbers
+        return (sequence_numbers[i] for i in range(self._start, self._stop))
+
+    def __getitem__(self, sequence_number: int) -> OperationView:
+        sequence_numbers = self._store.sequence_numbers
+        i = bisect_left(sequence_numbers, sequence_number, self._start, self._stop)
+        if i == self._stop or sequence_numbers[i] != sequence_number:
+            raise KeyError(sequence_number)
+        return OperationView(self._store, i)
+
+    def _fork(self, memo: Dict[int, Any]) -> "StoredOperations":
+        return StoredOperations(self._store._fork(memo), self._start, self._stop)
+
+
+class OperationStore:
+    """Operation data for many routers, held column-wise in typed arrays.
+
+    A struct of arrays in place of one object per operation: each operation
+    costs 28 bytes for its hours and precomputed wall clock hours, its sequence
+    number, and indices into the store's tables of work centers and routers.
+    Operations of a router are stored contiguously and in sequence order, and
+    share the router's due date, if any.
+    """
+
+    def __init__(self):
+        self.hours = array("d")
+        self.wall_clock_hours = array("d")
+        self.sequence_numbers = array("i")
+        self.work_center_index = array("i")
+        self.router_index = array("i")
+        # by router, NaN for none
+        self.due_dates = array("d")
+        self.work_centers: List[WorkCenter] = []
+        self.routers: List[Router] = []
+        self._work_center_ids: Dict[WorkCenter, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def _work_center_id(self, work_center: WorkCenter) -> int:
+        try:
+            return self._work_center_ids[work_center]
+        except KeyError:
+            work_center_id = self._work_center_ids[work_center] = len(self.work_centers)
+            self.work_centers.append(work_center)
+            return work_center_id
+
+    def add_router(
+        self,
+        router: Router,
+        operations: Mapping[int, Tuple[WorkCenter, float]],
+        due_date: Optional[float] = None,
+    ) -> None:
+        """Store a router's operations, given as work center and hours by sequence.
+
+        ``operations`` maps each sequence number to a ``(work_center, hours)``
+        pair, all of them due at ``due_date``.  The router's operations are
+        replaced with views into the store.
+        """
+        router_id = len(self.routers)
+        self.routers.append(router)
+        self.due_dates.append(float("nan") if due_date is None else due_date)
+        start = len(self)
+        for sequence_number in sorted(operations):
+            work_center, hours = operations[sequence_number]
+            self.hours.append(hours)
+            self.wall_clock_hours.append(hours / work_center.time_passage_ratio)
+            self.sequence_numbers.append(sequence_number)
+            self.work_center_index.append(self._work_center_id(work_center))
+            self.router_index.append(router_id)
+        router.operations = StoredOperations(self, start, len(self))
+
+    def set_hours(self, index: int, hours: float) -> None:
+        self.hours[index] = hours
+        work_center = self.work_centers[self.work_center_index[index]]
+        self.wall_clock_hours[index] = hours / work_center.time_passage_ratio
+
+    def refresh(self) -> None:
+        """Recompute wall clock hours after a work center's time ratio changes."""
+        ratios = [work_center.time_passage_ratio for work_center in self.work_centers]
+        work_center_index = self.work_center_index
+        self.wall_clock_hours = array(
+            "d",
+            (
+                hours / ratios[work_center_index[i]]
+                for i, hours in enumerate(self.hours)
+            ),
+        )
+
+    def _fork(self, memo: Dict[int, Any]) -> "OperationStore":
+        """A store for forked routers, sharing the arrays never changed in place."""
+        try:
+            return memo[id(self)]
+        except KeyError:
+            fork = memo[id(self)] = copy(self)
+            fork.hours = copy(self.hours)
+            fork.wall_clock_hours = copy(self.wall_clock_hours)
+            fork.due_dates = copy(self.due_dates)
+            fork.work_centers = [memo[id(wc)] for wc in self.work_centers]
+            fork.routers = [memo[id(router)] for router in self.routers]
+            fork._work_center_ids = {
+                work_center: i for i, work_center in enumerate(fork.work_centers)
+            }
+            return fork
+
+    @classmethod
+    def compact(cls, factory: Factory) -> "OperationStore":
+        """Move the operations of every router registered with a factory to a store.
+
+        Must be called before the routers are released, as operations already
+        queued or in work keep referring to the original objects.  Raises
+        ``ValueError`` when the operations of a router have different due dates.
+        """
+        store = cls()
+        for router in factory.routers:
+            operations = router.operations
+            due_dates = {
+                getattr(operation, "due_date", None)
+                for operation in operations.values()
+            }
+            if len(due_dates) > 1:
+                raise ValueError(
+                    "operations of order {} have different due dates".format(
+                        router.order_number
+                    )
+                )
+            store.add_router(
+                router,
+                {
+                    sequence_number: (operation.work_center, operation.hours)
+                    for sequence_number, operation in operations.items()
+                },
+                due_dates.pop() if due_dates else None,
+            )
+        return store
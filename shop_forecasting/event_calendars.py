@@ -0,0 +1,499 @@
+from abc import ABC, abstractmethod
+from bisect import insort
+from copy import copy
+from heapq import heapify, heappop, heappush
+from math import inf
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from shop_forecasting.prioritizers import PrioritizedItem
+
+# (priority, insertion count, item) -- the count breaks ties between equal
+# priorities in first-in-first-out order, so items are never compared directly.
+# A HeapEventCalendar with a tie key stores (tie key, count) in place of the count.
+_Entry = Tuple[float, Any, PrioritizedItem]
+
+
+def _remap_entries(
+    entries: List[_Entry], transform: Callable[[Any], Any]
+) -> List[_Entry]:
+    return [
+        (priority, count, PrioritizedItem(priority, transform(item.item)))
+        for priority, count, item in entries
+    ]
+
+
+class EventCalendar(ABC):
+    """Interface definition for the pending-event sets used by the simulation.
+
+    Calendars mirror the subset of ``queue.PriorityQueue`` the simulation relies
+    upon (``put``, ``get`` and ``empty``) without any of its locking, since the
+    simulation runs on a single thread.  Items with equal priorities are always
+    returned in the order they were added.
+    """
+
+    @abstractmethod
+    def put(self, prioritized_item: PrioritizedItem) -> None:
+        pass
+
+    @abstractmethod
+    def get(self) -> PrioritizedItem:
+        """Remove and return the item with the lowest priority."""
+
+    @abstractmethod
+    def peek(self) -> PrioritizedItem:
+        """Return the item with the lowest priority without removing it."""
+
+    @abstractmethod
+    def remove(self, item: Any) -> PrioritizedItem:
+        """Remove the entry of an item from anywhere in the calendar.
+
+        Raises ``ValueError`` when the item is not in the calendar.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @abstractmethod
+    def items(self) -> Iterator[Any]:
+        """The items in the calendar, in no particular order."""
+
+    @abstractmethod
+    def remap(self, transform: Callable[[Any], Any]) -> "EventCalendar":
+        """A copy of this calendar with ``transform`` applied to every item.
+
+        Priorities and the order of ties are preserved.
+        """
+
+
+class HeapEventCalendar(EventCalendar):
+    """A binary heap of prioritized items, the default calendar.
+
+    With a ``tie_key``, equal priorities are returned in order of
+    ``tie_key(item)`` first and only then in the order they were added, making
+    the order of ties independent of the order of insertion.
+    """
+
+    def __init__(self, tie_key: Optional[Callable[[Any], Any]] = None):
+        self._heap: List[_Entry] = []
+        self._count = 0
+        self._tie_key = tie_key
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def put(self, prioritized_item: PrioritizedItem) -> None:
+        self._count += 1
+        if self._tie_key is None:
+            tie = self._count
+        else:
+            tie = (self._tie_key(prioritized_item.item), self._count)
+        heappush(self._heap, (prioritized_item.priority, tie, prioritized_item))
+
+    def get(self) -> PrioritizedItem:
+        return heappop(self._heap)[2]
+
+    def peek(self) -> PrioritizedItem:
+        return self._heap[0][2]
+
+    def remove(self, item: Any) -> PrioritizedItem:
+        """Remove an item, in O(n)."""
+        for i, entry in enumerate(self._heap):
+            if entry[2].item == item:
+                break
+        else:
+            raise ValueError("item not in calendar")
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            heapify(self._heap)
+        return entry[2]
+
+    def items(self) -> Iterator[Any]:
+        return (entry[2].item for entry in self._heap)
+
+    def remap(self, transform: Callable[[Any], Any]) -> "HeapEventCalendar":
+        remapped = copy(self)
+        # the heap invariant only concerns the unchanged (priority, count) keys
+        remapped._heap = _remap_entries(self._heap, transform)
+        return remapped
+
+
+class CalendarQueue(EventCalendar):
+    """A calendar queue (Brown, 1988) for very large pending-event sets.
+
+    Items are hashed by priority into a ring of "day" buckets, each spanning
+    ``bucket_width`` units of priority, so that adding and removing items takes
+    amortized constant time rather than the O(log n) of a heap.  The number of
+    buckets and their width are re-estimated as the calendar grows and shrinks.
+
+    Priorities must be numeric.  The calendar performs best when priorities are
+    removed in roughly the order they are added, as is the case for the
+    factory's event queue.
+    """
+
+    _min_buckets = 2
+
+    def __init__(self, num_buckets: int = 2, bucket_width: float = 1.0):
+        self._size = 0
+        self._count = 0
+        self._setup(max(num_buckets, self._min_buckets), bucket_width, 0.0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def _setup(self, num_buckets: int, bucket_width: float, start: float) -> None:
+        self._buckets: List[List[_Entry]] = [[] for _ in range(num_buckets)]
+        self._width = bucket_width
+        self._move_cursor(start)
+
+    def _move_cursor(self, priority: float) -> None:
+        """Point the next search at the bucket (day) containing a priority."""
+        day = int(priority // self._width)
+        self._last_priority = priority
+        self._last_bucket = day % len(self._buckets)
+        self._bucket_top = (day + 1) * self._width
+
+    def _resize(self, num_buckets: int) -> None:
+        entries = sorted(entry for bucket in self._buckets for entry in bucket)
+        width = self._estimate_width(entries) or self._width
+        self._setup(num_buckets, width, entries[0][0] if entries else 0.0)
+        for entry in entries:
+            self._buckets[int(entry[0] // width) % num_buckets].append(entry)
+
+    @staticmethod
+    def _estimate_width(entries: List[_Entry]) -> Optional[float]:
+        """Estimate a bucket width from the separation of the earliest items."""
+        sample = [entry[0] for entry in entries[:25]]
+        gaps = [b - a for a, b in zip(sample, sample[1:]) if b > a]
+        if not gaps:
+            return None
+        return 3.0 * sum(gaps) / len(gaps)
+
+    def put(self, prioritized_item: PrioritizedItem) -> None:
+        priority = prioritized_item.priority
+        num_buckets = len(self._buckets)
+        self._count += 1
+        insort(
+            self._buckets[int(priority // self._width) % num_buckets],
+            (priority, self._count, prioritized_item),
+        )
+        self._size += 1
+        if priority < self._last_priority:
+            # an item earlier than the cursor, searching must restart from it
+            self._move_cursor(priority)
+        if self._size > 2 * num_buckets:
+            self._resize(2 * num_buckets)
+
+    def _find(self) -> int:
+        """Index of the bucket holding the lowest priority item."""
+        if not self._size:
+            raise IndexError("get from an empty calendar queue")
+        buckets = self._buckets
+        num_buckets = len(buckets)
+        i = self._last_bucket
+        top = self._bucket_top
+        for _ in range(num_buckets):
+            bucket = buckets[i]
+            if bucket and bucket[0][0] < top:
+                self._last_bucket = i
+                self._bucket_top = top
+                return i
+            i = (i + 1) % num_buckets
+            top += self._width
+
+        # nothing within a full year of the cursor, fall back to a direct search
+        i = min(
+            (i for i, bucket in enumerate(buckets) if bucket),
+            key=lambda i: buckets[i][0],
+        )
+        self._move_cursor(buckets[i][0][0])
+        return i
+
+    def get(self) -> PrioritizedItem:
+        priority, _, prioritized_item = self._buckets[self._find()].pop(0)
+        self._last_priority = priority
+        self._size -= 1
+        num_buckets = len(self._buckets)
+        if num_buckets > self._min_buckets and self._size < num_buckets // 2:
+            self._resize(num_buckets // 2)
+        return prioritized_item
+
+    def peek(self) -> PrioritizedItem:
+        return self._buckets[self._find()][0][2]
+
+    def remove(self, item: Any) -> PrioritizedItem:
+        """Remove an item, in O(n)."""
+        for bucket in self._buckets:
+            for i, entry in enumerate(bucket):
+                if entry[2].item == item:
+                    del bucket[i]
+                    self._size -= 1
+                    return entry[2]
+        raise ValueError("item not in calendar")
+
+    def items(self) -> Iterator[Any]:
+        return (entry[2].item for bucket in self._buckets for entry in bucket)
+
+    def remap(self, transform: Callable[[Any], Any]) -> "CalendarQueue":
+        remapped = copy(self)
+        remapped._buckets = [
+            _remap_entries(bucket, transform) for bucket in self._buckets
+        ]
+        return remapped
+
+
+class _Handle:
+    """An item's entry in an ``AddressableHeap``, aware of its own position."""
+
+    __slots__ = ("priority", "count", "prioritized_item", "position", "stamp")
+
+    def __init__(self, priority, count: int, prioritized_item: PrioritizedItem):
+        self.priority = priority
+        self.count = count
+        self.prioritized_item = prioritized_item
+        self.position = 0
+        # the time its priority was last evaluated, see AddressableHeap.revalidate
+        self.stamp: Optional[float] = None
+
+
+class AddressableHeap(EventCalendar):
+    """A binary heap whose items can be reprioritized or removed in O(log n).
+
+    Every item is tracked by a handle recording its position in the heap, found
+    by the item itself, so items must be hashable and unique within the heap
+    (as operations queued at a work center are).  Reprioritized items keep
+    their place among equal priorities.
+
+    Priorities that change as time passes are brought up to date with
+    ``revalidate``.
+    """
+
+    def __init__(self):
+        self._heap: List[_Handle] = []
+        self._handles: Dict[Hashable, _Handle] = {}
+        self._count = 0
+        # how fast priorities may fall since the stamp of the last full
+        # re-evaluation, see revalidate
+        self.fall_rate = 0.0
+        self._settled: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._handles
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def _place(self, handle: _Handle, position: int) -> None:
+        self._heap[position] = handle
+        handle.position = position
+
+    def _sift_up(self, handle: _Handle) -> None:
+        heap = self._heap
+        position = handle.position
+        priority, count = handle.priority, handle.count
+        while position:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if parent.priority < priority or (
+                parent.priority == priority and parent.count < count
+            ):
+                break
+            self._place(parent, position)
+            position = parent_position
+        self._place(handle, position)
+
+    def _sift_down(self, handle: _Handle) -> None:
+        heap = self._heap
+        size = len(heap)
+        position = handle.position
+        priority, count = handle.priority, handle.count
+        while True:
+            child_position = 2 * position + 1
+            if child_position >= size:
+                break
+            child = heap[child_position]
+            if child_position + 1 < size:
+                right = heap[child_position + 1]
+                if right.priority < child.priority or (
+                    right.priority == child.priority and right.count < child.count
+                ):
+                    child_position += 1
+                    child = right
+            if priority < child.priority or (
+                priority == child.priority and count < child.count
+            ):
+                break
+            self._place(child, position)
+            position = child_position
+        self._place(handle, position)
+
+    def put(self, prioritized_item: PrioritizedItem) -> _Handle:
+        self._count += 1
+        handle = _Handle(prioritized_item.priority, self._count, prioritized_item)
+        self._handles[prioritized_item.item] = handle
+        handle.position = len(self._heap)
+        self._heap.append(handle)
+        self._sift_up(handle)
+        return handle
+
+    def _detach(self, handle: _Handle) -> PrioritizedItem:
+        del self._handles[handle.prioritized_item.item]
+        last = self._heap.pop()
+        if last is not handle:
+            self._place(last, handle.position)
+            self._sift_up(last)
+            self._sift_down(last)
+        return handle.prioritized_item
+
+    def get(self) -> PrioritizedItem:
+        return self._detach(self._heap[0])
+
+    def peek(self) -> PrioritizedItem:
+        return self._heap[0].prioritized_item
+
+    def remove(self, item: Hashable) -> PrioritizedItem:
+        try:
+            handle = self._handles[item]
+        except KeyError:
+            raise ValueError("item not in calendar") from None
+        return self._detach(handle)
+
+    def _reprioritize(self, handle: _Handle, priority) -> None:
+        raised = priority > handle.priority
+        handle.priority = handle.prioritized_item.priority = priority
+        if raised:
+            self._sift_down(handle)
+        else:
+            self._sift_up(handle)
+
+    def update(self, item: Hashable, priority) -> None:
+        """Change the priority of an item already in the heap."""
+        try:
+            handle = self._handles[item]
+        except KeyError:
+            raise ValueError("item not in calendar") from None
+        self._reprioritize(handle, priority)
+
+    def revalidate(
+        self,
+        priority_of: Callable[[Any], Any],
+        stamp: float,
+        fall_rate_of: Optional[Callable[[Any], float]] = None,
+    ) -> None:
+        """Bring the front of the heap up to date at time ``stamp``.
+
+        Priorities evaluated at earlier stamps may have gone stale.  Given
+        ``fall_rate_of``, bounding how fast the priority of an item can fall
+        per unit of time, items are re-evaluated from the front of the heap
+        only while their stale priorities could have fallen as low as the best
+        up-to-date priority found, after which the front item is exact.  Items
+        added since the last full re-evaluation must be covered by
+        ``fall_rate``, which callers raise as they add them.
+
+        Without ``fall_rate_of``, or once the search would visit more than an
+        eighth of the heap, every item is re-evaluated and the heap rebuilt in
+        O(n), which also tightens the bound.  Either way an item is evaluated
+        at most once per stamp.
+        """
+        if not self._heap:
+            return
+        if fall_rate_of is not None and self._settled is not None:
+            drift = stamp - self._settled
+            slack = self.fall_rate * drift if drift else 0.0
+            if slack < inf and self._search(priority_of, stamp, slack):
+                return
+        self._rebuild(priority_of, stamp, fall_rate_of)
+
+    def _search(
+        self, priority_of: Callable[[Any], Any], stamp: float, slack: float
+    ) -> bool:
+        """Re-evaluate the items that may be the front of the heap, from the
+        front down, giving up once too many could be."""
+        heap = self._heap
+        size = len(heap)
+        limit = max(16, size >> 3)
+        best = None
+        changed = []
+        visited = 0
+        stack = [0]
+        while stack:
+            position = stack.pop()
+            handle = heap[position]
+            # stale priorities have fallen by at most slack, and those below
+            # this one in the heap were no lower
+            if best is not None and handle.priority - slack > best[0]:
+                continue
+            visited += 1
+            if visited > limit:
+                for handle, priority in changed:
+                    handle.priority = handle.prioritized_item.priority = priority
+                return False
+            priority = handle.priority
+            if handle.stamp != stamp:
+                handle.stamp = stamp
+                priority = priority_of(handle.prioritized_item.item)
+                if priority != handle.priority:
+                    changed.append((handle, priority))
+            if best is None or (priority, handle.count) < best:
+                best = (priority, handle.count)
+            child_position = 2 * position + 1
+            if child_position < size:
+                stack.append(child_position)
+                if child_position + 1 < size:
+                    stack.append(child_position + 1)
+        # one at a time, so the rest of the heap is in order for each
+        for handle, priority in changed:
+            self._reprioritize(handle, priority)
+        return True
+
+    def _rebuild(
+        self,
+        priority_of: Callable[[Any], Any],
+        stamp: float,
+        fall_rate_of: Optional[Callable[[Any], float]],
+    ) -> None:
+        heap = self._heap
+        for handle in heap:
+            if handle.stamp != stamp:
+                handle.stamp = stamp
+                handle.priority = handle.prioritized_item.priority = priority_of(
+                    handle.prioritized_item.item
+                )
+        for position in reversed(range(len(heap) // 2)):
+            self._sift_down(heap[position])
+        if fall_rate_of is not None:
+            self._settled = stamp
+            self.fall_rate = max(
+                fall_rate_of(handle.prioritized_item.item) for handle in heap
+            )
+
+    def items(self) -> Iterator[Any]:
+        return iter(self._handles)
+
+    def remap(self, transform: Callable[[Any], Any]) -> "AddressableHeap":
+        remapped = copy(self)
+        remapped._heap = []
+        remapped._handles = {}
+        for handle in self._heap:
+            item = transform(handle.prioritized_item.item)
+            fork = _Handle(
+                handle.priority, handle.count, PrioritizedItem(handle.priority, item)
+            )
+            fork.position = handle.position
+            fork.stamp = handle.stamp
+            remapped._heap.append(fork)
+            remapped._handles[item] = fork
+        return remapped
@@ -0,0 +1,139 @@
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Any, Callable, DefaultDict, List, Optional, Tuple
+
+# hooks whose calls are counted and timed
+HOOKS = ("prioritize", "enqueue", "dequeue", "schedule", "complete", "log")
+
+_missing = object()
+
+
+class Profiler:
+    """Counters and timers installed on a factory's hot path.
+
+    Installing a profiler wraps the methods it measures with instance attributes
+    on the objects involved: each work center's prioritizer and queue, the
+    factory's event queue and logger.  Uninstalling removes the wrappers again,
+    so an uninstrumented factory runs exactly the code it would without
+    profiling, with no checks on every event.
+
+    The hooks measure prioritizing an operation, adding it to (``enqueue``) and
+    removing it from (``dequeue``) a work center's queue, adding an event to
+    (``schedule``) and removing it from (``complete``) the factory's event
+    queue, and logging.  Events are counted by type as the factory dispatches
+    them, whatever its logger.  Queue depths are tracked as high-water marks.
+    """
+
+    def __init__(self):
+        self.event_counts: Counter = Counter()
+        self.hook_calls: Counter = Counter()
+        self.hook_seconds: DefaultDict[str, float] = defaultdict(float)
+        self.queue_high_water: Counter = Counter()
+        self.event_queue_high_water = 0
+        self._installed: List[Tuple[Any, str, Any]] = []
+
+    def _timed(self, hook: str, function: Callable) -> Callable:
+        hook_calls = self.hook_calls
+        hook_seconds = self.hook_seconds
+
+        def timed(*args):
+            start = perf_counter()
+            result = function(*args)
+            hook_seconds[hook] += perf_counter() - start
+            hook_calls[hook] += 1
+            return result
+
+        return timed
+
+    def _wrap(self, target: Any, name: str, wrapper: Callable) -> None:
+        self._installed.append((target, name, target.__dict__.get(name, _missing)))
+        setattr(target, name, wrapper)
+
+    def _queue_put(self, hook: str, queue: Any, record: Callable[[int], None]):
+        put = self._timed(hook, queue.put)
+
+        def put_and_measure(prioritized_item):
+            put(prioritized_item)
+            record(len(queue))
+
+        return put_and_measure
+
+    def count_event(self, timestamp, event, planning_object) -> None:
+        """Event handler counting events by type, subscribed while installed."""
+        self.event_counts[event] += 1
+
+    @property
+    def installed(self) -> bool:
+        return bool(self._installed)
+
+    def install(self, factory: Any) -> None:
+        prioritizers = set()
+        for work_center in factory.work_centers.values():
+            if (
+                work_center.prioritizer is not None
+                and id(work_center.prioritizer) not in prioritizers
+            ):
+                prioritizers.add(id(work_center.prioritizer))
+                prioritizer = work_center.prioritizer
+                self._wrap(
+                    prioritizer,
+                    "prioritize",
+                    self._timed("prioritize", prioritizer.prioritize),
+                )
+
+            def record(depth: int, name: str = work_center.name) -> None:
+                if depth > self.queue_high_water[name]:
+                    self.queue_high_water[name] = depth
+
+            queue = work_center.queue
+            self._wrap(queue, "put", self._queue_put("enqueue", queue, record))
+            self._wrap(queue, "get", self._timed("dequeue", queue.get))
+
+        def record_event_queue(depth: int) -> None:
+            if depth > self.event_queue_high_water:
+                self.event_queue_high_water = depth
+
+        event_queue = factory.event_queue
+        self._wrap(
+            event_queue,
+            "put",
+            self._queue_put("schedule", event_queue, record_event_queue),
+        )
+        self._wrap(event_queue, "get", self._timed("complete", event_queue.get))
+
+        if factory.logger is not None:
+            self._wrap(
+                factory.logger,
+                "log_event",
+                self._timed("log", factory.logger.log_event),
+            )
+
+    def uninstall(self) -> None:
+        while self._installed:
+            target, name, previous = self._installed.pop()
+            if previous is _missing:
+                delattr(target, name)
+            else:
+                setattr(target, name, previous)
+
+    def report(self, top: Optional[int] = 10) -> str:
+        """A plain text summary of the counters and timers."""
+        lines = ["Events"]
+        for event, event_count in sorted(self.event_counts.items()):
+            lines.append("  {:<22}{:>12,}".format(event, event_count))
+        lines.append("Hooks{:>29}{:>12}{:>12}".format("calls", "total s", "mean us"))
+        for hook in HOOKS:
+            calls = self.hook_calls[hook]
+            seconds = self.hook_seconds[hook]
+            lines.append(
+                "  {:<22}{:>12,}{:>12.3f}{:>12.2f}".format(
+                    hook, calls, seconds, 1e6 * seconds / calls if calls else 0.0
+                )
+            )
+        lines.append("Queue high-water marks")
+        lines.append(
+            "  {:<22}{:>12,}".format("(event queue)", self.event_queue_high_water)
+        )
+        for name, depth in self.queue_high_water.most_common(top):
+            lines.append("  {:<22}{:>12,}".format(name, depth))
+        return "\n".join(lines)
@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, Optional, Set
+
+from shop_forecasting.stats import RunningStats
+from shop_forecasting.util import EventLogger
+
+
+class WorkCenterKpis:
+    """Streaming statistics of one work center.
+
+    Queue length and busy slots are integrated over time as events arrive, so
+    their time-weighted averages need no history.  Queue and flow times (from
+    queuing to starting and to completing an operation) are running statistics.
+    """
+
+    def __init__(self, name: str, num_slots: int, start_hours: float = 0.0):
+        self.name = name
+        self.num_slots = num_slots
+        self.queue_length = 0
+        self.busy_slots = 0
+        self.completed = 0
+        self.queue_hours = RunningStats()
+        self.flow_hours = RunningStats()
+        self.start_hours = start_hours
+        self.last_update = start_hours
+        self._queue_area = 0.0
+        self._busy_area = 0.0
+
+    def __repr__(self) -> str:
+        return "WorkCenterKpis (Name [{}], Utilization [{:.3f}])".format(
+            self.name, self.utilization()
+        )
+
+    def _advance(self, timestamp: float) -> None:
+        elapsed = timestamp - self.last_update
+        if elapsed:
+            self._queue_area += self.queue_length * elapsed
+            self._busy_area += self.busy_slots * elapsed
+            self.last_update = timestamp
+
+    def _span(self, until: Optional[float]) -> float:
+        return (self.last_update if until is None else until) - self.start_hours
+
+    def _area(self, area: float, level: int, until: Optional[float]) -> float:
+        if until is None:
+            return area
+        return area + level * (until - self.last_update)
+
+    def average_queue_length(self, until: Optional[float] = None) -> float:
+        """Time-weighted mean queue length, up to the last event or ``until``."""
+        span = self._span(until)
+        if span <= 0:
+            return 0.0
+        return self._area(self._queue_area, self.queue_length, until) / span
+
+    def average_busy_slots(self, until: Optional[float] = None) -> float:
+        span = self._span(until)
+        if span <= 0:
+            return 0.0
+        return self._area(self._busy_area, self.busy_slots, until) / span
+
+    def average_work_in_process(self, until: Optional[float] = None) -> float:
+        """Time-weighted mean number of operations queued or in work."""
+        return self.average_queue_length(until) + self.average_busy_slots(until)
+
+    def utilization(self, until: Optional[float] = None) -> float:
+        """Fraction of slot hours spent working."""
+        return self.average_busy_slots(until) / self.num_slots
+
+    def as_dict(self, until: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "work_center": self.name,
+            "num_slots": self.num_slots,
+            "completed": self.completed,
+            "utilization": self.utilization(until),
+            "average_queue_length": self.average_queue_length(until),
+            "average_work_in_process": self.average_work_in_process(until),
+            "mean_queue_hours": self.queue_hours.mean,
+            "mean_flow_hours": self.flow_hours.mean,
+            "std_dev_flow_hours": self.flow_hours.std_dev,
+        }
+
+
+class KpiTracker(EventLogger):
+    """An event logger that keeps key performance indicators instead of events.
+
+    Per work center statistics are kept in ``work_centers`` (see
+    ``WorkCenterKpis``), the lead time of each completed order (hours from its
+    first operation being queued to its router completing) in ``lead_times``,
+    along with running statistics of lead times across orders and the
+    time-weighted number of orders in work.  Memory grows with the number of
+    work centers and orders, never with the number of events; use it as the
+    factory's logger to measure a run without logging events at all.
+
+    A tracker joining a run part way should be made with ``joining``, taking
+    up the work in process at the time.  Queue and flow times are only kept
+    for operations the tracker saw queued, and orders it did not see released
+    are kept in ``truncated_orders`` rather than ``lead_times`` as they
+    complete.  A tracker made otherwise ignores work it did not see queued.
+    """
+
+    def __init__(self, start_hours: float = 0.0):
+        self.start_hours = start_hours
+        self.elapsed_hours = start_hours
+        self.work_centers: Dict[str, WorkCenterKpis] = {}
+        self.lead_times: Dict[int, float] = {}
+        self.lead_time_hours = RunningStats()
+        self.orders_in_work = 0
+        self._orders_area = 0.0
+        # queue times of operations not yet completed, and release times of
+        # orders not yet completed
+        self._queued_at: Dict[Any, Optional[float]] = {}
+        self._released_at: Dict[Any, Optional[float]] = {}
+        self.truncated_orders: Set[int] = set()
+        self._handlers = {
+            self.OPERATION_QUEUED: self._operation_queued,
+            self.OPERATION_STARTED: self._operation_started,
+            self.OPERATION_COMPLETED: self._operation_completed,
+            self.ROUTER_COMPLETED: self._router_completed,
+        }
+
+    @classmethod
+    def joining(cls, factory: Any) -> "KpiTracker":
+        """A tracker starting at the factory's current time, taking up the
+        operations queued at its work centers and in work (those of its
+        event queue) with unknown queue times."""
+        tracker = cls(factory.elapsed_hours)
+        in_work = set(factory.event_queue.items())
+        for work_center in factory.work_centers.values():
+            for operation in work_center.queue.items():
+                tracker._take_up(operation, in_work=False)
+        for operation in in_work:
+            tracker._take_up(operation, in_work=True)
+        return tracker
+
+    def _take_up(self, operation: Any, in_work: bool) -> None:
+        kpis = self._kpis(self.start_hours, operation)
+        if in_work:
+            kpis.busy_slots += 1
+        else:
+            kpis.queue_length += 1
+        self._queued_at[operation] = None
+        if operation.router not in self._released_at:
+            self._released_at[operation.router] = None
+            self.orders_in_work += 1
+
+    def log_event(self, timestamp, event, planning_object):
+        self._orders_area += self.orders_in_work * (timestamp - self.elapsed_hours)
+        self.elapsed_hours = timestamp
+        self._handlers[event](timestamp, planning_object)
+
+    def _kpis(self, timestamp: float, operation: Any) -> WorkCenterKpis:
+        work_center = operation.work_center
+        try:
+            kpis = self.work_centers[work_center.name]
+        except KeyError:
+            kpis = self.work_centers[work_center.name] = WorkCenterKpis(
+                work_center.name, work_center.num_slots, self.start_hours
+            )
+        kpis._advance(timestamp)
+        return kpis
+
+    def _operation_queued(self, timestamp: float, operation: Any) -> None:
+        self._kpis(timestamp, operation).queue_length += 1
+        self._queued_at[operation] = timestamp
+        router = operation.router
+        if router not in self._released_at:
+            self._released_at[router] = timestamp
+            self.orders_in_work += 1
+
+    def _operation_started(self, timestamp: float, operation: Any) -> None:
+        if operation not in self._queued_at:
+            return
+        kpis = self._kpis(timestamp, operation)
+        kpis.queue_length -= 1
+        kpis.busy_slots += 1
+        queued_at = self._queued_at[operation]
+        if queued_at is not None:
+            kpis.queue_hours.add(timestamp - queued_at)
+
+    def _operation_completed(self, timestamp: float, operation: Any) -> None:
+        if operation not in self._queued_at:
+            return
+        kpis = self._kpis(timestamp, operation)
+        kpis.busy_slots -= 1
+        kpis.completed += 1
+        queued_at = self._queued_at.pop(operation)
+        if queued_at is not None:
+            kpis.flow_hours.add(timestamp - queued_at)
+
+    def _router_completed(self, timestamp: float, router: Any) -> None:
+        if router not in self._released_at:
+            return
+        released_at = self._released_at.pop(router)
+        self.orders_in_work -= 1
+        if released_at is None:
+            self.truncated_orders.add(router.order_number)
+            return
+        lead_time = timestamp - released_at
+        self.lead_times[router.order_number] = lead_time
+        self.lead_time_hours.add(lead_time)
+
+    def average_orders_in_work(self) -> float:
+        """Time-weighted mean number of orders released but not completed."""
+        span = self.elapsed_hours - self.start_hours
+        if span <= 0:
+            return 0.0
+        return self._orders_area / span
+
+    def work_center_rows(self) -> List[Dict[str, Any]]:
+        """Statistics of every work center up to the last event, by name."""
+        return [
+            self.work_centers[name].as_dict(self.elapsed_hours)
+            for name in sorted(self.work_centers)
+        ]
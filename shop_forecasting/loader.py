@@ -0,0 +1,183 @@
+import csv
+import json
+import mmap
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+
+# columns every operation row must provide, item_number is optional
+REQUIRED_COLUMNS = ("order_number", "sequence_number", "work_center", "hours")
+
+
+@dataclass
+class LoadReport:
+    """Progress and throughput of a bulk load."""
+
+    rows: int = 0
+    routers: int = 0
+    operations: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.seconds:
+            return 0.0
+        return self.rows / self.seconds
+
+
+@contextmanager
+def _lines(path: str, use_mmap: bool) -> Iterator[Iterable[str]]:
+    """The lines of a text file, optionally read through a memory map."""
+    if not use_mmap:
+        with open(path, newline="") as text_file:
+            yield text_file
+        return
+    with open(path, "rb") as binary_file, mmap.mmap(
+        binary_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        yield (line.decode() for line in iter(mapped.readline, b""))
+
+
+class _RouterAssembler:
+    """Builds routers from operation rows, in whatever order the rows arrive."""
+
+    def __init__(
+        self,
+        factory: Factory,
+        work_centers: Mapping[str, WorkCenter],
+        store: Optional[OperationStore],
+    ):
+        self.factory = factory
+        self.work_centers = work_centers
+        self.store = store
+        self.routers: Dict[int, Router] = {}
+        # operations waiting to be moved into the store, by order number
+        self.stored_operations: Dict[int, Dict[int, Tuple[WorkCenter, float]]] = {}
+        self.report = LoadReport()
+
+    def add(self, row: Mapping[str, str], row_number: int) -> None:
+        try:
+            order_number = int(row["order_number"])
+            sequence_number = int(row["sequence_number"])
+            hours = float(row["hours"])
+            name = row["work_center"]
+        except (KeyError, ValueError) as error:
+            raise ValueError(
+                "row {}: missing or invalid value {}".format(row_number, error)
+            ) from None
+        try:
+            work_center = self.work_centers[name]
+        except KeyError:
+            raise ValueError(
+                "row {}: unknown work center {!r}".format(row_number, name)
+            ) from None
+
+        router = self.routers.get(order_number)
+        if router is None:
+            router = self.routers[order_number] = Router(
+                operations={},
+                current_sequence=sequence_number,
+                factory=self.factory,
+                item_number=int(row.get("item_number") or 0),
+                order_number=order_number,
+            )
+            self.report.routers += 1
+        if self.store is not None:
+            operations = self.stored_operations.setdefault(order_number, {})
+            operations[sequence_number] = (work_center, hours)
+        else:
+            router.operations[sequence_number] = RouterOperation(
+                work_center, router, sequence_number, hours
+            )
+        self.report.operations += 1
+
+    def finish(self) -> None:
+        for order_number, router in self.routers.items():
+            if self.store is not None:
+                self.store.add_router(router, self.stored_operations.pop(order_number))
+            router.current_sequence = min(router.operations)
+
+
+def _load(
+    rows: Iterator[Mapping[str, str]],
+    factory: Factory,
+    work_centers: Optional[Mapping[str, WorkCenter]],
+    store: Optional[OperationStore],
+    chunk_size: int,
+    on_chunk: Optional[Callable[[LoadReport], None]],
+) -> LoadReport:
+    start = perf_counter()
+    # resolve work centers by name from a dictionary built once, up front
+    if work_centers is None:
+        work_centers = factory.work_centers
+    assembler = _RouterAssembler(factory, dict(work_centers), store)
+    report = assembler.report
+    while True:
+        chunk: List[Mapping[str, str]] = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        for row in chunk:
+            report.rows += 1
+            assembler.add(row, report.rows)
+        report.seconds = perf_counter() - start
+        if on_chunk is not None:
+            on_chunk(report)
+    assembler.finish()
+    report.seconds = perf_counter() - start
+    return report
+
+
+def load_csv(
+    path: str,
+    factory: Factory,
+    work_centers: Optional[Mapping[str, WorkCenter]] = None,
+    store: Optional[OperationStore] = None,
+    chunk_size: int = 65536,
+    use_mmap: bool = False,
+    on_chunk: Optional[Callable[[LoadReport], None]] = None,
+) -> LoadReport:
+    """Stream routers from a CSV export of operations into a factory.
+
+    The file needs a header row naming at least the ``REQUIRED_COLUMNS``; rows
+    of an order need not be adjacent or sorted.  Work centers are resolved by
+    name from ``work_centers``, by default those registered with the factory.
+    Rows are read ``chunk_size`` at a time, calling ``on_chunk`` with the load
+    report after each chunk, and are discarded once turned into operations.
+    Passing a ``store`` keeps operations in an ``OperationStore`` rather than
+    as one object each.  Routers start at their first operation.
+    """
+    with _lines(path, use_mmap) as lines:
+        reader = csv.DictReader(lines)
+        missing = set(REQUIRED_COLUMNS).difference(reader.fieldnames or ())
+        if missing:
+            raise ValueError("missing columns: {}".format(", ".join(sorted(missing))))
+        return _load(iter(reader), factory, work_centers, store, chunk_size, on_chunk)
+
+
+def load_json_lines(
+    path: str,
+    factory: Factory,
+    work_centers: Optional[Mapping[str, WorkCenter]] = None,
+    store: Optional[OperationStore] = None,
+    chunk_size: int = 65536,
+    use_mmap: bool = False,
+    on_chunk: Optional[Callable[[LoadReport], None]] = None,
+) -> LoadReport:
+    """Stream routers from newline-delimited JSON operations into a factory.
+
+    Each line holds one operation as an object with the same fields as the
+    columns read by ``load_csv``, which describes the remaining arguments.
+    """
+    with _lines(path, use_mmap) as lines:
+        rows = (json.loads(line) for line in lines if line.strip())
+        return _load(rows, factory, work_centers, store, chunk_size, on_chunk)
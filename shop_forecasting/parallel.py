@@ -0,0 +1,417 @@
+import pickle
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from math import inf
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from time import perf_counter
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+from shop_forecasting.event_calendars import HeapEventCalendar
+from shop_forecasting.planning_objects import Factory, RouterOperation
+from shop_forecasting.prioritizers import PrioritizedItem
+from shop_forecasting.util import CompletionLogger, EventLogger
+
+# (timestamp, event, order number, sequence number or None for router events)
+Event = Tuple[float, str, int, Optional[int]]
+
+# (completion time, key of the completing operation, sequence number of the
+# operation it hands its router to)
+Arrival = Tuple[float, Tuple[int, int], int]
+
+
+def operation_key(operation: RouterOperation) -> Tuple[int, int]:
+    """Orders operations completing at the same time, by order and sequence."""
+    return operation.router.order_number, operation.sequence_number
+
+
+def event_records(logger: EventLogger) -> List[Event]:
+    """The events of a log in the form ``run_partitioned`` returns them."""
+    records = []
+    for event in logger.events:
+        planning_object = event["planning_object"]
+        if event["event"] == EventLogger.ROUTER_COMPLETED:
+            records.append(
+                (event["timestamp"], event["event"], planning_object.order_number, None)
+            )
+        else:
+            records.append(
+                (
+                    event["timestamp"],
+                    event["event"],
+                    planning_object.router.order_number,
+                    planning_object.sequence_number,
+                )
+            )
+    return records
+
+
+def _partition_map(
+    factory: Factory, partitions: Sequence[Collection[str]]
+) -> Dict[str, int]:
+    partition_of: Dict[str, int] = {}
+    for index, names in enumerate(partitions):
+        for name in names:
+            if name not in factory.work_centers:
+                raise ValueError("unknown work center {!r}".format(name))
+            if name in partition_of:
+                raise ValueError("work center {!r} is in two partitions".format(name))
+            partition_of[name] = index
+    missing = set(factory.work_centers).difference(partition_of)
+    if missing:
+        raise ValueError(
+            "work centers in no partition: {}".format(", ".join(sorted(missing)))
+        )
+    return partition_of
+
+
+def _least_duration(operation: RouterOperation) -> float:
+    """A lower bound on the clock hours between an operation's start and finish."""
+    hours = operation.wall_clock_hours
+    calendar = operation.work_center.shift_calendar
+    if calendar is not None:
+        hours /= max(shift.rate for shift in calendar.shifts)
+    return hours
+
+
+def lookahead(factory: Factory, partitions: Sequence[Collection[str]]) -> float:
+    """The least clock hours any operation handing its router over to another
+    partition may take, infinite when no router crosses partitions."""
+    partition_of = _partition_map(factory, partitions)
+    least = inf
+    for router in factory.routers:
+        operations = router.operations
+        sequences = sorted(operations)
+        for current, following in zip(sequences, sequences[1:]):
+            operation = operations[current]
+            if (
+                partition_of[operation.work_center.name]
+                != partition_of[operations[following].work_center.name]
+            ):
+                least = min(least, _least_duration(operation))
+    return least
+
+
+class _LogicalProcess:
+    """The share of a shop model simulated by one partition.
+
+    Each partition holds a copy of the whole model but only simulates its own
+    work centers.  An operation started here whose router continues in another
+    partition is forwarded as soon as it starts, timestamped with its finish,
+    and the receiving partition queues the next operation at that time.
+    """
+
+    def __init__(
+        self,
+        factory: Factory,
+        index: int,
+        partition_of: Dict[str, int],
+        record_events: bool,
+    ):
+        self.factory = factory
+        self.index = index
+        self.partition_of = partition_of
+        self.events_processed = 0
+        self._routers = {router.order_number: router for router in factory.routers}
+        self._arrivals: List[Arrival] = []
+        self._outbox: Dict[int, List[Arrival]] = {}
+        self._records: List[Tuple[Any, ...]] = []
+        # the completion (or released router) being processed, and where the
+        # events it causes fall among those of the sequential run
+        self._stage: Tuple[Any, ...] = ()
+        self._start_position = 2
+
+        factory.logger = CompletionLogger()
+        if record_events:
+            factory.subscribe(self._record)
+        factory.event_queue = queue = HeapEventCalendar(tie_key=operation_key)
+        put = queue.put
+
+        def put_and_forward(prioritized_item: PrioritizedItem) -> None:
+            put(prioritized_item)
+            operation = prioritized_item.item
+            router = operation.router
+            following = router.operations.get(router.next_sequence)
+            if following is not None:
+                partition = partition_of[following.work_center.name]
+                if partition != index:
+                    self._outbox.setdefault(partition, []).append(
+                        (
+                            prioritized_item.priority,
+                            operation_key(operation),
+                            following.sequence_number,
+                        )
+                    )
+
+        queue.put = put_and_forward
+        enqueue = factory.enqueue_at_workcenter
+
+        def enqueue_here(operation: RouterOperation) -> None:
+            # operations of other partitions were forwarded when their
+            # predecessor started
+            if partition_of[operation.work_center.name] == index:
+                enqueue(operation)
+
+        factory.enqueue_at_workcenter = enqueue_here
+
+    def _record(self, timestamp: float, event: str, planning_object: Any) -> None:
+        if event == EventLogger.OPERATION_STARTED:
+            position = self._start_position
+        elif event == EventLogger.OPERATION_COMPLETED:
+            position = 0
+        else:
+            position = 1
+        if event == EventLogger.ROUTER_COMPLETED:
+            order_number, sequence_number = planning_object.order_number, None
+        else:
+            order_number, sequence_number = operation_key(planning_object)
+        self._records.append(
+            (self._stage, position, timestamp, event, order_number, sequence_number)
+        )
+
+    def next_time(self) -> float:
+        queue = self.factory.event_queue
+        next_completion = queue.peek().priority if queue else inf
+        next_arrival = self._arrivals[0][0] if self._arrivals else inf
+        return min(next_completion, next_arrival)
+
+    def _take_outbox(self) -> Tuple[float, Dict[int, List[Arrival]]]:
+        outbox, self._outbox = self._outbox, {}
+        return self.next_time(), outbox
+
+    def release(self) -> Tuple[float, Dict[int, List[Arrival]]]:
+        factory = self.factory
+        for position, router in enumerate(factory.routers):
+            operation = router.current_operation
+            if operation is not None:
+                self._stage = (0, position)
+                self._start_position = 2
+                factory.enqueue_at_workcenter(operation)
+        return self._take_outbox()
+
+    def advance(
+        self, window_end: float, arrivals: List[Arrival]
+    ) -> Tuple[float, Dict[int, List[Arrival]]]:
+        """Process every event before ``window_end``, in the sequential order."""
+        for arrival in arrivals:
+            heappush(self._arrivals, arrival)
+        queue = self.factory.event_queue
+        pending = self._arrivals
+        while True:
+            completion = queue.peek() if queue else None
+            if completion is not None and (
+                not pending
+                or (completion.priority, operation_key(completion.item))
+                < pending[0][:2]
+            ):
+                if completion.priority >= window_end:
+                    break
+                self._complete(queue.get())
+            elif pending and pending[0][0] < window_end:
+                self._arrive(heappop(pending))
+            else:
+                break
+        return self._take_outbox()
+
+    def _complete(self, prioritized_item: PrioritizedItem) -> None:
+        factory = self.factory
+        operation = prioritized_item.item
+        now = factory.elapsed_hours = prioritized_item.priority
+        self._stage = (1, now, operation_key(operation))
+        factory.emit(now, EventLogger.OPERATION_COMPLETED, operation)
+        self._start_position = 2
+        operation.router.advance()
+        self._start_position = 3
+        operation.work_center.free_slot()
+        self.events_processed += 1
+
+    def _arrive(self, arrival: Arrival) -> None:
+        now, key, sequence_number = arrival
+        factory = self.factory
+        factory.elapsed_hours = now
+        self._stage = (1, now, key)
+        self._start_position = 2
+        router = self._routers[key[0]]
+        router.current_sequence = sequence_number
+        factory.enqueue_at_workcenter(router.current_operation)
+
+    def results(self) -> Tuple[List[Tuple[Any, ...]], Dict[int, float], float, int]:
+        return (
+            self._records,
+            self.factory.logger.completions,
+            self.factory.elapsed_hours,
+            self.events_processed,
+        )
+
+
+def _serve_partition(
+    connection: Connection,
+    payload: bytes,
+    index: int,
+    partition_of: Dict[str, int],
+    record_events: bool,
+) -> None:
+    try:
+        process = _LogicalProcess(
+            pickle.loads(payload), index, partition_of, record_events
+        )
+        connection.send(process.release())
+        while True:
+            window = connection.recv()
+            if window is None:
+                break
+            connection.send(process.advance(*window))
+        connection.send(process.results())
+    except Exception as error:
+        connection.send(error)
+    finally:
+        connection.close()
+
+
+def _receive(connection: Connection, index: int) -> Any:
+    reply = connection.recv()
+    if isinstance(reply, Exception):
+        raise RuntimeError("partition {} failed".format(index)) from reply
+    return reply
+
+
+@dataclass
+class PartitionedRun:
+    """The outcome of ``run_partitioned``.
+
+    ``events`` is empty unless events were recorded, ``windows`` counts the
+    synchronization rounds and ``messages`` the routers handed between
+    partitions.
+    """
+
+    completions: Dict[int, float]
+    events: List[Event]
+    elapsed_hours: float
+    events_processed: int
+    windows: int
+    messages: int
+    lookahead: float
+    wall_seconds: float
+
+
+def run_partitioned(
+    factory: Factory,
+    partitions: Sequence[Collection[str]],
+    record_events: bool = True,
+) -> PartitionedRun:
+    """Release and run an unreleased shop model split over OS processes.
+
+    Each partition, a collection of work center names, simulates its work
+    centers with its own event calendar in a process of its own.  A router
+    moving between partitions is passed on as a timestamped message when the
+    operation before the move starts, which is at least the ``lookahead``
+    before it finishes.  The partitions advance in windows: every event
+    earlier than the earliest pending event plus the lookahead is safe to
+    process, since no message can arrive for it anymore.  The lookahead must
+    be positive, so partitions may not be joined by operations of zero hours.
+
+    Operations completing at the same time are processed in the order of
+    ``operation_key`` rather than the order they started, which no single
+    partition knows.  The completions and events therefore match exactly
+    those of a sequential run of the model with an event queue of
+    ``HeapEventCalendar(tie_key=operation_key)``; they only differ from a run
+    with the default calendar where operations complete at the same time.
+
+    The model's logger is not used, completions and (with ``record_events``)
+    every event are returned in the order of the sequential run.
+    """
+    if factory.batch_coincident:
+        raise ValueError("batched completions cannot be partitioned")
+    if factory.time_base is not None:
+        raise ValueError("models with a time base cannot be partitioned")
+    if not factory.event_queue.empty() or any(
+        not work_center.queue.empty() for work_center in factory.work_centers.values()
+    ):
+        raise ValueError("only unreleased models can be partitioned")
+    if len({router.order_number for router in factory.routers}) != len(
+        factory.routers
+    ):
+        raise ValueError("order numbers must be unique to partition a model")
+    partition_of = _partition_map(factory, partitions)
+    window = lookahead(factory, partitions)
+    if window <= 0:
+        raise ValueError("partitions are joined by operations of zero hours")
+
+    start = perf_counter()
+    payload = pickle.dumps(factory)
+    connections = []
+    processes = []
+    for index in range(len(partitions)):
+        connection, worker_connection = Pipe()
+        process = Process(
+            target=_serve_partition,
+            args=(worker_connection, payload, index, partition_of, record_events),
+            daemon=True,
+        )
+        process.start()
+        worker_connection.close()
+        connections.append(connection)
+        processes.append(process)
+
+    try:
+        next_times = []
+        pending: List[List[Arrival]] = [[] for _ in partitions]
+        messages = 0
+
+        def collect(index: int) -> None:
+            nonlocal messages
+            next_time, outbox = _receive(connections[index], index)
+            next_times[index] = next_time
+            for destination, arrivals in outbox.items():
+                pending[destination].extend(arrivals)
+                messages += len(arrivals)
+
+        for index in range(len(partitions)):
+            next_times.append(inf)
+            collect(index)
+
+        windows = 0
+        while True:
+            earliest = [
+                min(next_time, min((arrival[0] for arrival in arrivals), default=inf))
+                for next_time, arrivals in zip(next_times, pending)
+            ]
+            if min(earliest) == inf:
+                break
+            # without routers crossing partitions, each runs to the end at once
+            window_end = min(earliest) + window
+            active = [index for index, time in enumerate(earliest) if time < window_end]
+            for index in active:
+                connections[index].send((window_end, pending[index]))
+                pending[index] = []
+            for index in active:
+                collect(index)
+            windows += 1
+
+        for connection in connections:
+            connection.send(None)
+        results = [
+            _receive(connection, index) for index, connection in enumerate(connections)
+        ]
+    finally:
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join()
+
+    completions: Dict[int, float] = {}
+    records = []
+    for partition_records, partition_completions, _, _ in results:
+        completions.update(partition_completions)
+        records.extend(partition_records)
+    records.sort(key=lambda record: (record[0], record[1]))
+    return PartitionedRun(
+        completions=completions,
+        events=[record[2:] for record in records],
+        elapsed_hours=max([factory.elapsed_hours] + [result[2] for result in results]),
+        events_processed=sum(result[3] for result in results),
+        windows=windows,
+        messages=messages,
+        lookahead=window,
+        wall_seconds=perf_counter() - start,
+    )
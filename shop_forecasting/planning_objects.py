@@ -1,8 +1,24 @@
+from bisect import bisect_left
+from copy import copy
 from dataclasses import dataclass, field
-from queue import PriorityQueue
-from typing import Dict, Union
+from math import inf
+from time import perf_counter
+from typing import Any, Callable, Collection, Dict, List, Optional, Union
 
-from shop_forecasting.prioritizers import PrioritizedItem, Prioritizer
+from shop_forecasting.event_calendars import (
+    AddressableHeap,
+    EventCalendar,
+    HeapEventCalendar,
+)
+from shop_forecasting.instrumentation import Profiler
+from shop_forecasting.prioritizers import (
+    PrioritizedItem,
+    Prioritizer,
+    TimeDependentPrioritizer,
+)
+from shop_forecasting.shifts import ShiftCalendar
+from shop_forecasting.subscriptions import Handler, Subscription, fan_out
+from shop_forecasting.timebase import TimeBase
 from shop_forecasting.util import EventLogger
 
 
@@ -29,10 +45,25 @@ class RouterOperation:
         """Convert this operation's workcenter hours into wall clock hours."""
         return self.hours / self.work_center.time_passage_ratio
 
+    def _fork(self, memo: Dict[int, Any]) -> "RouterOperation":
+        try:
+            return memo[id(self)]
+        except KeyError:
+            fork = memo[id(self)] = copy(self)
+            fork.router = memo[id(self.router)]
+            fork.work_center = memo[id(self.work_center)]
+            return fork
+
 
 @dataclass(eq=False)
 class Router:
-    """A collection of manufacturing steps."""
+    """A collection of manufacturing steps.
+
+    Operations are visited in ascending sequence number, regardless of the order
+    of the operations dictionary.  The sorted sequence numbers are indexed once
+    and rebuilt whenever the operations dictionary is replaced or changes size;
+    call ``reindex`` after swapping out keys of an equally sized dictionary.
+    """
 
     operations: Dict[int, RouterOperation]
     current_sequence: int
@@ -40,15 +71,85 @@ class Router:
     item_number: int = 0
     order_number: int = 0
     _complete_sentinel: int = -1
+    _sequences: List[int] = field(default_factory=list, init=False, repr=False)
+    _position: int = field(default=-1, init=False, repr=False)
+    _indexed_operations: Optional[Dict[int, RouterOperation]] = field(
+        default=None, init=False, repr=False
+    )
+    _indexed_count: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.factory.register_router(self)
+
+    def _fork(self, memo: Dict[int, Any]) -> "Router":
+        """Copy all but the operations, which are forked once every router is."""
+        fork = memo[id(self)] = copy(self)
+        fork.factory = memo[id(self.factory)]
+        return fork
+
+    def _fork_operations(self, memo: Dict[int, Any]) -> None:
+        fork = memo[id(self)]
+        operations = self.operations
+        if isinstance(operations, dict):
+            fork.operations = {
+                sequence_number: operation._fork(memo)
+                for sequence_number, operation in operations.items()
+            }
+        else:
+            # other mappings know how to fork themselves
+            fork.operations = operations._fork(memo)
+        if operations is self._indexed_operations:
+            # the sorted sequence index is never mutated, share it
+            fork._indexed_operations = fork.operations
 
     def __repr__(self) -> str:
         return "Router (Order# {}, Item# {})".format(
             self.order_number, self.item_number
         )
 
+    def reindex(self) -> None:
+        """Rebuild the sorted index of operation sequence numbers."""
+        # mappings shared between routers may share their index as well
+        sequences = getattr(self.operations, "sorted_sequences", None)
+        self._sequences = sorted(self.operations) if sequences is None else sequences
+        self._indexed_operations = self.operations
+        self._indexed_count = len(self.operations)
+        self._position = -1
+
+    def _locate(self) -> int:
+        """Index position of the current sequence, or of the first one after it."""
+        operations = self.operations
+        if (
+            operations is not self._indexed_operations
+            or len(operations) != self._indexed_count
+        ):
+            self.reindex()
+        sequences = self._sequences
+        position = self._position
+        if not (
+            0 <= position < len(sequences)
+            and sequences[position] == self.current_sequence
+        ):
+            # current sequence was set from outside, find it again
+            position = self._position = bisect_left(sequences, self.current_sequence)
+        return position
+
+    def _next_position(self) -> int:
+        position = self._locate()
+        sequences = self._sequences
+        if position < len(sequences) and sequences[position] == self.current_sequence:
+            position += 1
+        return position
+
     def advance(self) -> None:
         """Move the current operation forward if router is not complete."""
-        self.current_sequence = self.next_sequence
+        if self.current_sequence != self._complete_sentinel:
+            position = self._next_position()
+            if position < len(self._sequences):
+                self.current_sequence = self._sequences[position]
+                self._position = position
+            else:
+                self.current_sequence = self._complete_sentinel
         if self.current_sequence == self._complete_sentinel:
             self.factory.notify_router_complete(self)
         elif self.current_operation:
@@ -63,57 +164,232 @@ class Router:
 
     @property
     def next_sequence(self) -> int:
-        try:
-            return next(
-                seq
-                for seq in self.operations.keys()
-                if seq > self.current_sequence
-                and self.current_sequence != self._complete_sentinel
-            )
-        except StopIteration:
+        if self.current_sequence == self._complete_sentinel:
             return self._complete_sentinel
+        position = self._next_position()
+        if position < len(self._sequences):
+            return self._sequences[position]
+        return self._complete_sentinel
 
 
 @dataclass(eq=False)
 class WorkCenter:
-    """A group of related machines or processes that accomplish similar tasks."""
+    """A group of related machines or processes that accomplish similar tasks.
+
+    A work center with a ``TimeDependentPrioritizer`` keeps its queue in an
+    ``AddressableHeap`` and brings stale priorities up to date when it
+    dispatches an operation, rather than as time passes.
+
+    Without a ``shift_calendar``, a work center works around the clock.
+    """
 
     name: str
     prioritizer: Prioritizer
     factory: "Factory"
-    queue: "PriorityQueue[PrioritizedItem]" = field(default_factory=PriorityQueue)
+    queue: EventCalendar = field(default_factory=HeapEventCalendar)
     num_slots: int = 1
     time_passage_ratio: float = 1.0
+    shift_calendar: Optional[ShiftCalendar] = None
     available_slots: int = field(init=False)
+    _dynamic: bool = field(init=False, default=False, repr=False)
 
     def __post_init__(self):
         self.available_slots = self.num_slots
+        self.set_prioritizer(self.prioritizer)
+        self.factory.register_work_center(self)
+
+    def set_prioritizer(self, prioritizer: Prioritizer) -> None:
+        """Change the dispatch rule of a work center with an empty queue."""
+        self.prioritizer = prioritizer
+        self._dynamic = isinstance(prioritizer, TimeDependentPrioritizer)
+        if self._dynamic and not isinstance(self.queue, AddressableHeap):
+            self.queue = AddressableHeap()
+
+    def _fork(self, memo: Dict[int, Any]) -> "WorkCenter":
+        """Copy all but the queue, which is remapped once routers are forked."""
+        fork = memo[id(self)] = copy(self)
+        fork.factory = memo[id(self.factory)]
+        try:
+            fork.prioritizer = memo[id(self.prioritizer)]
+        except KeyError:
+            fork.prioritizer = memo[id(self.prioritizer)] = copy(self.prioritizer)
+        return fork
 
     def dequeue(self) -> RouterOperation:
         """Returns next operation that can be worked in workcenter's queue."""
+        if self._dynamic:
+            self._revalidate()
+            operation = self.queue.get().item
+            self.prioritizer.forget(operation)
+            return operation
         return self.queue.get().item
 
+    def withdraw(self, operation: RouterOperation) -> None:
+        """Take a queued operation out of the queue without working it."""
+        self.queue.remove(operation)
+        if self._dynamic:
+            self.prioritizer.forget(operation)
+
+    def _revalidate(self) -> None:
+        prioritizer = self.prioritizer
+        now = prioritizer.now = self.factory.elapsed_hours
+        priority_at = prioritizer.priority_at
+        self.queue.revalidate(
+            lambda item: priority_at(item, now), now, prioritizer.fall_rate
+        )
+
+    def _prioritize(self, operation: RouterOperation) -> PrioritizedItem:
+        prioritized_item = PrioritizedItem(0, operation)
+        if self._dynamic:
+            prioritizer = self.prioritizer
+            prioritizer.now = self.factory.elapsed_hours
+            prioritizer.prioritize(prioritized_item)
+            # let the queue know how stale this priority may grow
+            fall_rate = prioritizer.fall_rate(operation)
+            if fall_rate > self.queue.fall_rate:
+                self.queue.fall_rate = fall_rate
+        else:
+            self.prioritizer.prioritize(prioritized_item)
+        return prioritized_item
+
+    def reprioritize(self, operation: RouterOperation) -> None:
+        """Recompute the priority of a queued operation whose data changed.
+
+        This takes O(log n) with an ``AddressableHeap`` queue, other queues
+        remove the operation and add it again, losing its place among equal
+        priorities.
+        """
+        prioritized_item = self._prioritize(operation)
+        if isinstance(self.queue, AddressableHeap):
+            self.queue.update(operation, prioritized_item.priority)
+        else:
+            self.queue.remove(operation)
+            self.queue.put(prioritized_item)
+
     def enqueue(self, new_operation: RouterOperation) -> None:
         """Prioritize an operation and add it to the workcenter's queue."""
-        prioritized_item = PrioritizedItem(0, new_operation)
-        self.prioritizer.prioritize(prioritized_item)
-        self.queue.put(prioritized_item)
+        self.queue.put(self._prioritize(new_operation))
 
         # begin work immediately if a slot is available
         if self.available_slots > 0:
             self.work_next()
 
+    def add_to_queue(self, new_operation: RouterOperation) -> None:
+        """Prioritize an operation and queue it, leaving dispatch for later."""
+        self.queue.put(self._prioritize(new_operation))
+
+    def dispatch(self) -> None:
+        """Begin work on queued operations while slots are available."""
+        while self.available_slots > 0 and not self.queue.empty():
+            self.work_next()
+
     def work_next(self) -> None:
         """Remove an operation from the workcenter's queue to begin work on it."""
         if not self.queue.empty():
-            self.factory.add_work_in_progress(self.dequeue())
+            self.start(self.dequeue())
             self.available_slots -= 1
 
+    def start(self, operation: RouterOperation) -> None:
+        """Hand an operation to the factory as work in progress."""
+        if self.shift_calendar is None:
+            self.factory.add_work_in_progress(operation)
+        else:
+            # work only progresses on shift
+            self.factory.add_work_in_progress(
+                operation,
+                self.shift_calendar.finish_time(
+                    self.factory.elapsed_hours, operation.wall_clock_hours
+                ),
+            )
+
     def free_slot(self) -> None:
         self.available_slots += 1
         self.work_next()
 
 
+@dataclass(eq=False, init=False)
+class DelayWorkCenter(WorkCenter):
+    """A work center of unlimited capacity, where operations only take time.
+
+    Suits outside processing, cure or dry times and inspection holds.  Queued
+    operations start at once, without being prioritized, held in the queue or
+    occupying a slot, while logging the same events as any other work center.
+    The ``factory`` must be given by keyword.
+    """
+
+    prioritizer: Optional[Prioritizer] = None
+    num_slots: float = inf
+
+    def __init__(
+        self,
+        name: str,
+        prioritizer: Optional[Prioritizer] = None,
+        *,
+        factory: "Factory",
+        num_slots: float = inf,
+        **work_center_args,
+    ):
+        # the factory is required, though it follows a field with a default
+        super().__init__(
+            name, prioritizer, factory, num_slots=num_slots, **work_center_args
+        )
+
+    def enqueue(self, new_operation: RouterOperation) -> None:
+        self.start(new_operation)
+
+    add_to_queue = enqueue
+
+    def free_slot(self) -> None:
+        pass
+
+    def reprioritize(self, operation: RouterOperation) -> None:
+        pass
+
+
+@dataclass
+class RunSummary:
+    """The outcome of a call to ``Factory.run``."""
+
+    events_processed: int
+    elapsed_hours: float
+    wall_seconds: float
+    stop_reason: str
+
+    @property
+    def events_per_second(self) -> float:
+        if not self.wall_seconds:
+            return 0.0
+        return self.events_processed / self.wall_seconds
+
+
+class _NewEventLogger:
+    """The default of ``Factory.logger``, standing for a new ``EventLogger``."""
+
+    def __repr__(self) -> str:
+        return "EventLogger()"
+
+
+_NEW_EVENT_LOGGER = _NewEventLogger()
+
+
+class _LoggerField:
+    """The ``logger`` field of a ``Factory``, rewiring event dispatch when set."""
+
+    def __get__(self, factory, owner=None):
+        if factory is None:
+            # the field's default, as the dataclass reads it from the class
+            return _NEW_EVENT_LOGGER
+        return factory._logger
+
+    def __set__(self, factory, logger) -> None:
+        if logger is _NEW_EVENT_LOGGER:
+            logger = EventLogger()
+        factory._logger = logger
+        # factories are wired once initialized, see Factory.__post_init__
+        if "_dispatch" in factory.__dict__:
+            factory._wire()
+
+
 @dataclass
 class Factory:
     """A group of workcenters that manages a flow of operations.
@@ -121,13 +397,223 @@ class Factory:
     A factory is reponsible for coordinating events happening across all work
     centers.  Namely, it maintains the order in which operations complete from
     a global perspective (i.e. the flow of time).
+
+    Any ``EventCalendar`` may serve as the event queue; a ``CalendarQueue``
+    suits models with very many operations in work at once.
+
+    Work centers and routers register themselves with the factory they are
+    created for, so a factory also serves as the complete model of a shop.
+
+    With ``batch_coincident``, ``run`` completes all operations finishing at
+    the same time together, see ``complete_batch``.
+
+    Events go to the logger, for the event types in its ``subscribed_events``,
+    and to any subscriptions (see ``subscribe``).  Event types nobody wants are
+    never dispatched.  Assigning a new logger rewires dispatch, and a ``None``
+    logger turns logging off.
+
+    With a ``time_base``, the clock and the event queue count integer ticks
+    (see ``TimeBase``), while ``elapsed_hours`` follows the clock in hours.
     """
 
-    logger: EventLogger = field(default_factory=EventLogger)
-    event_queue: "PriorityQueue[PrioritizedItem]" = field(default_factory=PriorityQueue)
+    logger: Optional[EventLogger] = _LoggerField()
+    event_queue: EventCalendar = field(default_factory=HeapEventCalendar)
     elapsed_hours: float = 0
+    work_centers: Dict[str, "WorkCenter"] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    routers: List[Router] = field(default_factory=list, repr=False, compare=False)
+    profiler: Optional[Profiler] = field(default=None, repr=False, compare=False)
+    batch_coincident: bool = False
+    time_base: Optional[TimeBase] = None
+    # the clock in ticks, with a time base
+    elapsed_ticks: int = field(default=0, init=False, repr=False, compare=False)
+    _subscriptions: List[Subscription] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # work centers awaiting dispatch while a batch of completions is processed
+    _pending_dispatch: Optional[Dict["WorkCenter", None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._wire()
+        if self.time_base is not None:
+            self._advance_clock(self.time_base.to_ticks(self.elapsed_hours))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # dispatch handlers are rebuilt rather than copied or pickled
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if not name.startswith("_on_") and name != "_dispatch"
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._wire()
+
+    def _wire(self) -> None:
+        """Route each event type to the logger and subscriptions wanting it."""
+        handlers: Dict[str, List[Handler]] = {
+            event: [] for event in EventLogger.EVENT_TYPES
+        }
+        logger = self.logger
+        if logger is not None:
+            events = (
+                logger.subscribed_events
+                if isinstance(logger, EventLogger)
+                else EventLogger.EVENT_TYPES
+            )
+            for event in events:
+                handlers[event].append(logger.log_event)
+        for subscription in self._subscriptions:
+            handler = subscription if subscription.filtered else subscription.handler
+            for event in subscription.events:
+                handlers[event].append(handler)
+        if self.profiler is not None and self.profiler.installed:
+            for event in handlers:
+                handlers[event].append(self.profiler.count_event)
+        self._dispatch = {event: fan_out(handlers[event]) for event in handlers}
+        self._on_router_completed = self._dispatch[EventLogger.ROUTER_COMPLETED]
+        self._on_started = self._dispatch[EventLogger.OPERATION_STARTED]
+        self._on_completed = self._dispatch[EventLogger.OPERATION_COMPLETED]
+        self._on_queued = self._dispatch[EventLogger.OPERATION_QUEUED]
+
+    def subscribe(
+        self,
+        handler: Handler,
+        events: Optional[Collection[str]] = None,
+        work_centers: Optional[Collection[str]] = None,
+        routers: Optional[Collection[int]] = None,
+        every: int = 1,
+    ) -> Subscription:
+        """Call ``handler(timestamp, event, planning_object)`` for matching events.
+
+        See ``Subscription`` for the filters.  Forks start without any of the
+        subscriptions of the factory they were forked from.
+        """
+        subscription = Subscription(handler, events, work_centers, routers, every)
+        self._subscriptions.append(subscription)
+        self._wire()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.remove(subscription)
+        self._wire()
+
+    def emit(self, timestamp: float, event: str, planning_object: Any) -> None:
+        """Dispatch an event to whoever subscribed to it."""
+        handler = self._dispatch[event]
+        if handler is not None:
+            handler(timestamp, event, planning_object)
+
+    def _advance_clock(self, priority: float) -> None:
+        """Move the clock to a completion time of the event queue."""
+        if self.time_base is None:
+            self.elapsed_hours = priority
+        else:
+            self.elapsed_ticks = priority
+            self.elapsed_hours = priority / self.time_base.ticks_per_hour
+
+    def _horizon(self, until_hours: Optional[float]) -> float:
+        """The last completion time of the event queue before a horizon."""
+        if until_hours is None:
+            return inf
+        if self.time_base is None:
+            return until_hours
+        return self.time_base.ticks_until(until_hours)
+
+    def _stop_at(self, horizon: float) -> None:
+        clock = self.elapsed_hours if self.time_base is None else self.elapsed_ticks
+        self._advance_clock(max(clock, horizon))
+
+    def register_work_center(self, work_center: "WorkCenter") -> None:
+        self.work_centers[work_center.name] = work_center
 
-    def add_work_in_progress(self, operation: RouterOperation) -> None:
+    def register_router(self, router: Router) -> None:
+        self.routers.append(router)
+
+    def fork(self, logger: Optional[EventLogger] = None) -> "Factory":
+        """Copy the simulation state into a factory that continues independently.
+
+        The fork gets its own event queue, work centers (with their queues,
+        slots and prioritizer state) and routers (with their positions), but
+        shares whatever is never changed in place, such as sequence indices and
+        operation data.  It logs to ``logger``, by default a new ``EventLogger``,
+        or to no logger when this factory has none.  Loggers are not copied, as
+        they may hold settings or resources such as open files.
+        """
+        profiling = self.profiler is not None and self.profiler.installed
+        if profiling:
+            # copies must not pick up the profiler's wrappers
+            self.disable_profiling()
+        memo: Dict[int, Any] = {}
+        fork = memo[id(self)] = copy(self)
+        fork._subscriptions = []
+        if logger is None and self.logger is not None:
+            logger = EventLogger()
+        fork.logger = logger
+        fork.profiler = None
+        fork.work_centers = {
+            name: work_center._fork(memo)
+            for name, work_center in self.work_centers.items()
+        }
+        fork.routers = [router._fork(memo) for router in self.routers]
+        for router in self.routers:
+            router._fork_operations(memo)
+
+        def fork_operation(operation: RouterOperation) -> RouterOperation:
+            return operation._fork(memo)
+
+        for work_center in self.work_centers.values():
+            memo[id(work_center)].queue = work_center.queue.remap(fork_operation)
+        fork.event_queue = self.event_queue.remap(fork_operation)
+        if profiling:
+            self.enable_profiling()
+        return fork
+
+    def snapshot(self) -> "FactorySnapshot":
+        """Capture the simulation state, to be forked any number of times."""
+        return FactorySnapshot(self.fork())
+
+    def enable_profiling(self) -> Profiler:
+        """Install counters and timers on the hot path, see ``Profiler``.
+
+        Profiling covers the work centers registered so far, and continues to
+        accumulate into the same profiler when enabled again after disabling.
+        """
+        if self.profiler is None:
+            self.profiler = Profiler()
+        if not self.profiler.installed:
+            self.profiler.install(self)
+            self._wire()
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """Remove the profiler from the hot path, keeping what it measured."""
+        if self.profiler is not None:
+            self.profiler.uninstall()
+            self._wire()
+
+    def profile_report(self) -> str:
+        if self.profiler is None:
+            raise RuntimeError("profiling has not been enabled")
+        return self.profiler.report()
+
+    def release(self) -> None:
+        """Queue the current operation of every registered router.
+
+        Intended to be called once, after the shop is built and before it is run.
+        """
+        for router in self.routers:
+            operation = router.current_operation
+            if operation is not None:
+                self.enqueue_at_workcenter(operation)
+
+    def add_work_in_progress(
+        self, operation: RouterOperation, finish: Optional[float] = None
+    ) -> None:
         """Queue up an in work operation from a workcenter.
         
         Events are prioritized according to their completion times, defined by
@@ -135,14 +621,25 @@ class Factory:
         the queue.  Incrementing the priority of new items by the elapsed time
         is analogous to decrementing the remaining time of all other operations
         in the queue, without the O(n) penalty upon every insertion.
+
+        Work centers with a shift calendar give the ``finish`` time themselves.
+        With a time base, durations and finish times are rounded to whole ticks.
         """
-        self.event_queue.put(
+        time_base = self.time_base
+        if time_base is not None:
+            if finish is None:
+                finish = self.elapsed_ticks + time_base.to_ticks(
+                    operation.wall_clock_hours
+                )
+            else:
+                finish = time_base.to_ticks(finish)
+        elif finish is None:
             # operation priority == time when work started + how long work will take
-            PrioritizedItem(operation.wall_clock_hours + self.elapsed_hours, operation)
-        )
-        self.logger.log_event(
-            self.elapsed_hours, EventLogger.OPERATION_STARTED, operation
-        )
+            finish = operation.wall_clock_hours + self.elapsed_hours
+        self.event_queue.put(PrioritizedItem(finish, operation))
+        on_started = self._on_started
+        if on_started is not None:
+            on_started(self.elapsed_hours, EventLogger.OPERATION_STARTED, operation)
 
     def complete_next(self) -> bool:
         """Move elapsed time to the next operation completion."""
@@ -150,9 +647,8 @@ class Factory:
             next_item = self.event_queue.get()
             completed_operation = next_item.item
 
-            time_worked = next_item.priority - self.elapsed_hours
-            self.elapsed_hours += time_worked
-            self.logger.log_event(
+            self._advance_clock(next_item.priority)
+            self.emit(
                 self.elapsed_hours, EventLogger.OPERATION_COMPLETED, completed_operation
             )
             completed_operation.router.advance()
@@ -160,13 +656,191 @@ class Factory:
             return True
         return False
 
+    def complete_batch(self) -> int:
+        """Complete every operation finishing at the next completion time at once.
+
+        The completions are logged and their slots freed first, then their
+        routers advance, queuing their next operations without starting them,
+        and finally each affected work center dispatches once, in the order
+        they were affected.  Every operation queued at the same time thus
+        competes for the freed slots by priority alone, however the event
+        queue orders coincident events.  Returns the number of operations
+        completed.
+        """
+        event_queue = self.event_queue
+        if event_queue.empty():
+            return 0
+        completion_time = event_queue.peek().priority
+        self._advance_clock(completion_time)
+        now = self.elapsed_hours
+        on_completed = self._on_completed
+        operation_completed = EventLogger.OPERATION_COMPLETED
+        completed = []
+        while event_queue and event_queue.peek().priority == completion_time:
+            operation = event_queue.get().item
+            if on_completed is not None:
+                on_completed(now, operation_completed, operation)
+            completed.append(operation)
+
+        pending = self._pending_dispatch = {}
+        try:
+            for operation in completed:
+                work_center = operation.work_center
+                work_center.available_slots += 1
+                pending[work_center] = None
+                operation.router.advance()
+        finally:
+            self._pending_dispatch = None
+        for work_center in pending:
+            work_center.dispatch()
+        return len(completed)
+
+    def _run_batches(
+        self,
+        until_hours: Optional[float],
+        max_events: Optional[int],
+        max_seconds: Optional[float],
+        stop_when: Optional[Callable[["Factory"], bool]],
+    ) -> "RunSummary":
+        event_queue = self.event_queue
+        horizon = self._horizon(until_hours)
+        event_limit = inf if max_events is None else max_events
+        start = perf_counter()
+        deadline = inf if max_seconds is None else start + max_seconds
+
+        processed = 0
+        stop_reason = "exhausted"
+        while event_queue:
+            if processed >= event_limit:
+                stop_reason = "max_events"
+                break
+            if event_queue.peek().priority > horizon:
+                self._stop_at(horizon)
+                stop_reason = "until_hours"
+                break
+            processed += self.complete_batch()
+            if stop_when is not None and stop_when(self):
+                stop_reason = "stop_when"
+                break
+            if perf_counter() > deadline:
+                stop_reason = "max_seconds"
+                break
+
+        return RunSummary(
+            events_processed=processed,
+            elapsed_hours=self.elapsed_hours,
+            wall_seconds=perf_counter() - start,
+            stop_reason=stop_reason,
+        )
+
+    def run(
+        self,
+        until_hours: Optional[float] = None,
+        max_events: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        stop_when: Optional[Callable[["Factory"], bool]] = None,
+    ) -> "RunSummary":
+        """Complete operations until the event queue empties or a limit is reached.
+
+        The run stops before completing any operation later than
+        ``until_hours`` (advancing the clock to the horizon), after
+        ``max_events`` completions, once ``max_seconds`` of wall time have passed,
+        or as soon as ``stop_when(factory)`` returns true after a completion.  All
+        state lives in the factory, so a later call resumes where this one
+        stopped.
+
+        With ``batch_coincident``, limits are checked between batches of
+        coincident completions, so ``max_events`` may be overshot.
+        """
+        if self.batch_coincident:
+            return self._run_batches(until_hours, max_events, max_seconds, stop_when)
+        event_queue = self.event_queue
+        get = event_queue.get
+        peek = event_queue.peek
+        on_completed = self._on_completed
+        operation_completed = EventLogger.OPERATION_COMPLETED
+        time_base = self.time_base
+        ticks_per_hour = None if time_base is None else time_base.ticks_per_hour
+        horizon = self._horizon(until_hours)
+        event_limit = inf if max_events is None else max_events
+        start = perf_counter()
+        deadline = inf if max_seconds is None else start + max_seconds
+
+        processed = 0
+        stop_reason = "exhausted"
+        while event_queue:
+            if processed >= event_limit:
+                stop_reason = "max_events"
+                break
+            if peek().priority > horizon:
+                self._stop_at(horizon)
+                stop_reason = "until_hours"
+                break
+
+            # inlined complete_next
+            next_item = get()
+            completed_operation = next_item.item
+            if ticks_per_hour is None:
+                self.elapsed_hours = next_item.priority
+            else:
+                self.elapsed_ticks = next_item.priority
+                self.elapsed_hours = next_item.priority / ticks_per_hour
+            if on_completed is not None:
+                on_completed(
+                    self.elapsed_hours, operation_completed, completed_operation
+                )
+            completed_operation.router.advance()
+            completed_operation.work_center.free_slot()
+            processed += 1
+
+            if stop_when is not None and stop_when(self):
+                stop_reason = "stop_when"
+                break
+            # only consult the clock every so often, it is comparatively costly
+            if not processed & 0x3FF and perf_counter() > deadline:
+                stop_reason = "max_seconds"
+                break
+
+        return RunSummary(
+            events_processed=processed,
+            elapsed_hours=self.elapsed_hours,
+            wall_seconds=perf_counter() - start,
+            stop_reason=stop_reason,
+        )
+
     def enqueue_at_workcenter(self, operation: RouterOperation) -> None:
         """Add an operation to its workcenter's queue."""
-        self.logger.log_event(
-            self.elapsed_hours, EventLogger.OPERATION_QUEUED, operation
-        )
-        operation.work_center.enqueue(operation)
+        on_queued = self._on_queued
+        if on_queued is not None:
+            on_queued(self.elapsed_hours, EventLogger.OPERATION_QUEUED, operation)
+        if self._pending_dispatch is None:
+            operation.work_center.enqueue(operation)
+        else:
+            operation.work_center.add_to_queue(operation)
+            self._pending_dispatch[operation.work_center] = None
 
     def notify_router_complete(self, router: Router) -> None:
         """Log the completion of a router."""
-        self.logger.log_event(self.elapsed_hours, EventLogger.ROUTER_COMPLETED, router)
+        on_router_completed = self._on_router_completed
+        if on_router_completed is not None:
+            on_router_completed(
+                self.elapsed_hours, EventLogger.ROUTER_COMPLETED, router
+            )
+
+
+class FactorySnapshot:
+    """Frozen simulation state of a factory at a point in time.
+
+    A snapshot is never run itself, each call to ``fork`` creates a new factory
+    that continues from the captured state.
+    """
+
+    def __init__(self, factory: Factory):
+        self._factory = factory
+
+    @property
+    def elapsed_hours(self) -> float:
+        return self._factory.elapsed_hours
+
+    def fork(self, logger: Optional[EventLogger] = None) -> Factory:
+        return self._factory.fork(logger)
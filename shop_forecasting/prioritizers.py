@@ -1,8 +1,12 @@
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
-from typing import Any
+from math import inf
+from typing import Any, Dict
 
+from shop_forecasting.util import slotted
 
+
+@slotted
 @dataclass(order=True)
 class PrioritizedItem:
     """Generic wrapper for any data, providing a field to indicate priority."""
@@ -14,6 +18,9 @@ class PrioritizedItem:
 class Prioritizer(ABC):
     """Interface definition that all prioritizers must implement."""
 
+    # whether priorities depend on the due_date of items
+    uses_due_date = False
+
     @abstractmethod
     def prioritize(self, prioritized_item: PrioritizedItem) -> None:
         pass
@@ -44,5 +51,120 @@ class EarliestDueDatePrioritizier(Prioritizer):
     that supports equality comparisons.
     """
 
+    uses_due_date = True
+
     def prioritize(self, prioritized_item: PrioritizedItem) -> None:
         prioritized_item.priority = prioritized_item.item.due_date
+
+
+def remaining_hours(operation: Any) -> float:
+    """Wall clock hours of an operation and those following it on its router."""
+    return sum(
+        following.wall_clock_hours
+        for sequence_number, following in operation.router.operations.items()
+        if sequence_number >= operation.sequence_number
+    )
+
+
+class TimeDependentPrioritizer(Prioritizer):
+    """Interface for prioritizers whose priorities change as time passes.
+
+    Work centers keep ``now`` up to date and re-evaluate the priorities of
+    their queued items with ``priority_at`` when dispatching, see
+    ``AddressableHeap.revalidate``.  Subclasses that can bound how fast the
+    priority of an item falls as time passes should override ``fall_rate``, so
+    that only items which may have reached the front of a queue need
+    re-evaluating.  Rules whose order of items never changes as time passes
+    need not be time dependent at all.
+
+    The work left on an item's router is evaluated once when the item is
+    prioritized, and kept by ``remaining_work`` until the work center calls
+    ``forget`` as the item leaves the queue.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._remaining: Dict[Any, float] = {}
+
+    def __copy__(self) -> "TimeDependentPrioritizer":
+        # copies serve forked work centers, whose items are copies as well
+        prioritizer = object.__new__(type(self))
+        prioritizer.__dict__.update(self.__dict__)
+        prioritizer._remaining = {}
+        return prioritizer
+
+    @abstractmethod
+    def priority_at(self, item: Any, now: float) -> float:
+        pass
+
+    def fall_rate(self, item: Any) -> float:
+        """How fast the priority of an item can fall per hour while it waits,
+        unbounded unless overridden."""
+        return inf
+
+    def remaining_work(self, item: Any) -> float:
+        """The ``remaining_hours`` of an item, as of when it was prioritized."""
+        try:
+            return self._remaining[item]
+        except KeyError:
+            work = self._remaining[item] = remaining_hours(item)
+            return work
+
+    def forget(self, item: Any) -> None:
+        """Drop what is kept about an item leaving the queue."""
+        self._remaining.pop(item, None)
+
+    def prioritize(self, prioritized_item: PrioritizedItem) -> None:
+        # items are prioritized when queued and when their data changes
+        self._remaining.pop(prioritized_item.item, None)
+        prioritized_item.priority = self.priority_at(prioritized_item.item, self.now)
+
+
+class CriticalRatioPrioritizer(TimeDependentPrioritizer):
+    """Prioritizes items by the time left until their due date relative to the
+    work left on their router, lower ratios being higher priority.
+
+    Relies on items having a numeric due_date, in simulation hours.
+    """
+
+    uses_due_date = True
+
+    def priority_at(self, item: Any, now: float) -> float:
+        work = self.remaining_work(item)
+        if work <= 0:
+            return item.due_date - now
+        return (item.due_date - now) / work
+
+    def fall_rate(self, item: Any) -> float:
+        work = self.remaining_work(item)
+        if work <= 0:
+            return 1.0
+        return 1.0 / work
+
+
+class LeastSlackPrioritizer(Prioritizer):
+    """Prioritizes items by slack, the time left until their due date less the
+    work left on their router, less slack being higher priority.
+
+    The slack of every queued item shrinks alike as time passes, so items are
+    ranked by their due date less the work left, which is their slack at hour
+    zero and never changes while they wait.
+
+    Relies on items having a numeric due_date, in simulation hours.
+    """
+
+    uses_due_date = True
+
+    def prioritize(self, prioritized_item: PrioritizedItem) -> None:
+        item = prioritized_item.item
+        prioritized_item.priority = item.due_date - remaining_hours(item)
+
+
+# prioritizers by the names used in configuration
+PRIORITIZERS: Dict[str, type] = {
+    "fifo": FifoPrioritizer,
+    "spt": ShortestProcessingTimePrioritizer,
+    "edd": EarliestDueDatePrioritizier,
+    "cr": CriticalRatioPrioritizer,
+    "slack": LeastSlackPrioritizer,
+}
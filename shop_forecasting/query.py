@@ -0,0 +1,226 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from shop_forecasting.sinks import MappedBinaryLog
+from shop_forecasting.util import (
+    ColumnarEventLogger,
+    EventLogger,
+    EventRecord,
+    describe,
+)
+
+
+class _Postings:
+    """Positions of the events under one key, with their timestamps."""
+
+    __slots__ = ("positions", "times", "_sorted")
+
+    def __init__(self):
+        self.positions = array("q")
+        self.times = array("d")
+        self._sorted = True
+
+    def add(self, position: int, timestamp: float) -> None:
+        if self.times and timestamp < self.times[-1]:
+            # logs appended to by several runs go back in time
+            self._sorted = False
+        self.positions.append(position)
+        self.times.append(timestamp)
+
+    def between(self, start: Optional[float], end: Optional[float]) -> Sequence[int]:
+        """Positions of the events from ``start`` up to but excluding ``end``."""
+        if not self._sorted:
+            order = sorted(range(len(self.times)), key=self.times.__getitem__)
+            self.positions = array("q", (self.positions[i] for i in order))
+            self.times = array("d", (self.times[i] for i in order))
+            self._sorted = True
+        low = 0 if start is None else bisect_left(self.times, start)
+        high = len(self.times) if end is None else bisect_left(self.times, end)
+        return self.positions[low:high]
+
+
+_EMPTY = _Postings()
+
+
+class EventIndex(EventLogger):
+    """Event positions by order number, work center and event type.
+
+    An index is built over a sequence of ``EventRecord`` rows, such as the
+    events of a ``ColumnarEventLogger`` or a ``MappedBinaryLog``, and only
+    reads the rows a query returns.  Used as a factory's logger, it keeps its
+    own rows and indexes them as they are logged.  Each key's positions are
+    kept with their timestamps, so time ranges are found by binary search;
+    ranges include their start and exclude their end.  Queries return events
+    in time order, and in the order they were logged at equal times.
+    """
+
+    _event_codes = {event: code for code, event in enumerate(EventLogger.EVENT_TYPES)}
+
+    def __init__(self, records: Optional[Sequence[EventRecord]] = None):
+        self.events: Sequence[EventRecord] = [] if records is None else records
+        self._all = _Postings()
+        self._codes = array("B")
+        self._orders: Dict[int, _Postings] = {}
+        self._work_centers: Dict[Optional[str], _Postings] = {}
+        self._event_types = [_Postings() for _ in EventLogger.EVENT_TYPES]
+        if records is not None:
+            event_codes = self._event_codes
+            for position, record in enumerate(records):
+                self._add(
+                    position,
+                    record.timestamp,
+                    event_codes[record.event],
+                    record.order_number,
+                    record.work_center,
+                )
+
+    @classmethod
+    def from_logger(cls, logger: EventLogger) -> "EventIndex":
+        """Index the events of a logger that kept them in memory."""
+        if isinstance(logger, ColumnarEventLogger):
+            return cls(logger.events)
+        return cls(
+            [
+                EventRecord(
+                    event["timestamp"],
+                    event["event"],
+                    *describe(event["planning_object"]),
+                )
+                for event in logger.events
+            ]
+        )
+
+    @classmethod
+    def open_binary(cls, path: str) -> "EventIndex":
+        """Index a binary log in place, reading it through a memory map.
+
+        Close the index once it is no longer needed.
+        """
+        log = MappedBinaryLog(path)
+        index = cls()
+        index.events = log
+        names = log.work_center_names
+        add = index._add
+        fields = enumerate(log.iter_fields())
+        for position, (timestamp, code, order_number, _, work_center_id) in fields:
+            add(
+                position,
+                timestamp,
+                code,
+                order_number,
+                names[work_center_id] if work_center_id >= 0 else None,
+            )
+        return index
+
+    def close(self) -> None:
+        if isinstance(self.events, MappedBinaryLog):
+            self.events.close()
+
+    def __enter__(self) -> "EventIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _add(
+        self,
+        position: int,
+        timestamp: float,
+        code: int,
+        order_number: int,
+        work_center: Optional[str],
+    ) -> None:
+        self._all.add(position, timestamp)
+        self._codes.append(code)
+        self._event_types[code].add(position, timestamp)
+        try:
+            self._orders[order_number].add(position, timestamp)
+        except KeyError:
+            postings = self._orders[order_number] = _Postings()
+            postings.add(position, timestamp)
+        if work_center is not None:
+            try:
+                self._work_centers[work_center].add(position, timestamp)
+            except KeyError:
+                postings = self._work_centers[work_center] = _Postings()
+                postings.add(position, timestamp)
+
+    def log_event(self, timestamp, event, planning_object):
+        record = EventRecord(timestamp, event, *describe(planning_object))
+        self._add(
+            len(self.events),
+            timestamp,
+            self._event_codes[event],
+            record.order_number,
+            record.work_center,
+        )
+        self.events.append(record)
+
+    def _records(
+        self, positions: Iterable[int], event: Optional[str] = None
+    ) -> List[EventRecord]:
+        events = self.events
+        if event is None:
+            return [events[position] for position in positions]
+        codes = self._codes
+        code = self._event_codes[event]
+        return [events[position] for position in positions if codes[position] == code]
+
+    def between(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> List[EventRecord]:
+        """Every event in a time range."""
+        return self._records(self._all.between(start, end))
+
+    def order(
+        self,
+        order_number: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        event: Optional[str] = None,
+    ) -> List[EventRecord]:
+        """The events of an order and its operations, optionally of one type."""
+        postings = self._orders.get(order_number, _EMPTY)
+        return self._records(postings.between(start, end), event)
+
+    def work_center(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        event: Optional[str] = None,
+    ) -> List[EventRecord]:
+        """The events of operations at a work center, optionally of one type."""
+        postings = self._work_centers.get(name, _EMPTY)
+        return self._records(postings.between(start, end), event)
+
+    def of_type(
+        self, event: str, start: Optional[float] = None, end: Optional[float] = None
+    ) -> List[EventRecord]:
+        """The events of one type."""
+        postings = self._event_types[self._event_codes[event]]
+        return self._records(postings.between(start, end))
+
+    def completion(self, order_number: int) -> Optional[float]:
+        """The time an order's router completed, None if it never did."""
+        postings = self._orders.get(order_number, _EMPTY)
+        codes = self._codes
+        code = self._event_codes[EventLogger.ROUTER_COMPLETED]
+        completions = [
+            timestamp
+            for position, timestamp in zip(postings.positions, postings.times)
+            if codes[position] == code
+        ]
+        return max(completions, default=None)
+
+    @property
+    def order_numbers(self) -> List[int]:
+        return list(self._orders)
+
+    @property
+    def work_center_names(self) -> List[str]:
+        return list(self._work_centers)
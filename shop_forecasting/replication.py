@@ -0,0 +1,205 @@
+import os
+import pickle
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from random import Random
+from typing import Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from shop_forecasting.planning_objects import Factory
+from shop_forecasting.stats import P2Quantile, RunningStats
+from shop_forecasting.util import CompletionLogger
+
+# operations are identified by (order number, sequence number)
+OperationKey = Tuple[int, int]
+
+
+class Distribution(ABC):
+    """Interface definition for the distribution of an operation's hours."""
+
+    @abstractmethod
+    def sample(self, rng: Random, nominal_hours: float) -> float:
+        """Draw workcenter hours, given the hours the router specifies."""
+
+
+@dataclass
+class Uniform(Distribution):
+    """Hours drawn uniformly between two bounds."""
+
+    low: float
+    high: float
+
+    def sample(self, rng: Random, nominal_hours: float) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass
+class Triangular(Distribution):
+    """Hours drawn from a triangular distribution."""
+
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng: Random, nominal_hours: float) -> float:
+        return rng.triangular(self.low, self.high, self.mode)
+
+
+@dataclass
+class RelativeTriangular(Distribution):
+    """A triangular distribution scaled by the operation's nominal hours.
+
+    The defaults describe an operation that is rarely faster than planned but
+    may run up to half again as long.
+    """
+
+    low: float = 0.9
+    mode: float = 1.0
+    high: float = 1.5
+
+    def sample(self, rng: Random, nominal_hours: float) -> float:
+        return nominal_hours * rng.triangular(self.low, self.high, self.mode)
+
+
+@dataclass
+class LogNormal(Distribution):
+    """Hours drawn from a log-normal distribution with the given parameters."""
+
+    mu: float
+    sigma: float
+
+    def sample(self, rng: Random, nominal_hours: float) -> float:
+        return rng.lognormvariate(self.mu, self.sigma)
+
+
+@dataclass
+class OrderForecast:
+    """Distribution of one order's completion time across replications."""
+
+    order_number: int
+    completion: RunningStats = field(default_factory=RunningStats)
+    quantiles: Dict[float, P2Quantile] = field(default_factory=dict)
+
+    def add(self, completion_hours: float) -> None:
+        self.completion.add(completion_hours)
+        for estimator in self.quantiles.values():
+            estimator.add(completion_hours)
+
+    def quantile(self, p: float) -> float:
+        return self.quantiles[p].value
+
+
+@dataclass
+class ReplicationResult:
+    """Per-order completion forecasts aggregated over all replications."""
+
+    replications: int
+    base_seed: int
+    orders: Dict[int, OrderForecast]
+
+
+def replication_rng(base_seed: int, replication: int) -> Random:
+    """The random number generator of one replication.
+
+    Seeding from a string is stable across processes and Python runs, so a
+    replication draws the same hours whichever worker runs it.
+    """
+    return Random("{}:{}".format(base_seed, replication))
+
+
+def sample_hours(
+    factory: Factory,
+    rng: Random,
+    durations: Mapping[OperationKey, Distribution],
+    default: Optional[Distribution] = None,
+) -> None:
+    """Replace the hours of every registered operation with a random draw.
+
+    Operations without a distribution of their own use the default, or keep
+    their hours when there is no default.
+    """
+    for router in factory.routers:
+        for sequence_number in sorted(router.operations):
+            operation = router.operations[sequence_number]
+            distribution = durations.get(
+                (router.order_number, sequence_number), default
+            )
+            if distribution is not None:
+                operation.hours = distribution.sample(rng, operation.hours)
+
+
+# set once per worker process by _load_model
+_worker_payload: Optional[bytes] = None
+
+
+def _load_model(payload: bytes) -> None:
+    global _worker_payload
+    _worker_payload = payload
+
+
+def _replicate(base_seed: int, replications: range) -> List[Dict[int, float]]:
+    """Run replications of the worker's model, returning their completion times."""
+    results = []
+    for replication in replications:
+        factory, durations, default = pickle.loads(_worker_payload)
+        rng = replication_rng(base_seed, replication)
+        sample_hours(factory, rng, durations, default)
+        logger = factory.logger = CompletionLogger()
+        factory.release()
+        factory.run()
+        results.append(logger.completions)
+    return results
+
+
+def replicate(
+    factory: Factory,
+    replications: int,
+    durations: Optional[Mapping[OperationKey, Distribution]] = None,
+    default: Optional[Distribution] = None,
+    base_seed: int = 0,
+    quantiles: Sequence[float] = (0.5, 0.9),
+    max_workers: Optional[int] = None,
+    chunksize: int = 16,
+) -> ReplicationResult:
+    """Forecast order completion times over seeded Monte Carlo replications.
+
+    ``factory`` must be an unreleased shop model.  It is pickled once and handed
+    to each worker process when it starts; every replication then rebuilds a
+    fresh copy, samples operation hours, releases the routers and runs to
+    completion.  Replications are dispatched in chunks with a bounded number in
+    flight, and their results are folded into streaming estimators in
+    replication order, so memory depends on the number of orders only and a
+    given base seed always yields the same forecast.
+    """
+    payload = pickle.dumps((factory, dict(durations or {}), default))
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    orders: Dict[int, OrderForecast] = {}
+
+    def aggregate(completions: Dict[int, float]) -> None:
+        for order_number, completion_hours in completions.items():
+            try:
+                forecast = orders[order_number]
+            except KeyError:
+                forecast = orders[order_number] = OrderForecast(
+                    order_number, quantiles={p: P2Quantile(p) for p in quantiles}
+                )
+            forecast.add(completion_hours)
+
+    chunks = (
+        range(start, min(start + chunksize, replications))
+        for start in range(0, replications, chunksize)
+    )
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_load_model, initargs=(payload,)
+    ) as executor:
+        in_flight: Deque[Future] = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_replicate, base_seed, chunk))
+            if len(in_flight) >= window:
+                for completions in in_flight.popleft().result():
+                    aggregate(completions)
+        while in_flight:
+            for completions in in_flight.popleft().result():
+                aggregate(completions)
+    return ReplicationResult(replications, base_seed, orders)
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Mapping, Optional
+
+from shop_forecasting.planning_objects import Factory, Router, RouterOperation
+from shop_forecasting.util import CompletionLogger, EventLogger
+
+
+def _run_to_completion(factory: Factory) -> Dict[int, float]:
+    factory.run()
+    return factory.logger.completions
+
+
+class ForecastService:
+    """A live simulation of the shop floor answering completion time queries.
+
+    The service's factory holds the current state of the floor: it is advanced
+    as the clock moves and updated as orders are released, operations are
+    reported complete and due dates change.  Completion times are forecast by
+    running a fork of the current state to the end in an executor (the event
+    loop's default executor unless given), so a forecast only simulates what
+    remains.
+
+    Each update starts a new forecast unless one is already running, in which
+    case all updates arriving meanwhile are covered by a single forecast after
+    it.  Queries wait for a forecast covering every update applied before them.
+
+    The factory must be released, and the service replaces its logger with a
+    ``CompletionLogger`` to remember the orders already completed.
+    """
+
+    def __init__(self, factory: Factory, executor: Optional[Executor] = None):
+        self.factory = factory
+        self.factory.logger = CompletionLogger()
+        self.executor = executor
+        self.version = 0
+        self.forecast: Dict[int, float] = {}
+        self.forecast_version = -1
+        self.forecasts_run = 0
+        self._routers = {router.order_number: router for router in factory.routers}
+        self._task: Optional[asyncio.Task] = None
+        self._updates = {
+            "advance": self.advance,
+            "release": self.release,
+            "complete": self.complete,
+            "due_date": self.set_due_date,
+        }
+
+    def _updated(self) -> None:
+        self.version += 1
+        if self._task is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # outside an event loop, the next query starts the forecast
+                return
+            self._task = loop.create_task(self._reforecast())
+
+    async def _reforecast(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self.forecast_version < self.version:
+                version = self.version
+                fork = self.factory.fork(CompletionLogger())
+                completions = await loop.run_in_executor(
+                    self.executor, _run_to_completion, fork
+                )
+                self.forecast = {**self.factory.logger.completions, **completions}
+                self.forecast_version = version
+                self.forecasts_run += 1
+        finally:
+            self._task = None
+
+    async def refresh(self) -> None:
+        """Wait for a forecast covering every update applied so far."""
+        while self.forecast_version < self.version:
+            if self._task is None:
+                self._task = asyncio.get_running_loop().create_task(
+                    self._reforecast()
+                )
+            await asyncio.shield(self._task)
+
+    async def completion(self, order_number: int) -> Optional[float]:
+        """Forecast completion time of an order, in hours from clock zero."""
+        await self.refresh()
+        return self.forecast.get(order_number)
+
+    def advance(self, until_hours: float) -> None:
+        """Move the floor's clock forward to ``until_hours``, simulating what
+        happens meanwhile."""
+        self.factory.run(until_hours=until_hours)
+        self._updated()
+
+    def release(
+        self,
+        order_number: int,
+        operations: List[Mapping[str, Any]],
+        item_number: int = 0,
+    ) -> None:
+        """Release a new order, given its operations as mappings of a
+        sequence_number, work_center name, hours and optionally a due_date."""
+        if order_number in self._routers:
+            raise ValueError("order {} already released".format(order_number))
+        work_centers = self.factory.work_centers
+        router = Router(
+            operations={},
+            current_sequence=min(row["sequence_number"] for row in operations),
+            factory=self.factory,
+            item_number=item_number,
+            order_number=order_number,
+        )
+        for row in operations:
+            operation = RouterOperation(
+                work_centers[row["work_center"]],
+                router,
+                row["sequence_number"],
+                row["hours"],
+            )
+            if "due_date" in row:
+                operation.due_date = row["due_date"]
+            router.operations[operation.sequence_number] = operation
+        self._routers[order_number] = router
+        self.factory.enqueue_at_workcenter(router.current_operation)
+        self._updated()
+
+    def complete(
+        self,
+        order_number: int,
+        sequence_number: int,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Record an operation reported complete by the floor, advancing the
+        clock to ``timestamp`` first when given.
+
+        An operation the simulation already completed is ignored, one the
+        order has not yet reached is an error.
+        """
+        if timestamp is not None:
+            self.factory.run(until_hours=timestamp)
+        router = self._routers[order_number]
+        operation = router.current_operation
+        if operation is None or operation.sequence_number > sequence_number:
+            self._updated()
+            return
+        if operation.sequence_number < sequence_number:
+            raise ValueError(
+                "order {} has not reached operation {}".format(
+                    order_number, sequence_number
+                )
+            )
+
+        factory = self.factory
+        try:
+            factory.event_queue.remove(operation)
+            in_work = True
+        except ValueError:
+            operation.work_center.withdraw(operation)
+            in_work = False
+        factory.emit(factory.elapsed_hours, EventLogger.OPERATION_COMPLETED, operation)
+        router.advance()
+        if in_work:
+            operation.work_center.free_slot()
+        self._updated()
+
+    def set_due_date(
+        self, order_number: int, due_date: float, sequence_number: Optional[int] = None
+    ) -> None:
+        """Change the due date of an order's operations, or of one of them."""
+        router = self._routers[order_number]
+        current = router.current_operation
+        for operation in router.operations.values():
+            if sequence_number is None or operation.sequence_number == sequence_number:
+                operation.due_date = due_date
+                prioritizer = operation.work_center.prioritizer
+                if (
+                    operation == current
+                    and prioritizer is not None
+                    and prioritizer.uses_due_date
+                ):
+                    try:
+                        operation.work_center.reprioritize(operation)
+                    except ValueError:
+                        # in work rather than queued
+                        pass
+        self._updated()
+
+    async def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply an update or answer a query given as a decoded JSON message.
+
+        Messages name their ``type``, one of "query" (with an order_number),
+        "advance", "release", "complete" or "due_date", with the remaining
+        fields as the arguments of the corresponding method.
+        """
+        message = dict(message)
+        kind = message.pop("type")
+        if kind == "query":
+            order_number = message["order_number"]
+            return {
+                "type": "forecast",
+                "order_number": order_number,
+                "completion_hours": await self.completion(order_number),
+                "clock_hours": self.factory.elapsed_hours,
+            }
+        try:
+            update = self._updates[kind]
+        except KeyError:
+            raise ValueError("unknown message type {!r}".format(kind)) from None
+        update(**message)
+        return {"type": "ack", "version": self.version}
+
+    async def serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer newline-delimited JSON messages until the stream ends."""
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    reply = await self.handle(json.loads(line))
+                except (KeyError, TypeError, ValueError) as error:
+                    reply = {"type": "error", "message": str(error)}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve_stdio(service: ForecastService) -> None:
+    """Serve newline-delimited JSON messages from stdin, replying on stdout."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    await service.serve(reader, writer)
+
+
+async def start_unix_server(
+    service: ForecastService, path: str
+) -> asyncio.AbstractServer:
+    """Serve newline-delimited JSON messages to clients of a local socket."""
+    return await asyncio.start_unix_server(service.serve, path)
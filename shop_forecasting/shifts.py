@@ -0,0 +1,176 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+HOURS_PER_WEEK = 168.0
+
+
+class Shift(NamedTuple):
+    """Working hours within a repeating period, at a rate of work per clock hour.
+
+    A shift ending before it starts runs over the end of the period.
+    """
+
+    start: float
+    end: float
+    rate: float = 1.0
+
+
+class ShiftCalendar:
+    """The working time of a work center: repeating shifts less planned downtime.
+
+    Shifts repeat every ``period`` clock hours (a week by default), with clock
+    zero falling ``offset`` hours into the period.  Downtime windows are given
+    as (start, end) clock hours and may overlap.
+
+    The calendar converts hours of work starting at a clock time into the
+    clock time the work finishes.  The pattern of a single period is stored as
+    breakpoints of cumulative working capacity, as is the capacity lost to each
+    downtime window, so a conversion takes two binary searches however long the
+    horizon and however many windows there are.
+    """
+
+    def __init__(
+        self,
+        shifts: Iterable[Tuple[float, ...]],
+        downtime: Iterable[Tuple[float, float]] = (),
+        period: float = HOURS_PER_WEEK,
+        offset: float = 0.0,
+    ):
+        self.period = period
+        self.offset = offset
+        self.shifts = [Shift(*shift) for shift in shifts]
+        self._build_pattern()
+        self._origin = self._periodic_capacity(offset)
+        self._build_downtime(downtime)
+
+    @classmethod
+    def weekdays(
+        cls,
+        shifts: Sequence[Tuple[float, ...]],
+        days: Iterable[int] = range(5),
+        downtime: Iterable[Tuple[float, float]] = (),
+        offset: float = 0.0,
+    ) -> "ShiftCalendar":
+        """The same daily shifts (in hours of the day) on each of some days of
+        the week, numbered from zero.  Shifts ending before they start end on
+        the following day."""
+        return cls(
+            [
+                Shift(
+                    24 * day + start,
+                    (24 * day + end + (24 if end <= start else 0)) % HOURS_PER_WEEK,
+                    *rate,
+                )
+                for day in days
+                for start, end, *rate in shifts
+            ],
+            downtime,
+            offset=offset,
+        )
+
+    def _build_pattern(self) -> None:
+        segments = []
+        for start, end, rate in self.shifts:
+            if not (0 <= start < self.period and 0 <= end <= self.period):
+                raise ValueError("shift {} outside the period".format((start, end)))
+            if end > start:
+                segments.append((start, end, rate))
+            else:
+                segments.append((start, self.period, rate))
+                if end > 0:
+                    segments.append((0.0, end, rate))
+        segments.sort()
+
+        # capacity[i] is the work available from the start of the period to
+        # times[i], rates[i] applies from times[i] until times[i + 1]
+        self._times: List[float] = [0.0]
+        self._capacity: List[float] = [0.0]
+        self._rates: List[float] = []
+        for start, end, rate in segments:
+            if start < self._times[-1]:
+                raise ValueError("shifts overlap at {}".format(start))
+            if start > self._times[-1]:
+                self._add_segment(start, 0.0)
+            self._add_segment(end, rate)
+        if self._times[-1] < self.period:
+            self._add_segment(self.period, 0.0)
+        self.capacity_per_period = self._capacity[-1]
+        if self.capacity_per_period <= 0:
+            raise ValueError("shifts provide no working time")
+
+    def _add_segment(self, end: float, rate: float) -> None:
+        self._rates.append(rate)
+        self._capacity.append(self._capacity[-1] + rate * (end - self._times[-1]))
+        self._times.append(end)
+
+    def _build_downtime(self, downtime: Iterable[Tuple[float, float]]) -> None:
+        merged: List[List[float]] = []
+        for start, end in sorted(downtime):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            elif end > start:
+                merged.append([start, end])
+        self._down_starts = [start for start, _ in merged]
+        self._down_ends = [end for _, end in merged]
+        # capacity lost to the windows before each window, and the capacity
+        # available from clock zero to the start of each window
+        self._lost_before = [0.0]
+        self._available_at_down_start = []
+        for start, end in merged:
+            start_capacity = self._capacity_without_downtime(start)
+            self._available_at_down_start.append(start_capacity - self._lost_before[-1])
+            lost = self._capacity_without_downtime(end) - start_capacity
+            self._lost_before.append(self._lost_before[-1] + lost)
+
+    def _periodic_capacity(self, t: float) -> float:
+        """Work available from the start of the first period to ``t``."""
+        periods, t = divmod(t, self.period)
+        i = bisect_right(self._times, t) - 1
+        return (
+            periods * self.capacity_per_period
+            + self._capacity[i]
+            + self._rates[i] * (t - self._times[i])
+        )
+
+    def _periodic_time(self, capacity: float) -> float:
+        """The earliest time ``capacity`` work is available from the start of
+        the first period."""
+        periods, capacity = divmod(capacity, self.capacity_per_period)
+        if capacity == 0 and periods > 0:
+            # finishing at the end of the last shift of the previous period
+            periods -= 1
+            capacity = self.capacity_per_period
+        i = bisect_left(self._capacity, capacity)
+        if i == 0:
+            return periods * self.period
+        i -= 1
+        return (
+            periods * self.period
+            + self._times[i]
+            + (capacity - self._capacity[i]) / self._rates[i]
+        )
+
+    def _capacity_without_downtime(self, t: float) -> float:
+        return self._periodic_capacity(t + self.offset) - self._origin
+
+    def available_hours(self, t: float) -> float:
+        """Hours of work available from clock zero to clock time ``t``."""
+        k = bisect_right(self._down_starts, t) - 1
+        if k < 0:
+            return self._capacity_without_downtime(t)
+        if t < self._down_ends[k]:
+            return self._available_at_down_start[k]
+        return self._capacity_without_downtime(t) - self._lost_before[k + 1]
+
+    def finish_time(self, start: float, hours: float) -> float:
+        """The clock time ``hours`` of work starting at clock time ``start`` ends."""
+        if hours <= 0:
+            return start
+        target = self.available_hours(start) + hours
+        # the work finishes before the first downtime window it has not
+        # finished by the start of
+        k = bisect_left(self._available_at_down_start, target)
+        return (
+            self._periodic_time(target + self._lost_before[k] + self._origin)
+            - self.offset
+        )
@@ -0,0 +1,222 @@
+import json
+import mmap
+import os
+import struct
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Tuple
+
+from shop_forecasting.util import EventLogger, EventRecord, describe
+
+
+class EventSink(ABC):
+    """Interface definition for loggers that stream events out of the process.
+
+    Sinks buffer events in fixed-size batches and append each full batch to a
+    file, so memory use stays flat however long the simulation runs.  A sink may
+    be handed to a factory in place of an ``EventLogger`` and should be closed
+    (or used as a context manager) once the simulation finishes.
+    """
+
+    def __init__(self, path: str, batch_size: int = 4096):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[EventRecord] = []
+
+    def log_event(self, timestamp, event, planning_object):
+        self._buffer.append(EventRecord(timestamp, event, *describe(planning_object)))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered events to the file."""
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer = []
+
+    @abstractmethod
+    def _write(self, records: List[EventRecord]) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonLinesEventSink(EventSink):
+    """Appends events to a newline-delimited JSON file, one object per event."""
+
+    def __init__(self, path: str, batch_size: int = 4096):
+        super().__init__(path, batch_size)
+        self._file = open(path, "a")
+
+    def _write(self, records: List[EventRecord]) -> None:
+        self._file.writelines(json.dumps(record._asdict()) + "\n" for record in records)
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+def read_json_lines(path: str) -> Iterator[EventRecord]:
+    """Stream the events of a newline-delimited JSON log."""
+    with open(path) as json_file:
+        for line in json_file:
+            if line.strip():
+                yield EventRecord(**json.loads(line))
+
+
+# timestamp, event code, order number, sequence number, work center id
+BINARY_RECORD = struct.Struct("<dBqii")
+
+
+def names_path(path: str) -> str:
+    """Path of the file holding a binary log's work center names."""
+    return path + ".names"
+
+
+def read_names(path: str) -> List[str]:
+    """Work center names of a binary log, indexed by work center id."""
+    if not os.path.exists(names_path(path)):
+        return []
+    with open(names_path(path)) as names_file:
+        return names_file.read().splitlines()
+
+
+class BinaryEventSink(EventSink):
+    """Appends events to a file of fixed-size binary records.
+
+    Each record packs a timestamp, event code, order number, sequence number and
+    work center id into ``BINARY_RECORD.size`` bytes.  Work center names are
+    appended to a companion ``.names`` file the first time they are seen, a
+    name's id being its line number.
+    """
+
+    def __init__(self, path: str, batch_size: int = 4096):
+        super().__init__(path, batch_size)
+        self._work_center_ids: Dict[str, int] = {
+            name: i for i, name in enumerate(read_names(path))
+        }
+        self._event_codes = {
+            event: code for code, event in enumerate(EventLogger.EVENT_TYPES)
+        }
+        self._file = open(path, "ab")
+        self._names_file = open(names_path(path), "a")
+
+    def _work_center_id(self, name) -> int:
+        if name is None:
+            return -1
+        try:
+            return self._work_center_ids[name]
+        except KeyError:
+            work_center_id = self._work_center_ids[name] = len(self._work_center_ids)
+            self._names_file.write(name + "\n")
+            return work_center_id
+
+    def _write(self, records: List[EventRecord]) -> None:
+        pack = BINARY_RECORD.pack
+        event_codes = self._event_codes
+        self._file.write(
+            b"".join(
+                pack(
+                    record.timestamp,
+                    event_codes[record.event],
+                    record.order_number,
+                    record.sequence_number,
+                    self._work_center_id(record.work_center),
+                )
+                for record in records
+            )
+        )
+        # names must be on disk before the records that refer to them
+        self._names_file.flush()
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+        self._names_file.close()
+
+
+def unpack_record(fields: tuple, work_center_names: List[str]) -> EventRecord:
+    """Convert the fields of a binary record into an ``EventRecord``."""
+    timestamp, code, order_number, sequence_number, work_center_id = fields
+    return EventRecord(
+        timestamp,
+        EventLogger.EVENT_TYPES[code],
+        order_number,
+        sequence_number,
+        work_center_names[work_center_id] if work_center_id >= 0 else None,
+    )
+
+
+def read_binary(path: str, batch_size: int = 4096) -> Iterator[EventRecord]:
+    """Stream the events of a binary log, reading a batch of records at a time."""
+    work_center_names = read_names(path)
+    with open(path, "rb") as binary_file:
+        while True:
+            chunk = binary_file.read(BINARY_RECORD.size * batch_size)
+            if not chunk:
+                return
+            for fields in BINARY_RECORD.iter_unpack(chunk):
+                yield unpack_record(fields, work_center_names)
+
+
+class MappedBinaryLog(Sequence):
+    """A binary log read through a memory map, as a sequence of ``EventRecord``.
+
+    Records are unpacked only when accessed, so any part of a log may be read
+    without loading the rest.  The log should be closed (or used as a context
+    manager) once no longer needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.work_center_names = read_names(path)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._length = size // BINARY_RECORD.size
+        # empty files cannot be mapped
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("event index out of range")
+        return unpack_record(
+            BINARY_RECORD.unpack_from(self._map, i * BINARY_RECORD.size),
+            self.work_center_names,
+        )
+
+    def iter_fields(self) -> Iterator[Tuple]:
+        """The unpacked fields of every record, in order."""
+        view = memoryview(self._map)[: self._length * BINARY_RECORD.size]
+        try:
+            yield from BINARY_RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedBinaryLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
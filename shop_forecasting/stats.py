@@ -0,0 +1,123 @@
+from math import sqrt
+from typing import List
+
+
+class RunningStats:
+    """Count, mean, variance and range of a stream of values in O(1) memory.
+
+    Uses Welford's online algorithm, which stays numerically stable over long
+    streams.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def __repr__(self) -> str:
+        return "RunningStats (Count [{}], Mean [{}], StdDev [{}])".format(
+            self.count, self.mean, self.std_dev
+        )
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the values seen so far."""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std_dev(self) -> float:
+        return sqrt(self.variance)
+
+
+class P2Quantile:
+    """Streaming estimate of a single quantile in O(1) memory.
+
+    Implements the P-squared algorithm (Jain & Chlamtac, 1985), which tracks
+    five markers whose heights approximate the minimum, the p/2, p and (1+p)/2
+    quantiles and the maximum.  The estimate is exact for fewer than five values.
+    """
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError("quantile must be between 0 and 1, got {}".format(p))
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+
+        positions = self._positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            offset = self._desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self) -> float:
+        """The current quantile estimate."""
+        if not self.count:
+            raise ValueError("no values have been added")
+        if self.count <= 5:
+            # linear interpolation between the closest ranks
+            rank = self.p * (self.count - 1)
+            below = int(rank)
+            above = min(below + 1, self.count - 1)
+            fraction = rank - below
+            heights = self._heights
+            return heights[below] + fraction * (heights[above] - heights[below])
+        return self._heights[2]
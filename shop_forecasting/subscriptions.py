@@ -0,0 +1,73 @@
+from typing import Any, Callable, Collection, Optional, Sequence
+
+from shop_forecasting.util import EventLogger
+
+# called with (timestamp, event, planning_object), like EventLogger.log_event
+Handler = Callable[[float, str, Any], None]
+
+
+class Subscription:
+    """A handler receiving the events of a factory that match its filters.
+
+    Events are filtered by type, by the name of the operation's work center
+    and by order number; a filter left as ``None`` matches everything, while
+    router events never match a work center filter.  Of the matching events,
+    only every ``every``-th is delivered, starting with the first.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        events: Optional[Collection[str]] = None,
+        work_centers: Optional[Collection[str]] = None,
+        routers: Optional[Collection[int]] = None,
+        every: int = 1,
+    ):
+        if every < 1:
+            raise ValueError("every must be at least 1, got {}".format(every))
+        unknown = set(events or ()).difference(EventLogger.EVENT_TYPES)
+        if unknown:
+            raise ValueError("unknown events: {}".format(", ".join(sorted(unknown))))
+        self.handler = handler
+        self.events = EventLogger.EVENT_TYPES if events is None else tuple(events)
+        self.work_centers = None if work_centers is None else frozenset(work_centers)
+        self.routers = None if routers is None else frozenset(routers)
+        self.every = every
+        self.matched = 0
+
+    @property
+    def filtered(self) -> bool:
+        return not (
+            self.work_centers is None and self.routers is None and self.every == 1
+        )
+
+    def __call__(self, timestamp: float, event: str, planning_object: Any) -> None:
+        router = getattr(planning_object, "router", None)
+        if self.work_centers is not None:
+            if router is None:
+                return
+            if planning_object.work_center.name not in self.work_centers:
+                return
+        if self.routers is not None:
+            order_number = (router or planning_object).order_number
+            if order_number not in self.routers:
+                return
+        self.matched += 1
+        if (self.matched - 1) % self.every:
+            return
+        self.handler(timestamp, event, planning_object)
+
+
+def fan_out(handlers: Sequence[Handler]) -> Optional[Handler]:
+    """A single handler calling every one of ``handlers``, or None for none."""
+    if not handlers:
+        return None
+    if len(handlers) == 1:
+        return handlers[0]
+    handlers = tuple(handlers)
+
+    def call_each(timestamp: float, event: str, planning_object: Any) -> None:
+        for handler in handlers:
+            handler(timestamp, event, planning_object)
+
+    return call_each
@@ -0,0 +1,223 @@
+import csv
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from math import inf
+from multiprocessing import Value
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from shop_forecasting.compact import StoredOperations
+from shop_forecasting.kpis import KpiTracker
+from shop_forecasting.planning_objects import DelayWorkCenter, Factory
+from shop_forecasting.prioritizers import PRIORITIZERS
+
+# work center settings a variant may override, "*" overrides every work center
+SETTINGS = ("num_slots", "time_passage_ratio", "prioritizer", "shift_calendar")
+# settings a DelayWorkCenter has no use for
+DELAY_IGNORES = ("num_slots", "prioritizer")
+ALL_WORK_CENTERS = "*"
+
+Overrides = Mapping[str, Mapping[str, Any]]
+
+
+@dataclass
+class Variant:
+    """One configuration of a sweep, as settings by work center name.
+
+    Prioritizers may be given by their name in ``PRIORITIZERS`` or as instances.
+    """
+
+    name: str
+    overrides: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class SweepResult:
+    """A table of KPIs with one row per variant, in the order of the variants.
+
+    Variants cancelled as dominated have a stop reason of "dominated" and KPIs
+    only up to the point they were cancelled.
+    """
+
+    rows: List[Dict[str, Any]]
+
+    def best(self, kpi: str = "makespan") -> Dict[str, Any]:
+        """The completed variant with the lowest value of a KPI."""
+        completed = [row for row in self.rows if row["stop_reason"] == "exhausted"]
+        return min(completed, key=lambda row: row[kpi])
+
+    def to_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(self.rows[0]))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+def grid(axes: Mapping[Tuple[str, str], Sequence[Any]]) -> List[Variant]:
+    """Every combination of values of (work center, setting) pairs.
+
+    For example ``grid({("*", "prioritizer"): ["fifo", "spt"], ("saw",
+    "num_slots"): [1, 2]})`` gives four variants.
+    """
+    keys = list(axes)
+    variants = []
+    for values in product(*(axes[key] for key in keys)):
+        overrides: Dict[str, Dict[str, Any]] = {}
+        for (work_center, setting), value in zip(keys, values):
+            overrides.setdefault(work_center, {})[setting] = value
+        name = ",".join(
+            "{}.{}={}".format(work_center, setting, value)
+            for (work_center, setting), value in zip(keys, values)
+        )
+        variants.append(Variant(name, overrides))
+    return variants
+
+
+def _refresh_stores(factory: Factory, work_centers: set) -> None:
+    """Recompute the wall clock hours of operation stores visiting work centers
+    whose time ratio changed."""
+    stores = {}
+    for router in factory.routers:
+        if isinstance(router.operations, StoredOperations):
+            store = router.operations._store
+            stores[id(store)] = store
+    for store in stores.values():
+        if not work_centers.isdisjoint(store.work_centers):
+            store.refresh()
+
+
+def apply_overrides(factory: Factory, overrides: Overrides) -> None:
+    """Change work center settings of an unreleased factory.
+
+    Delay work centers neither queue operations nor limit how many are in
+    work, so overriding their ``DELAY_IGNORES`` settings by name raises
+    ``ValueError``, and overrides of every work center skip them.
+    """
+    retimed = set()
+    for name, settings in overrides.items():
+        unknown = set(settings).difference(SETTINGS)
+        if unknown:
+            raise ValueError("unknown settings: {}".format(", ".join(sorted(unknown))))
+        if name == ALL_WORK_CENTERS:
+            work_centers = list(factory.work_centers.values())
+        else:
+            try:
+                work_centers = [factory.work_centers[name]]
+            except KeyError:
+                raise ValueError("unknown work center {!r}".format(name)) from None
+        for work_center in work_centers:
+            for setting, value in settings.items():
+                if setting in DELAY_IGNORES and isinstance(
+                    work_center, DelayWorkCenter
+                ):
+                    if name == ALL_WORK_CENTERS:
+                        continue
+                    raise ValueError(
+                        "delay work center {!r} has no {}".format(name, setting)
+                    )
+                if setting == "prioritizer":
+                    if isinstance(value, str):
+                        value = PRIORITIZERS[value]()
+                    work_center.set_prioritizer(value)
+                elif setting == "num_slots":
+                    work_center.num_slots = work_center.available_slots = value
+                else:
+                    setattr(work_center, setting, value)
+                    if setting == "time_passage_ratio":
+                        retimed.add(work_center)
+    if retimed:
+        _refresh_stores(factory, retimed)
+
+
+def _kpi_row(name: str, factory: Factory, stop_reason: str, events: int) -> dict:
+    tracker: KpiTracker = factory.logger
+    utilizations = [
+        kpis.utilization(factory.elapsed_hours)
+        for kpis in tracker.work_centers.values()
+    ]
+    return {
+        "variant": name,
+        "stop_reason": stop_reason,
+        "events": events,
+        "makespan": factory.elapsed_hours,
+        "orders_completed": tracker.lead_time_hours.count,
+        "mean_lead_time": tracker.lead_time_hours.mean,
+        "std_dev_lead_time": tracker.lead_time_hours.std_dev,
+        "max_lead_time": tracker.lead_time_hours.maximum,
+        "average_orders_in_work": tracker.average_orders_in_work(),
+        "mean_utilization": sum(utilizations) / max(len(utilizations), 1),
+        "max_utilization": max(utilizations, default=0.0),
+    }
+
+
+# set once per worker process by _load_model
+_worker_payload: Optional[bytes] = None
+_best_makespan: Any = None
+
+
+def _load_model(payload: bytes, best_makespan: Any) -> None:
+    global _worker_payload, _best_makespan
+    _worker_payload = payload
+    _best_makespan = best_makespan
+
+
+def _run_variant(variant: Variant, margin: Optional[float], check_every: int) -> dict:
+    factory = pickle.loads(_worker_payload)
+    factory.logger = KpiTracker()
+    apply_overrides(factory, variant.overrides)
+    factory.release()
+
+    events = 0
+    stop_reason = "exhausted"
+    while True:
+        summary = factory.run(max_events=check_every)
+        events += summary.events_processed
+        if summary.stop_reason == "exhausted":
+            break
+        # the clock only moves forward, so a variant already past the best
+        # makespan found so far can only finish worse
+        if margin is not None and factory.elapsed_hours > _best_makespan.value * (
+            1 + margin
+        ):
+            stop_reason = "dominated"
+            break
+
+    if stop_reason == "exhausted":
+        with _best_makespan.get_lock():
+            if factory.elapsed_hours < _best_makespan.value:
+                _best_makespan.value = factory.elapsed_hours
+    return _kpi_row(variant.name, factory, stop_reason, events)
+
+
+def sweep(
+    factory: Factory,
+    variants: Sequence[Variant],
+    max_workers: Optional[int] = None,
+    prune_margin: Optional[float] = None,
+    check_every: int = 4096,
+) -> SweepResult:
+    """Run each variant of an unreleased shop model to completion over a pool.
+
+    The model is pickled once and handed to each worker process when it
+    starts; every variant then rebuilds a fresh copy, applies its overrides and
+    runs with a ``KpiTracker`` as its logger.
+
+    With a ``prune_margin``, the workers share the best makespan of the
+    variants completed so far, and a variant is cancelled once its clock passes
+    that makespan by more than the margin (a fraction), checking every
+    ``check_every`` events.  Which variants are cancelled depends on the order
+    variants happen to finish, the KPIs of completed variants do not.
+    """
+    payload = pickle.dumps(factory)
+    best_makespan = Value("d", inf)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_load_model,
+        initargs=(payload, best_makespan),
+    ) as executor:
+        futures = [
+            executor.submit(_run_variant, variant, prune_margin, check_every)
+            for variant in variants
+        ]
+        return SweepResult([future.result() for future in futures])
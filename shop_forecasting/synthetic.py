@@ -0,0 +1,91 @@
+from random import Random
+from typing import Mapping, Optional, Tuple
+
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.event_calendars import EventCalendar, HeapEventCalendar
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import PRIORITIZERS
+from shop_forecasting.timebase import TimeBase
+from shop_forecasting.util import EventLogger
+
+# rules relying on operations carrying a due date
+DUE_DATE_RULES = frozenset(
+    name for name, prioritizer in PRIORITIZERS.items() if prioritizer.uses_due_date
+)
+
+
+def generate_shop(
+    seed: int = 0,
+    num_work_centers: int = 10,
+    num_routers: int = 100,
+    operations_per_router: Tuple[int, int] = (5, 15),
+    slots: Tuple[int, int] = (1, 3),
+    hours: Tuple[float, float] = (0.5, 8.0),
+    prioritizer_mix: Optional[Mapping[str, float]] = None,
+    logger: Optional[EventLogger] = None,
+    event_queue: Optional[EventCalendar] = None,
+    compact: bool = False,
+    time_base: Optional[TimeBase] = None,
+) -> Factory:
+    """Build a random, unreleased shop that is the same for a given seed.
+
+    Each work center gets a number of slots drawn from the inclusive ``slots``
+    range and a prioritizer drawn from ``prioritizer_mix``, a mapping of names
+    in ``PRIORITIZERS`` to relative weights (all first-in-first-out by
+    default).  Each router visits a random sequence of work centers, its length
+    drawn from ``operations_per_router``, with hours uniform over the ``hours``
+    range.  The operations of a router share a due date, in hours, for the
+    ``DUE_DATE_RULES``.  With ``compact``, operations are kept in an
+    ``OperationStore``, which changes nothing about the shop.  The factory runs
+    on ``time_base`` ticks when one is given.
+    """
+    rng = Random(seed)
+    if prioritizer_mix is None:
+        prioritizer_mix = {"fifo": 1.0}
+    factory = Factory(
+        logger=EventLogger() if logger is None else logger,
+        event_queue=HeapEventCalendar() if event_queue is None else event_queue,
+        time_base=time_base,
+    )
+
+    names = list(prioritizer_mix)
+    weights = [prioritizer_mix[name] for name in names]
+    work_centers = [
+        WorkCenter(
+            name="wc{}".format(i),
+            prioritizer=PRIORITIZERS[rng.choices(names, weights)[0]](),
+            factory=factory,
+            num_slots=rng.randint(*slots),
+        )
+        for i in range(num_work_centers)
+    ]
+
+    store = OperationStore() if compact else None
+    for order_number in range(num_routers):
+        router = Router(
+            operations={},
+            current_sequence=10,
+            factory=factory,
+            item_number=rng.randrange(num_routers // 10 + 1),
+            order_number=order_number,
+        )
+        steps = {
+            10 * (i + 1): (rng.choice(work_centers), rng.uniform(*hours))
+            for i in range(rng.randint(*operations_per_router))
+        }
+        due_date = rng.uniform(0, num_routers * hours[1] / num_work_centers)
+        if store is not None:
+            store.add_router(router, steps, due_date)
+            continue
+        for sequence_number, (work_center, operation_hours) in steps.items():
+            operation = RouterOperation(
+                work_center, router, sequence_number, operation_hours
+            )
+            operation.due_date = due_date
+            router.operations[sequence_number] = operation
+    return factory
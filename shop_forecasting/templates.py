@@ -0,0 +1,280 @@
+from array import array
+from collections.abc import Mapping
+from copy import copy
+from typing import Any, Dict, Iterator, List, Mapping as MappingType, Optional, Tuple
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+
+
+class RoutingTemplate:
+    """The routing of an item, held once and shared by every order of it.
+
+    Work centers, sequence numbers and the hours of each operation for a
+    quantity scale of one are stored column-wise.  Orders refer to the
+    template through ``TemplatedOperations``, which keep only what differs
+    between orders, so an order costs the same however long its routing.
+    Templates must not change once orders use them.
+    """
+
+    def __init__(
+        self, item_number: int, steps: MappingType[int, Tuple[WorkCenter, float]]
+    ):
+        self.item_number = item_number
+        self.sequence_numbers: List[int] = sorted(steps)
+        self.work_centers: List[WorkCenter] = []
+        self.hours = array("d")
+        for sequence_number in self.sequence_numbers:
+            work_center, hours = steps[sequence_number]
+            self.work_centers.append(work_center)
+            self.hours.append(hours)
+        self._index = {
+            sequence_number: i
+            for i, sequence_number in enumerate(self.sequence_numbers)
+        }
+
+    def __repr__(self) -> str:
+        return "RoutingTemplate (Item# {}, Operations [{}])".format(
+            self.item_number, len(self)
+        )
+
+    def __len__(self) -> int:
+        return len(self.sequence_numbers)
+
+    def create_router(
+        self,
+        factory: Factory,
+        order_number: int,
+        quantity_scale: float = 1.0,
+        completed_hours: Optional[Dict[int, float]] = None,
+        due_date: Optional[float] = None,
+    ) -> Router:
+        """Register an order of the template's item with a factory."""
+        router = Router(
+            operations={},
+            current_sequence=self.sequence_numbers[0],
+            factory=factory,
+            item_number=self.item_number,
+            order_number=order_number,
+        )
+        router.operations = TemplatedOperations(
+            self, router, quantity_scale, completed_hours, due_date
+        )
+        return router
+
+    def _fork(self, memo: Dict[int, Any]) -> "RoutingTemplate":
+        """A template for forked work centers, sharing everything else."""
+        try:
+            return memo[id(self)]
+        except KeyError:
+            fork = memo[id(self)] = copy(self)
+            fork.work_centers = [memo[id(wc)] for wc in self.work_centers]
+            return fork
+
+
+class TemplatedOperations(Mapping):
+    """A router's operations, as a template plus the order's own data.
+
+    Operation hours are the template's scaled by ``quantity_scale``, less any
+    ``completed_hours`` already worked, by sequence number.  Hours set on an
+    operation replace both for that operation.  All operations of the order
+    share one ``due_date``.
+    """
+
+    __slots__ = (
+        "template",
+        "router",
+        "quantity_scale",
+        "completed_hours",
+        "due_date",
+        "_hours",
+    )
+
+    def __init__(
+        self,
+        template: RoutingTemplate,
+        router: Router,
+        quantity_scale: float = 1.0,
+        completed_hours: Optional[Dict[int, float]] = None,
+        due_date: Optional[float] = None,
+    ):
+        self.template = template
+        self.router = router
+        self.quantity_scale = quantity_scale
+        self.completed_hours = completed_hours
+        self.due_date = due_date
+        self._hours: Optional[Dict[int, float]] = None
+
+    def __len__(self) -> int:
+        return len(self.template)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.template.sequence_numbers)
+
+    def __getitem__(self, sequence_number: int) -> "TemplateOperationView":
+        return TemplateOperationView(self, self.template._index[sequence_number])
+
+    @property
+    def sorted_sequences(self) -> List[int]:
+        return self.template.sequence_numbers
+
+    def hours_of(self, index: int) -> float:
+        if self._hours is not None and index in self._hours:
+            return self._hours[index]
+        hours = self.template.hours[index] * self.quantity_scale
+        if self.completed_hours:
+            sequence_number = self.template.sequence_numbers[index]
+            hours = max(hours - self.completed_hours.get(sequence_number, 0.0), 0.0)
+        return hours
+
+    def set_hours(self, index: int, hours: float) -> None:
+        if self._hours is None:
+            self._hours = {}
+        self._hours[index] = hours
+
+    def _fork(self, memo: Dict[int, Any]) -> "TemplatedOperations":
+        try:
+            return memo[id(self)]
+        except KeyError:
+            fork = memo[id(self)] = copy(self)
+            fork.template = self.template._fork(memo)
+            fork.router = memo[id(self.router)]
+            if self._hours is not None:
+                fork._hours = dict(self._hours)
+            return fork
+
+
+class TemplateOperationView:
+    """One operation of a ``TemplatedOperations``, usable as a ``RouterOperation``.
+
+    Views are created on demand and hold nothing but their position in the
+    template, so two views of the same operation compare equal.
+    """
+
+    __slots__ = ("_operations", "_index")
+
+    def __init__(self, operations: TemplatedOperations, index: int):
+        self._operations = operations
+        self._index = index
+
+    __repr__ = RouterOperation.__repr__
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TemplateOperationView):
+            return NotImplemented
+        return self._operations is other._operations and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._operations), self._index))
+
+    @property
+    def work_center(self) -> WorkCenter:
+        return self._operations.template.work_centers[self._index]
+
+    @property
+    def router(self) -> Router:
+        return self._operations.router
+
+    @property
+    def sequence_number(self) -> int:
+        return self._operations.template.sequence_numbers[self._index]
+
+    @property
+    def hours(self) -> float:
+        return self._operations.hours_of(self._index)
+
+    @hours.setter
+    def hours(self, hours: float) -> None:
+        self._operations.set_hours(self._index, hours)
+
+    @property
+    def wall_clock_hours(self) -> float:
+        return self.hours / self.work_center.time_passage_ratio
+
+    @property
+    def due_date(self) -> float:
+        due_date = self._operations.due_date
+        if due_date is None:
+            raise AttributeError("due_date")
+        return due_date
+
+    @due_date.setter
+    def due_date(self, due_date: float) -> None:
+        self._operations.due_date = due_date
+
+    def _fork(self, memo: Dict[int, Any]) -> "TemplateOperationView":
+        return TemplateOperationView(self._operations._fork(memo), self._index)
+
+
+def share_routings(factory: Factory) -> Dict[int, RoutingTemplate]:
+    """Move routers of the same item onto one routing template per item.
+
+    The first router of each item becomes its template.  Later routers of the
+    item share it when they visit the same work centers in the same sequence
+    and all their operations carry the same due date, if any; other routers
+    keep their own operations.  Hours that are all the same multiple of the
+    template's become the order's ``quantity_scale``, and only the hours of
+    irregular routings are kept as the order's own.  Must
+    be called before the routers are released, as operations already queued
+    or in work keep referring to the original objects.  Returns the templates
+    by item number.
+    """
+    templates: Dict[int, RoutingTemplate] = {}
+    for router in factory.routers:
+        operations = router.operations
+        if not isinstance(operations, dict) or not operations:
+            continue
+        steps = sorted(operations.items())
+        due_dates = {getattr(operation, "due_date", None) for _, operation in steps}
+        if len(due_dates) > 1:
+            continue
+        template = templates.get(router.item_number)
+        if template is None:
+            template = templates[router.item_number] = RoutingTemplate(
+                router.item_number,
+                {
+                    sequence_number: (operation.work_center, operation.hours)
+                    for sequence_number, operation in steps
+                },
+            )
+        elif template.sequence_numbers != [
+            sequence_number for sequence_number, _ in steps
+        ] or any(
+            operation.work_center is not work_center
+            for (_, operation), work_center in zip(steps, template.work_centers)
+        ):
+            continue
+        shared = TemplatedOperations(
+            template,
+            router,
+            _quantity_scale(template, [operation.hours for _, operation in steps]),
+            due_date=due_dates.pop(),
+        )
+        for index, (_, operation) in enumerate(steps):
+            if operation.hours != shared.hours_of(index):
+                shared.set_hours(index, operation.hours)
+        router.operations = shared
+    return templates
+
+
+def _quantity_scale(template: RoutingTemplate, hours: List[float]) -> float:
+    """The multiple of the template's hours giving every one of ``hours``, or
+    one when there is none."""
+    scale = next(
+        (
+            order_hours / template_hours
+            for template_hours, order_hours in zip(template.hours, hours)
+            if template_hours
+        ),
+        1.0,
+    )
+    if all(
+        template_hours * scale == order_hours
+        for template_hours, order_hours in zip(template.hours, hours)
+    ):
+        return scale
+    return 1.0
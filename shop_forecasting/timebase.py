@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from math import floor
+
+
+@dataclass(frozen=True)
+class TimeBase:
+    """An integer clock counting ``ticks_per_hour`` ticks per hour.
+
+    A factory with a time base keeps its clock and the completion times in
+    its event queue as integer ticks.  Durations are rounded to the nearest
+    tick once, when an operation starts, and the clock only ever moves to a
+    completion time, so it never accumulates rounding error and completion
+    times compare exactly and alike on every machine.  Hours derived from the
+    clock are always ``ticks / ticks_per_hour``.
+    """
+
+    ticks_per_hour: int = 3600
+
+    def __post_init__(self):
+        if not isinstance(self.ticks_per_hour, int) or self.ticks_per_hour < 1:
+            raise ValueError(
+                "ticks_per_hour must be a positive integer, got {!r}".format(
+                    self.ticks_per_hour
+                )
+            )
+
+    def to_ticks(self, hours: float) -> int:
+        """The nearest whole number of ticks to a number of hours."""
+        return round(hours * self.ticks_per_hour)
+
+    def ticks_until(self, hours: float) -> int:
+        """The last tick at or before a number of hours.
+
+        Products within floating point noise of a tick count as that tick, so
+        ``ticks_until(1.15)`` is 115 ticks at 100 ticks per hour, as is
+        ``to_ticks(1.15)``, although ``1.15 * 100`` is 114.99999999999999.
+        """
+        return floor(round(hours * self.ticks_per_hour, 6))
+
+    def to_hours(self, ticks: int) -> float:
+        return ticks / self.ticks_per_hour
@@ -1,9 +1,63 @@
+import csv
+from array import array
+from dataclasses import MISSING, fields
+from functools import wraps
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+def slotted(cls: type, name: Optional[str] = None) -> type:
+    """Recreate a dataclass with ``__slots__`` in place of an instance dictionary.
+
+    Equivalent to ``dataclass(slots=True)``, which is unavailable before Python
+    3.10.  The new class keeps the dataclass's generated methods; ``name``
+    renames it, allowing a slotted variant to sit alongside the original.
+    """
+    namespace = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    namespace["__slots__"] = field_names
+    for attribute in field_names + ("__dict__", "__weakref__"):
+        # defaults live on in the generated __init__
+        namespace.pop(attribute, None)
+
+    # except for those of fields excluded from __init__, which read them from
+    # the class attributes just removed
+    uninitialized = {
+        f.name: f.default
+        for f in fields(cls)
+        if not f.init and f.default is not MISSING
+    }
+    if uninitialized:
+        init = cls.__init__
+
+        @wraps(init)
+        def __init__(self, *args, **kwargs):
+            for attribute, default in uninitialized.items():
+                object.__setattr__(self, attribute, default)
+            init(self, *args, **kwargs)
+
+        namespace["__init__"] = __init__
+    slotted_cls = type(cls)(name or cls.__name__, cls.__bases__, namespace)
+    slotted_cls.__qualname__ = name or cls.__qualname__
+    return slotted_cls
+
+
 class EventLogger:
     ROUTER_COMPLETED = "router_completed"
     OPERATION_STARTED = "operation_started"
     OPERATION_COMPLETED = "operation_completed"
     OPERATION_QUEUED = "operation_queued"
 
+    # event types in the order of their compact integer codes
+    EVENT_TYPES = (
+        ROUTER_COMPLETED,
+        OPERATION_STARTED,
+        OPERATION_COMPLETED,
+        OPERATION_QUEUED,
+    )
+
+    # the events a factory passes to its logger
+    subscribed_events = EVENT_TYPES
+
     def __init__(self):
         self.events = []
 
@@ -11,3 +65,173 @@ class EventLogger:
         self.events.append(
             {"timestamp": timestamp, "event": event, "planning_object": planning_object}
         )
+
+
+class CompletionLogger(EventLogger):
+    """Records only the time each router completes, keyed by order number."""
+
+    subscribed_events = (EventLogger.ROUTER_COMPLETED,)
+
+    def __init__(self):
+        self.completions: Dict[int, float] = {}
+
+    def log_event(self, timestamp, event, planning_object):
+        if event == self.ROUTER_COMPLETED:
+            self.completions[planning_object.order_number] = timestamp
+
+
+class EventRecord(NamedTuple):
+    """A logged event, with its planning object reduced to plain identifiers.
+
+    Router events have a sequence number of -1 and no work center.
+
+    Fields may also be looked up by name, as in ``record["timestamp"]``, like
+    the events of an ``EventLogger``.  There is no "planning_object" field;
+    looking it up raises ``KeyError``.
+    """
+
+    timestamp: float
+    event: str
+    order_number: int
+    sequence_number: int
+    work_center: Optional[str]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+
+ObjectKey = Tuple[int, int, Optional[str]]
+
+
+def describe(planning_object: Any) -> ObjectKey:
+    """Identify a router or operation by order, sequence and work center name."""
+    router = getattr(planning_object, "router", None)
+    if router is None:
+        return planning_object.order_number, -1, None
+    return (
+        router.order_number,
+        planning_object.sequence_number,
+        planning_object.work_center.name,
+    )
+
+
+class ColumnarEventLogger(EventLogger):
+    """An event logger storing each event in a handful of typed array columns.
+
+    Timestamps, interned event codes and interned object ids are kept in
+    ``array`` columns that grow a chunk at a time, costing 13 bytes per event
+    instead of a dictionary per event.  Planning objects are reduced to their
+    identifiers when logged, so the logger does not keep them alive.
+    """
+
+    def __init__(self, chunk_size: int = 65536):
+        self._chunk_size = chunk_size
+        self._size = 0
+        self._capacity = 0
+        self._timestamps = array("d")
+        self._codes = array("B")
+        self._object_ids = array("i")
+        self._event_codes = {
+            event: code for code, event in enumerate(self.EVENT_TYPES)
+        }
+        self._object_index: Dict[ObjectKey, int] = {}
+        self.objects: List[ObjectKey] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        for column in (self._timestamps, self._codes, self._object_ids):
+            column.frombytes(bytes(column.itemsize * self._chunk_size))
+        self._capacity += self._chunk_size
+
+    def _intern(self, planning_object: Any) -> int:
+        key = describe(planning_object)
+        try:
+            return self._object_index[key]
+        except KeyError:
+            object_id = self._object_index[key] = len(self.objects)
+            self.objects.append(key)
+            return object_id
+
+    def log_event(self, timestamp, event, planning_object):
+        i = self._size
+        if i == self._capacity:
+            self._grow()
+        self._timestamps[i] = timestamp
+        self._codes[i] = self._event_codes[event]
+        self._object_ids[i] = self._intern(planning_object)
+        self._size = i + 1
+
+    def record(self, i: int) -> EventRecord:
+        if not 0 <= i < self._size:
+            raise IndexError("event index out of range")
+        order_number, sequence_number, work_center = self.objects[self._object_ids[i]]
+        return EventRecord(
+            self._timestamps[i],
+            self.EVENT_TYPES[self._codes[i]],
+            order_number,
+            sequence_number,
+            work_center,
+        )
+
+    @property
+    def events(self) -> "EventRows":
+        """A read-only sequence of the logged events as ``EventRecord`` rows."""
+        return EventRows(self)
+
+    def to_numpy(self):
+        """Export the log as a NumPy structured array (requires NumPy)."""
+        try:
+            import numpy as np
+        except ImportError as error:
+            raise ImportError("exporting to NumPy requires numpy") from error
+
+        names_length = max((len(key[2] or "") for key in self.objects), default=1)
+        dtype = [
+            ("timestamp", "f8"),
+            ("event", "u1"),
+            ("order_number", "i8"),
+            ("sequence_number", "i4"),
+            ("work_center", "U{}".format(max(names_length, 1))),
+        ]
+        size = self._size
+        object_ids = np.frombuffer(self._object_ids, dtype=np.intc)[:size]
+        objects = np.array(
+            [(order, seq, name or "") for order, seq, name in self.objects],
+            dtype=dtype[2:],
+        )
+        exported = np.empty(size, dtype=dtype)
+        exported["timestamp"] = np.frombuffer(self._timestamps, dtype="f8")[:size]
+        exported["event"] = np.frombuffer(self._codes, dtype="u1")[:size]
+        for name in ("order_number", "sequence_number", "work_center"):
+            exported[name] = objects[name][object_ids]
+        return exported
+
+    def to_csv(self, path: str) -> None:
+        """Write the log to a CSV file with a header row."""
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(EventRecord._fields)
+            writer.writerows(self.events)
+
+
+class EventRows(Sequence):
+    """Lightweight row view over a ``ColumnarEventLogger``."""
+
+    def __init__(self, logger: ColumnarEventLogger):
+        self._logger = logger
+
+    def __len__(self) -> int:
+        return len(self._logger)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._logger.record(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self._logger.record(i)
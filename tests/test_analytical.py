@@ -0,0 +1,79 @@
+import pytest
+
+from shop_forecasting.analytical import estimate, waiting_hours
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.planning_objects import (
+    DelayWorkCenter,
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.shifts import ShiftCalendar
+from shop_forecasting.synthetic import generate_shop
+
+
+def test_waiting_hours():
+    # exact for M/M/1: rho / (1 - rho) * service hours
+    assert waiting_hours(0.5, 1, 2.0) == pytest.approx(2.0)
+    # M/M/2 at rho = 0.5 waits 1/3 of a service time
+    assert waiting_hours(0.5, 2, 3.0) == pytest.approx(1.0, rel=0.15)
+    assert waiting_hours(0.5, 1, 2.0, arrival_scv=0, service_scv=0) == 0
+    assert waiting_hours(1.0, 3, 2.0) == float("inf")
+
+
+def test_estimate_small_shop():
+    factory = Factory()
+    saw = WorkCenter("saw", FifoPrioritizer(), factory, num_slots=2)
+    mill = WorkCenter(
+        "mill",
+        FifoPrioritizer(),
+        factory,
+        time_passage_ratio=2.0,
+        shift_calendar=ShiftCalendar([(0, 84)]),
+    )
+    cure = DelayWorkCenter("cure", factory=factory)
+    for order_number in range(10):
+        router = Router({}, 10, factory, order_number=order_number)
+        router.operations = {
+            10: RouterOperation(saw, router, 10, 4.0),
+            20: RouterOperation(mill, router, 20, 2.0),
+            30: RouterOperation(cure, router, 30, 24.0),
+        }
+
+    forecast = estimate(factory, horizon_hours=100)
+    saw_estimate = forecast.stations["saw"]
+    assert saw_estimate.arrival_rate == pytest.approx(0.1)
+    assert saw_estimate.utilization == pytest.approx(0.1 * 4 / 2)
+    assert saw_estimate.service_scv == 0
+    # half the clock hours of work, on shift half the week
+    assert forecast.stations["mill"].service_hours == pytest.approx(2.0)
+    assert forecast.stations["cure"].waiting_hours == 0
+    assert forecast.lead_times[0] == pytest.approx(
+        sum(station.flow_hours for station in forecast.stations.values())
+    )
+    assert [station.name for station in forecast.bottlenecks(0.1)] == ["saw", "mill"]
+    assert not forecast.needs_simulation()
+
+    # only what remains of a router counts
+    factory.routers[0].current_sequence = 30
+    assert estimate(factory, 100).lead_times[0] == pytest.approx(24.0)
+    assert estimate(factory, 20).needs_simulation()
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_estimate_compact_and_vectorized(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    shop_args = dict(seed=3, num_work_centers=5, num_routers=50)
+    reference = estimate(generate_shop(**shop_args), 2000, use_numpy=False)
+    compact = generate_shop(**shop_args)
+    OperationStore.compact(compact)
+    forecast = estimate(compact, 2000, use_numpy=use_numpy)
+    assert forecast.lead_times == pytest.approx(reference.lead_times)
+    for name, station in forecast.stations.items():
+        expected = reference.stations[name]
+        assert station.utilization == pytest.approx(expected.utilization)
+    with pytest.raises(ValueError):
+        estimate(compact, 0)
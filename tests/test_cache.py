@@ -0,0 +1,112 @@
+import os
+from functools import partial
+from operator import attrgetter
+
+import pytest
+
+from shop_forecasting.cache import ResultCache, completion_forecast, fingerprint
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.event_calendars import HeapEventCalendar
+from shop_forecasting.parallel import operation_key
+from shop_forecasting.synthetic import generate_shop
+
+SHOP = dict(num_work_centers=3, num_routers=20, prioritizer_mix={"fifo": 1, "edd": 1})
+
+
+def test_fingerprint_is_stable_and_sensitive():
+    key = fingerprint(generate_shop(seed=1, **SHOP))
+    assert key == fingerprint(generate_shop(seed=1, **SHOP))
+    assert key != fingerprint(generate_shop(seed=2, **SHOP))
+    assert key != fingerprint(generate_shop(seed=1, **SHOP), "replications", 10)
+
+    factory = generate_shop(seed=1, **SHOP)
+    factory.work_centers["wc0"].num_slots += 1
+    assert key != fingerprint(factory)
+
+    factory = generate_shop(seed=1, **SHOP)
+    factory.routers[3].operations[20].hours += 0.5
+    assert key != fingerprint(factory)
+
+
+def test_fingerprint_covers_completion_order():
+    key = fingerprint(generate_shop(seed=1, **SHOP))
+    batched = generate_shop(seed=1, **SHOP)
+    batched.batch_coincident = True
+    assert fingerprint(batched) != key
+    tied = generate_shop(
+        seed=1, event_queue=HeapEventCalendar(tie_key=operation_key), **SHOP
+    )
+    assert fingerprint(tied) != key
+    assert fingerprint(tied) == fingerprint(
+        generate_shop(
+            seed=1, event_queue=HeapEventCalendar(tie_key=operation_key), **SHOP
+        )
+    )
+
+
+def tied_fingerprint(tie_key):
+    return fingerprint(
+        generate_shop(seed=1, event_queue=HeapEventCalendar(tie_key=tie_key), **SHOP)
+    )
+
+
+def test_fingerprint_identifies_tie_keys():
+    key = tied_fingerprint(partial(operation_key))
+    assert key == tied_fingerprint(partial(operation_key))
+    assert key != tied_fingerprint(operation_key)
+    assert tied_fingerprint(attrgetter("hours")) != tied_fingerprint(
+        attrgetter("sequence_number")
+    )
+    # lambdas may differ behind the same name
+    with pytest.raises(ValueError):
+        tied_fingerprint(lambda operation: operation.hours)
+
+
+def test_fingerprint_of_compact_model():
+    factory = generate_shop(seed=1, num_routers=20)
+    compacted = generate_shop(seed=1, num_routers=20)
+    OperationStore.compact(compacted)
+    key = fingerprint(compacted)
+    assert key == fingerprint(compacted)
+    compacted.routers[0].operations[10].hours += 1
+    assert key != fingerprint(compacted)
+    assert fingerprint(factory) != key
+
+
+def test_fingerprint_rejects_released_models():
+    factory = generate_shop(**SHOP)
+    factory.release()
+    with pytest.raises(ValueError):
+        fingerprint(factory)
+
+
+def test_cache_hit_skips_simulation(tmp_path):
+    calls = []
+
+    def forecast(factory):
+        calls.append(factory)
+        return completion_forecast(factory)
+
+    cache = ResultCache(str(tmp_path))
+    first = cache.cached(generate_shop(seed=1, **SHOP), forecast)
+    assert cache.cached(generate_shop(seed=1, **SHOP), forecast) is first
+    assert len(calls) == 1
+
+    # a new process would find the result on disk
+    reloaded = ResultCache(str(tmp_path)).cached(
+        generate_shop(seed=1, **SHOP), forecast
+    )
+    assert reloaded == first
+    assert len(calls) == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=2500, memo_size=0)
+    for key in "abc":
+        cache.put(key, bytes(1000))
+        os.utime(os.path.join(str(tmp_path), key + ".pickle"), (0, ord(key)))
+    cache.put("d", bytes(1000))
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == bytes(1000)
+    assert cache.get("d") == bytes(1000)
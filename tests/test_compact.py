@@ -0,0 +1,109 @@
+import pickle
+
+import pytest
+
+from shop_forecasting.compact import (
+    OperationStore,
+    OperationView,
+    SlottedRouter,
+    SlottedRouterOperation,
+    SlottedWorkCenter,
+)
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.util import ColumnarEventLogger
+
+
+def build_shop(
+    router_type=Router, operation_type=RouterOperation, wc_type=WorkCenter
+):
+    factory = Factory(logger=ColumnarEventLogger())
+    saw = wc_type(name="saw", prioritizer=FifoPrioritizer(), factory=factory)
+    lathe = wc_type(
+        name="lathe",
+        prioritizer=FifoPrioritizer(),
+        factory=factory,
+        time_passage_ratio=2,
+    )
+    for order_number in [1000, 2000, 3000]:
+        router = router_type(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        router.operations = {
+            20: operation_type(lathe, router, 20, hours=order_number / 1000),
+            10: operation_type(saw, router, 10, hours=1),
+            30: operation_type(saw, router, 30, hours=0.5),
+        }
+    return factory
+
+
+def simulate(factory):
+    factory.release()
+    factory.run()
+    return list(factory.logger.events)
+
+
+def test_operation_store_matches_standard_objects():
+    expected = simulate(build_shop())
+    factory = build_shop()
+    store = OperationStore.compact(factory)
+
+    assert len(store) == 9
+    assert all(isinstance(r.operations[10], OperationView) for r in factory.routers)
+    assert simulate(factory) == expected
+
+
+def test_slotted_objects_match_standard_objects():
+    factory = build_shop(SlottedRouter, SlottedRouterOperation, SlottedWorkCenter)
+    assert not hasattr(factory.routers[0], "__dict__")
+    assert simulate(factory) == simulate(build_shop())
+
+
+def test_operation_view_precomputes_wall_clock_hours():
+    factory = build_shop()
+    OperationStore.compact(factory)
+    operation = factory.routers[1].operations[20]
+
+    assert operation == factory.routers[1].operations[20]
+    assert (operation.hours, operation.wall_clock_hours) == (2, 1)
+    assert operation.work_center.name == "lathe"
+    assert operation.router is factory.routers[1]
+    operation.hours = 3
+    assert factory.routers[1].operations[20].wall_clock_hours == 1.5
+    assert list(factory.routers[1].operations) == [10, 20, 30]
+
+
+def test_operation_store_keeps_due_dates():
+    factory = build_shop()
+    for operation in factory.routers[0].operations.values():
+        operation.due_date = 5.0
+    OperationStore.compact(factory)
+    assert factory.routers[0].operations[30].due_date == 5.0
+    assert not hasattr(factory.routers[1].operations[10], "due_date")
+
+    operation = factory.routers[0].operations[10]
+    operation.due_date = 2.0
+    assert factory.routers[0].operations[20].due_date == 2.0
+    fork = factory.fork()
+    fork.routers[0].operations[10].due_date = 7.0
+    assert operation.due_date == 2.0
+
+    factory = build_shop()
+    factory.routers[0].operations[10].due_date = 5.0
+    with pytest.raises(ValueError):
+        OperationStore.compact(factory)
+
+
+def test_operation_store_survives_pickling():
+    factory = build_shop()
+    OperationStore.compact(factory)
+    copy = pickle.loads(pickle.dumps(factory))
+    assert simulate(copy) == simulate(build_shop())
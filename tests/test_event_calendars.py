@@ -0,0 +1,182 @@
+import random
+
+import pytest
+
+from shop_forecasting.event_calendars import (
+    AddressableHeap,
+    CalendarQueue,
+    HeapEventCalendar,
+)
+from shop_forecasting.planning_objects import Factory
+from shop_forecasting.prioritizers import PrioritizedItem
+from unittest.mock import Mock
+
+calendar_types = [HeapEventCalendar, CalendarQueue, AddressableHeap]
+
+
+@pytest.mark.parametrize("calendar_type", calendar_types)
+def test_calendar_returns_lowest_priority_first(calendar_type):
+    calendar = calendar_type()
+    for priority in [5, 1, 3]:
+        calendar.put(PrioritizedItem(priority, priority))
+
+    assert calendar.peek().item == 1
+    assert [calendar.get().item for _ in range(3)] == [1, 3, 5]
+    assert calendar.empty()
+
+
+@pytest.mark.parametrize("calendar_type", calendar_types)
+def test_calendar_breaks_ties_in_insertion_order(calendar_type):
+    calendar = calendar_type()
+    items = [PrioritizedItem(1, name) for name in "abcde"]
+    for item in items:
+        calendar.put(item)
+
+    assert "".join(calendar.get().item for _ in items) == "abcde"
+
+
+@pytest.mark.parametrize("calendar_type", calendar_types)
+def test_calendar_matches_sorted_order_under_churn(calendar_type):
+    rng = random.Random(42)
+    calendar = calendar_type()
+    pending = []
+    popped = []
+    expected = []
+    clock = 0.0
+    for i in range(5000):
+        # mostly schedule events in the future, occasionally in the past
+        priority = clock + rng.choice([0, rng.random() * 10, -rng.random()])
+        calendar.put(PrioritizedItem(priority, i))
+        pending.append((priority, i))
+        if rng.random() < 0.45:
+            pending.sort()
+            expected.append(pending.pop(0)[1])
+            item = calendar.get()
+            popped.append(item.item)
+            clock = item.priority
+    while pending:
+        pending.sort()
+        expected.append(pending.pop(0)[1])
+        popped.append(calendar.get().item)
+
+    assert popped == expected
+    assert len(calendar) == 0
+
+
+def test_calendar_queue_get_from_empty_raises():
+    with pytest.raises(IndexError):
+        CalendarQueue().get()
+
+
+def test_factory_with_calendar_queue_maintains_order():
+    factory = Factory(logger=Mock(), event_queue=CalendarQueue())
+    for hours in [1, 2, 0.5, 0.25]:
+        factory.add_work_in_progress(Mock(wall_clock_hours=hours))
+
+    times = []
+    while factory.complete_next():
+        times.append(factory.elapsed_hours)
+    assert times == [0.25, 0.5, 1, 2]
+
+
+def test_addressable_heap_update_and_remove_under_churn():
+    rng = random.Random(7)
+    heap = AddressableHeap()
+    priorities = {}
+    for i in range(2000):
+        action = rng.random()
+        if action < 0.5 or not priorities:
+            priorities[i] = rng.random()
+            heap.put(PrioritizedItem(priorities[i], i))
+        elif action < 0.7:
+            item = rng.choice(list(priorities))
+            priorities[item] = rng.random()
+            heap.update(item, priorities[item])
+        elif action < 0.8:
+            item = rng.choice(list(priorities))
+            assert heap.remove(item).item == item
+            del priorities[item]
+        else:
+            expected = min(priorities, key=priorities.get)
+            assert heap.get().item == expected
+            del priorities[expected]
+        assert len(heap) == len(priorities)
+    assert [heap.get().item for _ in priorities] == sorted(
+        priorities, key=priorities.get
+    )
+
+
+def test_addressable_heap_update_keeps_tie_order():
+    heap = AddressableHeap()
+    for name in "abc":
+        heap.put(PrioritizedItem(1, name))
+    heap.update("a", 2)
+    heap.update("a", 1)
+    assert "".join(heap.get().item for _ in range(3)) == "abc"
+
+
+def test_addressable_heap_revalidate():
+    heap = AddressableHeap()
+    for item in range(5):
+        heap.put(PrioritizedItem(item, item))
+    # priorities that grow with time, more so for lower items
+    heap.revalidate(lambda item: item + 10 * (5 - item), 1.0)
+    assert heap.peek().item == 4
+    assert heap.peek().priority == 14
+
+
+@pytest.mark.parametrize("bounded", [True, False])
+def test_addressable_heap_revalidate_falling_priorities(bounded):
+    rng = random.Random(5)
+    heap = AddressableHeap()
+    # priorities falling at different rates as time passes, as critical ratios do
+    start, rate = {}, {}
+    queued = set()
+    now = 0.0
+
+    def priority_of(item):
+        return start[item] - rate[item] * now
+
+    for item in range(400):
+        start[item], rate[item] = rng.uniform(0, 100), rng.uniform(0, 2)
+        heap.put(PrioritizedItem(priority_of(item), item))
+        heap.fall_rate = max(heap.fall_rate, rate[item])
+        queued.add(item)
+        if rng.random() < 0.4:
+            now += rng.uniform(0, 1)
+            heap.revalidate(priority_of, now, rate.get if bounded else None)
+            expected = min(queued, key=priority_of)
+            assert heap.get().item == expected
+            queued.remove(expected)
+
+
+@pytest.mark.parametrize("calendar_type", calendar_types)
+def test_calendar_items(calendar_type):
+    calendar = calendar_type()
+    for priority in range(20):
+        calendar.put(PrioritizedItem(priority % 7, priority))
+    calendar.get()
+    assert sorted(calendar.items()) == list(range(1, 20))
+
+
+@pytest.mark.parametrize("calendar_type", calendar_types)
+def test_calendar_remove(calendar_type):
+    calendar = calendar_type()
+    for priority in range(20):
+        calendar.put(PrioritizedItem(priority % 7, priority))
+
+    assert calendar.remove(3).priority == 3
+    with pytest.raises(ValueError):
+        calendar.remove(3)
+    assert len(calendar) == 19
+    remaining = [calendar.get().item for _ in range(19)]
+    assert remaining == sorted(set(range(20)) - {3}, key=lambda i: (i % 7, i))
+
+
+def test_heap_calendar_tie_key():
+    calendar = HeapEventCalendar(tie_key=str.lower)
+    for priority, name in [(1, "c"), (1, "B"), (0, "z"), (1, "a"), (1, "b")]:
+        calendar.put(PrioritizedItem(priority, name))
+
+    # equal keys fall back to insertion order
+    assert "".join(calendar.get().item for _ in range(5)) == "zaBbc"
@@ -0,0 +1,108 @@
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.event_calendars import CalendarQueue
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.sinks import BinaryEventSink, read_binary
+from shop_forecasting.util import ColumnarEventLogger, EventLogger
+
+
+def build_shop(**factory_args) -> Factory:
+    factory = Factory(**{"logger": ColumnarEventLogger(), **factory_args})
+    saw = WorkCenter(name="saw", prioritizer=FifoPrioritizer(), factory=factory)
+    lathe = WorkCenter(name="lathe", prioritizer=FifoPrioritizer(), factory=factory)
+    for order_number in range(1000, 6000, 1000):
+        router = Router(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        router.operations = {
+            10: RouterOperation(saw, router, 10, hours=order_number / 1000),
+            20: RouterOperation(lathe, router, 20, hours=2),
+            30: RouterOperation(saw, router, 30, hours=1),
+        }
+    factory.release()
+    return factory
+
+
+def remaining_events(factory: Factory):
+    start = len(factory.logger)
+    factory.run()
+    return list(factory.logger.events)[start:]
+
+
+def test_forks_continue_like_the_original():
+    for factory_args in [{}, {"event_queue": CalendarQueue()}]:
+        factory = build_shop(**factory_args)
+        factory.run(until_hours=4)
+        snapshot = factory.snapshot()
+        forks = [snapshot.fork(ColumnarEventLogger()) for _ in range(2)]
+
+        expected = remaining_events(factory)
+        assert expected
+        for fork in forks:
+            assert fork.elapsed_hours == snapshot.elapsed_hours == 4
+            assert remaining_events(fork) == expected
+
+
+def test_forks_are_independent():
+    factory = build_shop()
+    factory.run(until_hours=4)
+    fork = factory.fork()
+    fork.work_centers["saw"].num_slots += 1
+    fork.work_centers["saw"].free_slot()
+    fork.run()
+    factory.run()
+
+    assert fork.elapsed_hours < factory.elapsed_hours
+    assert factory.work_centers["saw"].num_slots == 1
+    assert fork.routers[0].factory is fork
+    assert fork.routers[0].operations[10].work_center is fork.work_centers["saw"]
+
+
+def test_forks_share_unchanged_structure():
+    factory = build_shop()
+    factory.run(max_events=3)
+    fork = factory.fork()
+    assert fork.routers[0]._sequences is factory.routers[0]._sequences
+    assert fork.routers[0].operations is not factory.routers[0].operations
+
+
+def test_fork_of_compact_shop():
+    factory = Factory(logger=ColumnarEventLogger())
+    saw = WorkCenter(name="saw", prioritizer=FifoPrioritizer(), factory=factory)
+    store = OperationStore()
+    for order_number in [1000, 2000]:
+        router = Router(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        store.add_router(router, {10: (saw, 1), 20: (saw, 2)})
+    factory.release()
+    factory.run(max_events=1)
+    fork = factory.fork(ColumnarEventLogger())
+
+    assert fork.routers[0].operations[10].router is fork.routers[0]
+    assert remaining_events(fork) == remaining_events(factory)
+
+
+def test_fork_of_factory_logging_to_a_sink(tmp_path):
+    path = str(tmp_path / "events.bin")
+    with BinaryEventSink(path) as sink:
+        factory = build_shop(logger=sink)
+        factory.run(until_hours=4)
+        fork = factory.fork()
+        assert type(fork.logger) is EventLogger
+        assert type(factory.snapshot().fork().logger) is EventLogger
+        fork.run()
+    assert fork.logger.events
+    # the fork's events never reach the original's sink
+    assert all(record.timestamp <= 4 for record in read_binary(path))
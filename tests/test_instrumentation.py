@@ -0,0 +1,77 @@
+import pytest
+
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import ColumnarEventLogger, CompletionLogger, EventLogger
+
+
+def profiled_run(**shop_args):
+    factory = generate_shop(logger=ColumnarEventLogger(), **shop_args)
+    profiler = factory.enable_profiling()
+    factory.release()
+    factory.run()
+    return factory, profiler
+
+
+def test_profiler_counts_events_and_hooks():
+    factory, profiler = profiled_run(num_routers=20, prioritizer_mix={"spt": 1})
+    events = list(factory.logger.events)
+    assert sum(profiler.event_counts.values()) == len(events)
+    assert profiler.event_counts[EventLogger.ROUTER_COMPLETED] == 20
+    operations = sum(len(router.operations) for router in factory.routers)
+    assert profiler.hook_calls["prioritize"] == operations
+    assert profiler.hook_calls["enqueue"] == operations
+    assert profiler.hook_calls["dequeue"] == operations
+    assert profiler.hook_calls["complete"] == profiler.hook_calls["schedule"]
+    assert profiler.hook_calls["log"] == len(events)
+    assert profiler.event_queue_high_water >= 1
+    assert set(profiler.queue_high_water) <= set(factory.work_centers)
+
+
+@pytest.mark.parametrize("logger", [None, CompletionLogger()])
+def test_profiler_counts_events_whatever_the_logger(logger):
+    factory, logged = profiled_run(num_routers=20)
+    counted = generate_shop(num_routers=20)
+    counted.logger = logger
+    profiler = counted.enable_profiling()
+    counted.release()
+    counted.run()
+    assert profiler.event_counts == logged.event_counts
+
+
+def test_profiling_does_not_change_results():
+    factory, _ = profiled_run(seed=3, num_routers=20)
+    unprofiled = generate_shop(seed=3, num_routers=20, logger=ColumnarEventLogger())
+    unprofiled.release()
+    unprofiled.run()
+    assert list(factory.logger.events) == list(unprofiled.logger.events)
+
+
+def test_disable_profiling_restores_hot_path():
+    factory = generate_shop(num_routers=5)
+    factory.enable_profiling()
+    factory.disable_profiling()
+    assert "log_event" not in vars(factory.logger)
+    assert "put" not in vars(factory.event_queue)
+    for work_center in factory.work_centers.values():
+        assert "put" not in vars(work_center.queue)
+        assert "prioritize" not in vars(work_center.prioritizer)
+
+
+def test_fork_of_profiled_factory_is_not_profiled():
+    factory = generate_shop(num_routers=5)
+    factory.enable_profiling()
+    factory.release()
+    fork = factory.fork()
+    assert fork.profiler is None
+    assert "put" not in vars(fork.event_queue)
+    assert factory.profiler.installed
+    fork.run()
+    assert factory.profiler.hook_calls["complete"] == 0
+
+
+def test_profile_report():
+    factory, _ = profiled_run(num_routers=5)
+    report = factory.profile_report()
+    assert "prioritize" in report and "(event queue)" in report
+    with pytest.raises(RuntimeError):
+        generate_shop(num_routers=1).profile_report()
@@ -0,0 +1,86 @@
+import pytest
+
+from shop_forecasting.kpis import KpiTracker
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import EventLogger
+
+
+def test_kpis_of_single_work_center():
+    tracker = KpiTracker()
+    factory = Factory(logger=tracker)
+    saw = WorkCenter("saw", FifoPrioritizer(), factory, num_slots=2)
+    for order_number, hours in enumerate([4.0, 2.0, 2.0]):
+        router = Router({}, 10, factory, order_number=order_number)
+        router.operations[10] = RouterOperation(saw, router, 10, hours)
+    factory.release()
+    factory.run()
+
+    # two orders start at once, the third waits 2 hours for a slot
+    kpis = tracker.work_centers["saw"]
+    assert kpis.completed == 3
+    assert kpis.queue_hours.mean == pytest.approx(2 / 3)
+    assert kpis.flow_hours.mean == pytest.approx((4 + 2 + 4) / 3)
+    assert kpis.average_queue_length() == pytest.approx(2 / 4)
+    assert kpis.utilization() == pytest.approx(8 / (2 * 4))
+    assert tracker.lead_times == {0: 4.0, 1: 2.0, 2: 4.0}
+    assert tracker.average_orders_in_work() == pytest.approx(10 / 4)
+
+
+def test_kpis_match_event_log():
+    shop_args = dict(seed=5, num_work_centers=4, num_routers=40)
+    tracked = generate_shop(logger=KpiTracker(), **shop_args)
+    logged = generate_shop(logger=EventLogger(), **shop_args)
+    for factory in (tracked, logged):
+        factory.release()
+        factory.run()
+
+    queued = {}
+    flow_hours = []
+    for event in logged.logger.events:
+        if event["event"] == EventLogger.OPERATION_QUEUED:
+            queued[id(event["planning_object"])] = event["timestamp"]
+        elif event["event"] == EventLogger.OPERATION_COMPLETED:
+            start = queued.pop(id(event["planning_object"]))
+            flow_hours.append(event["timestamp"] - start)
+
+    tracker = tracked.logger
+    completed = sum(kpis.completed for kpis in tracker.work_centers.values())
+    assert completed == len(flow_hours)
+    mean_flow_hours = sum(
+        kpis.flow_hours.mean * kpis.completed for kpis in tracker.work_centers.values()
+    )
+    assert mean_flow_hours / completed == pytest.approx(sum(flow_hours) / completed)
+    assert len(tracker.lead_times) == 40
+    assert tracker.orders_in_work == 0
+    for row in tracker.work_center_rows():
+        assert 0 <= row["utilization"] <= 1
+
+
+def test_kpis_of_forked_run():
+    factory = generate_shop(seed=2, num_work_centers=3, num_routers=20)
+    factory.release()
+    factory.run(max_events=30)
+    completed = sum(
+        event["event"] == EventLogger.ROUTER_COMPLETED
+        for event in factory.logger.events
+    )
+    fork = factory.fork()
+    fork.logger = tracker = KpiTracker.joining(fork)
+    assert tracker.orders_in_work == 20 - completed > 0
+    fork.run()
+    assert tracker.orders_in_work == 0
+    assert tracker.start_hours == factory.elapsed_hours
+    # every order was released before the fork, so none has a known lead time
+    assert not tracker.lead_times
+    assert len(tracker.truncated_orders) == 20 - completed
+    for kpis in tracker.work_centers.values():
+        assert kpis.queue_length == kpis.busy_slots == 0
+        assert 0 < kpis.utilization() <= 1
+        assert kpis.flow_hours.count <= kpis.completed
@@ -0,0 +1,93 @@
+import csv
+import json
+
+import pytest
+
+from shop_forecasting.compact import OperationStore
+from shop_forecasting.loader import load_csv, load_json_lines
+from shop_forecasting.planning_objects import Factory, WorkCenter
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.util import ColumnarEventLogger
+
+# rows of an order are deliberately out of order and interleaved
+rows = [
+    {"order_number": 2000, "sequence_number": 20, "work_center": "lathe", "hours": 2},
+    {"order_number": 1000, "sequence_number": 10, "work_center": "saw", "hours": 1},
+    {"order_number": 2000, "sequence_number": 10, "work_center": "saw", "hours": 3},
+    {"order_number": 1000, "sequence_number": 30, "work_center": "saw", "hours": 1},
+    {"order_number": 1000, "sequence_number": 20, "work_center": "lathe", "hours": 4},
+]
+
+
+def empty_shop() -> Factory:
+    factory = Factory(logger=ColumnarEventLogger())
+    for name in ["saw", "lathe"]:
+        WorkCenter(name=name, prioritizer=FifoPrioritizer(), factory=factory)
+    return factory
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json_lines(path, rows):
+    with open(path, "w") as json_file:
+        json_file.writelines(json.dumps(row) + "\n" for row in rows)
+
+
+def simulate(factory):
+    factory.release()
+    factory.run()
+    return list(factory.logger.events)
+
+
+@pytest.mark.parametrize(
+    "writer, loader", [(write_csv, load_csv), (write_json_lines, load_json_lines)]
+)
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_loaders_assemble_routers(tmp_path, writer, loader, use_mmap):
+    path = str(tmp_path / "operations")
+    writer(path, rows)
+    factory = empty_shop()
+    reports = []
+    report = loader(
+        path, factory, chunk_size=2, use_mmap=use_mmap, on_chunk=reports.append
+    )
+
+    assert (report.rows, report.routers, report.operations) == (5, 2, 5)
+    assert len(reports) == 3
+    first, second = factory.routers
+    assert (first.order_number, first.current_sequence) == (2000, 10)
+    assert (second.current_sequence, second.next_sequence) == (10, 20)
+    assert second.operations[20].work_center is factory.work_centers["lathe"]
+    assert second.operations[20].hours == 4
+
+
+def test_load_into_operation_store_matches_objects(tmp_path):
+    path = str(tmp_path / "operations.csv")
+    write_csv(path, rows)
+    factory = empty_shop()
+    load_csv(path, factory)
+    compact = empty_shop()
+    store = OperationStore()
+    load_csv(path, compact, store=store)
+
+    assert len(store) == 5
+    assert simulate(compact) == simulate(factory)
+
+
+def test_load_rejects_unknown_work_center(tmp_path):
+    path = str(tmp_path / "operations.csv")
+    write_csv(path, rows + [dict(rows[0], work_center="mill")])
+    with pytest.raises(ValueError, match="row 6: unknown work center 'mill'"):
+        load_csv(path, empty_shop())
+
+
+def test_load_rejects_missing_columns(tmp_path):
+    path = str(tmp_path / "operations.csv")
+    write_csv(path, [{"order_number": 1, "work_center": "saw"}])
+    with pytest.raises(ValueError, match="hours, sequence_number"):
+        load_csv(path, empty_shop())
@@ -0,0 +1,75 @@
+from math import inf
+
+import pytest
+
+from shop_forecasting.event_calendars import HeapEventCalendar
+from shop_forecasting.parallel import (
+    event_records,
+    lookahead,
+    operation_key,
+    run_partitioned,
+)
+from shop_forecasting.shifts import ShiftCalendar
+from shop_forecasting.synthetic import generate_shop
+
+PARTITIONS = [["wc0", "wc1"], ["wc2"], ["wc3", "wc4"]]
+
+
+def _shop(event_queue=None, **shop_args):
+    factory = generate_shop(
+        num_work_centers=5,
+        num_routers=60,
+        prioritizer_mix={"fifo": 1, "spt": 1, "slack": 1},
+        event_queue=event_queue,
+        **shop_args
+    )
+    factory.work_centers["wc2"].shift_calendar = ShiftCalendar.weekdays([(6, 14)])
+    return factory
+
+
+@pytest.mark.parametrize("shop_args", [dict(seed=1), dict(seed=2, hours=(2, 2))])
+def test_partitioned_run_matches_sequential(shop_args):
+    sequential = _shop(HeapEventCalendar(tie_key=operation_key), **shop_args)
+    sequential.release()
+    sequential.run()
+
+    result = run_partitioned(_shop(**shop_args), PARTITIONS)
+    assert result.events == event_records(sequential.logger)
+    assert result.elapsed_hours == sequential.elapsed_hours
+    assert len(result.completions) == 60
+    assert result.messages > 0
+    assert result.lookahead == lookahead(_shop(**shop_args), PARTITIONS)
+
+
+def test_disjoint_partitions_run_to_the_end():
+    def shop(event_queue=None):
+        return generate_shop(
+            seed=3,
+            num_work_centers=2,
+            num_routers=20,
+            operations_per_router=(1, 1),
+            event_queue=event_queue,
+        )
+
+    sequential = shop(HeapEventCalendar(tie_key=operation_key))
+    sequential.release()
+    sequential.run()
+
+    partitions = [["wc0"], ["wc1"]]
+    assert lookahead(shop(), partitions) == inf
+    result = run_partitioned(shop(), partitions)
+    assert result.events == event_records(sequential.logger)
+    assert len(result.completions) == 20
+    assert result.windows == 1
+    assert result.messages == 0
+
+
+def test_partitions_must_cover_work_centers():
+    factory = _shop(seed=1)
+    with pytest.raises(ValueError):
+        run_partitioned(factory, [["wc0", "wc1"], ["wc2"]])
+    with pytest.raises(ValueError):
+        run_partitioned(factory, [["wc0", "wc1", "wc2"], ["wc2", "wc3", "wc4"]])
+    factory.release()
+    with pytest.raises(ValueError):
+        run_partitioned(factory, PARTITIONS)
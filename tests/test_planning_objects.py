@@ -1,8 +1,17 @@
+from math import inf
 from queue import PriorityQueue
-from shop_forecasting.prioritizers import PrioritizedItem
+from shop_forecasting.event_calendars import AddressableHeap
+from shop_forecasting.prioritizers import (
+    CriticalRatioPrioritizer,
+    FifoPrioritizer,
+    PrioritizedItem,
+    ShortestProcessingTimePrioritizer,
+)
+from shop_forecasting.util import CompletionLogger, EventLogger
 import pytest
 from unittest.mock import Mock
 from shop_forecasting.planning_objects import (
+    DelayWorkCenter,
     Factory,
     Router,
     RouterOperation,
@@ -119,3 +128,148 @@ def test_router_operation_wall_clock_conversion():
         work_center=work_center, router=Mock(), sequence_number=0, hours=10
     )
     assert operation.wall_clock_hours == 5
+
+
+def test_router_visits_unsorted_operations_in_sequence_order():
+    unsorted_ops = {
+        op.sequence_number: op for op in [pack_and_ship, raw_material, machine]
+    }
+    router = Router(operations=unsorted_ops, current_sequence=10, factory=Mock())
+    visited = [router.current_sequence]
+    while router.current_sequence != -1:
+        router.advance()
+        visited.append(router.current_sequence)
+    assert visited == [10, 20, 30, -1]
+
+
+def test_router_reindexes_when_operations_change():
+    router = Router(operations={}, current_sequence=10, factory=Mock())
+    assert router.next_sequence == -1
+    router.operations = dict(ops)
+    assert router.next_sequence == 20
+    router.operations[25] = operation_stub(seq_num=25, hours=1)
+    router.advance()
+    assert router.next_sequence == 25
+
+
+def test_router_follows_externally_set_current_sequence(router_at_beginning: Router):
+    router_at_beginning.advance()
+    router_at_beginning.current_sequence = 10
+    assert router_at_beginning.next_sequence == 20
+    router_at_beginning.current_sequence = 15
+    assert router_at_beginning.next_sequence == 20
+
+
+def factory_with_work(*hours) -> Factory:
+    factory = Factory(logger=Mock())
+    for wall_clock_hours in hours:
+        factory.add_work_in_progress(Mock(wall_clock_hours=wall_clock_hours))
+    return factory
+
+
+def test_factory_run_until_exhausted():
+    factory = factory_with_work(1, 2, 3)
+    summary = factory.run()
+    assert summary.events_processed == 3
+    assert summary.stop_reason == "exhausted"
+    assert summary.elapsed_hours == factory.elapsed_hours == 3
+
+
+def test_factory_run_stops_at_horizon_and_resumes():
+    factory = factory_with_work(1, 2, 3)
+    summary = factory.run(until_hours=2.5)
+    assert summary.events_processed == 2
+    assert summary.stop_reason == "until_hours"
+    assert factory.elapsed_hours == 2.5
+
+    summary = factory.run()
+    assert summary.events_processed == 1
+    assert factory.elapsed_hours == 3
+
+
+def test_factory_run_stop_conditions():
+    factory = factory_with_work(1, 2, 3, 4)
+    assert factory.run(max_events=1).stop_reason == "max_events"
+    assert factory.elapsed_hours == 1
+
+    summary = factory.run(stop_when=lambda f: f.elapsed_hours >= 3)
+    assert summary.stop_reason == "stop_when"
+    assert summary.events_processed == 2
+    assert factory.elapsed_hours == 3
+
+
+def test_workcenter_dispatches_by_current_critical_ratio():
+    factory = Factory(logger=Mock())
+    lathe = WorkCenter("lathe", CriticalRatioPrioritizer(), factory)
+    assert isinstance(lathe.queue, AddressableHeap)
+    operations = {}
+    for order_number, (due_date, hours) in enumerate([(0, 9), (10, 1), (20, 4)]):
+        router = Router({}, 10, factory, order_number=order_number)
+        operation = router.operations[10] = RouterOperation(lathe, router, 10, hours)
+        operation.due_date = due_date
+        operations[order_number] = operation
+    factory.release()
+
+    # when queued, order 2 has the lower ratio, but by the time the lathe frees
+    # up at hour 9 order 1 is the more critical
+    factory.complete_next()
+    assert factory.event_queue.peek().item is operations[1]
+
+    operations[2].due_date = 5
+    lathe.reprioritize(operations[2])
+    assert lathe.queue.peek().item is operations[2]
+
+
+def test_delay_workcenter_requires_a_factory():
+    with pytest.raises(TypeError):
+        DelayWorkCenter("outside")
+    factory = Factory(logger=None)
+    outside = DelayWorkCenter("outside", factory=factory)
+    assert factory.work_centers["outside"] is outside
+    assert outside.num_slots == inf and outside.prioritizer is None
+
+
+def test_delay_workcenter_logs_same_events_as_unlimited_slots():
+    def simulate(make_work_center):
+        factory = Factory(logger=EventLogger())
+        outside = make_work_center(factory)
+        for order_number, hours in enumerate([5, 3, 3, 1]):
+            router = Router({}, 10, factory, order_number=order_number)
+            router.operations[10] = RouterOperation(outside, router, 10, hours)
+        factory.release()
+        factory.run()
+        return [
+            (event["timestamp"], event["event"], event["planning_object"].order_number)
+            if event["event"] == EventLogger.ROUTER_COMPLETED
+            else (event["timestamp"], event["event"], event["planning_object"].hours)
+            for event in factory.logger.events
+        ]
+
+    delayed = simulate(lambda factory: DelayWorkCenter("outside", factory=factory))
+    assert delayed == simulate(
+        lambda factory: WorkCenter(
+            "outside", FifoPrioritizer(), factory, num_slots=int(1e6)
+        )
+    )
+
+
+def test_factory_batches_coincident_completions():
+    def simulate(batch_coincident):
+        factory = Factory(logger=CompletionLogger(), batch_coincident=batch_coincident)
+        oven = WorkCenter("oven", FifoPrioritizer(), factory, num_slots=2)
+        lathe = WorkCenter("lathe", ShortestProcessingTimePrioritizer(), factory)
+        for order_number, lathe_hours in [(1, 5), (2, 1)]:
+            router = Router({}, 10, factory, order_number=order_number)
+            router.operations = {
+                10: RouterOperation(oven, router, 10, 2),
+                20: RouterOperation(lathe, router, 20, lathe_hours),
+                30: RouterOperation(oven, router, 30, 0),
+            }
+        factory.release()
+        summary = factory.run()
+        return factory.logger.completions, summary.events_processed
+
+    # one at a time, order 1 reaches the lathe first and takes it
+    assert simulate(False) == ({1: 7, 2: 8}, 6)
+    # together, both orders queue at the lathe before it picks the shorter
+    assert simulate(True) == ({2: 3, 1: 8}, 6)
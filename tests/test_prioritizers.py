@@ -2,7 +2,9 @@ from unittest.mock import Mock
 from datetime import datetime
 
 from shop_forecasting.prioritizers import (
+    CriticalRatioPrioritizer,
     EarliestDueDatePrioritizier,
+    LeastSlackPrioritizer,
     FifoPrioritizer,
     PrioritizedItem,
     ShortestProcessingTimePrioritizer,
@@ -45,3 +47,56 @@ def test_earliest_due_date_prioritizer():
     prioritizer.prioritize(item2)
 
     assert item1.priority < item2.priority
+
+
+def operation_due(due_date, hours):
+    router = Mock(operations={})
+    operation = Mock(
+        router=router, sequence_number=10, wall_clock_hours=hours, due_date=due_date
+    )
+    router.operations[10] = operation
+    return operation
+
+
+def test_critical_ratio_prioritizer_changes_order_over_time():
+    short = operation_due(due_date=10, hours=1)
+    long = operation_due(due_date=20, hours=4)
+
+    prioritizer = CriticalRatioPrioritizer()
+    assert prioritizer.priority_at(long, 0) < prioritizer.priority_at(short, 0)
+    assert prioritizer.priority_at(short, 9) < prioritizer.priority_at(long, 9)
+
+
+def test_critical_ratio_prioritizer_keeps_remaining_work():
+    operation = operation_due(due_date=10, hours=2)
+    item = PrioritizedItem(-1, operation)
+
+    prioritizer = CriticalRatioPrioritizer()
+    prioritizer.prioritize(item)
+    operation.wall_clock_hours = 4
+    assert prioritizer.priority_at(operation, 0) == 5
+    # prioritizing again, as when an item's data changes, evaluates it afresh
+    prioritizer.prioritize(item)
+    assert item.priority == 2.5
+    prioritizer.forget(operation)
+    assert not prioritizer._remaining
+
+
+def test_least_slack_prioritizer():
+    urgent = PrioritizedItem(-1, operation_due(due_date=10, hours=3))
+    relaxed = PrioritizedItem(-1, operation_due(due_date=12, hours=1))
+
+    prioritizer = LeastSlackPrioritizer()
+    prioritizer.prioritize(urgent)
+    prioritizer.prioritize(relaxed)
+
+    assert urgent.priority == 7
+    assert urgent.priority < relaxed.priority
+
+
+def test_prioritizers_declare_due_date_use():
+    assert EarliestDueDatePrioritizier.uses_due_date
+    assert CriticalRatioPrioritizer.uses_due_date
+    assert LeastSlackPrioritizer.uses_due_date
+    assert not FifoPrioritizer.uses_due_date
+    assert not ShortestProcessingTimePrioritizer.uses_due_date
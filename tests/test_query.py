@@ -0,0 +1,78 @@
+import pytest
+
+from shop_forecasting.query import EventIndex
+from shop_forecasting.sinks import BinaryEventSink, MappedBinaryLog, read_binary
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import ColumnarEventLogger, EventLogger
+
+SHOP_ARGS = dict(seed=6, num_work_centers=4, num_routers=30)
+
+
+def _run(logger):
+    factory = generate_shop(logger=logger, **SHOP_ARGS)
+    factory.release()
+    factory.run()
+    return logger
+
+
+def _scan(records, start, end, **matches):
+    matching = [
+        record
+        for record in records
+        if start <= record.timestamp < end
+        and all(getattr(record, name) == value for name, value in matches.items())
+    ]
+    return sorted(matching, key=lambda record: record.timestamp)
+
+
+def _check(index, records):
+    assert len(index) == len(records)
+    assert index.between(10, 20) == _scan(records, 10, 20)
+    assert index.order(7) == _scan(records, 0, float("inf"), order_number=7)
+    assert index.work_center("wc2", 5, 30) == _scan(records, 5, 30, work_center="wc2")
+    assert index.work_center(
+        "wc1", event=EventLogger.OPERATION_STARTED
+    ) == _scan(records, 0, float("inf"), work_center="wc1", event="operation_started")
+    assert index.of_type(EventLogger.ROUTER_COMPLETED, 0, 50) == _scan(
+        records, 0, 50, event="router_completed"
+    )
+    assert sorted(index.order_numbers) == list(range(30))
+    assert index.order(1000) == []
+
+
+def test_index_built_during_and_after_run():
+    incremental = _run(EventIndex())
+    columnar = _run(ColumnarEventLogger())
+    records = list(columnar.events)
+    assert incremental.events == records
+    _check(incremental, records)
+    _check(EventIndex(columnar.events), records)
+    _check(EventIndex.from_logger(columnar), records)
+    _check(EventIndex.from_logger(_run(EventLogger())), records)
+
+    shipped = _scan(records, 0, float("inf"), order_number=3, event="router_completed")
+    assert incremental.completion(3) == shipped[0].timestamp
+    assert incremental.completion(1000) is None
+
+
+def test_index_over_memory_mapped_log(tmp_path):
+    path = str(tmp_path / "events.log")
+    for _ in range(2):
+        with BinaryEventSink(path) as sink:
+            _run(sink)
+    records = list(read_binary(path))
+
+    with EventIndex.open_binary(path) as index:
+        # the second run starts the clock over
+        _check(index, records)
+        assert index.completion(3) == _run(EventIndex()).completion(3)
+
+    with MappedBinaryLog(path) as log:
+        assert log[-1] == records[-1]
+        assert log[5:8] == records[5:8]
+        with pytest.raises(IndexError):
+            log[len(records)]
+
+    open(str(tmp_path / "empty.log"), "wb").close()
+    with EventIndex.open_binary(str(tmp_path / "empty.log")) as index:
+        assert index.between() == []
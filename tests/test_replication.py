@@ -0,0 +1,81 @@
+import pickle
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.replication import (
+    RelativeTriangular,
+    Uniform,
+    replicate,
+    replication_rng,
+    sample_hours,
+)
+
+
+def build_shop() -> Factory:
+    factory = Factory()
+    saw = WorkCenter(name="saw", prioritizer=FifoPrioritizer(), factory=factory)
+    lathe = WorkCenter(name="lathe", prioritizer=FifoPrioritizer(), factory=factory)
+    for order_number in [1000, 2000, 3000]:
+        router = Router(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        router.operations = {
+            10: RouterOperation(saw, router, 10, hours=1),
+            20: RouterOperation(lathe, router, 20, hours=2),
+        }
+    return factory
+
+
+def test_replicate_fixed_hours_is_exact():
+    result = replicate(build_shop(), replications=4, max_workers=2, chunksize=1)
+    assert result.orders[1000].quantile(0.5) == 3
+    assert result.orders[3000].quantile(0.9) == 7
+    assert result.orders[3000].completion.std_dev == 0
+
+
+def test_replicate_is_reproducible_across_worker_counts():
+    durations = {(2000, 20): Uniform(1, 10)}
+    runs = [
+        replicate(
+            build_shop(),
+            replications=40,
+            durations=durations,
+            default=RelativeTriangular(),
+            base_seed=7,
+            max_workers=workers,
+            chunksize=3,
+        )
+        for workers in [1, 3]
+    ]
+    first, second = [
+        {
+            order: (forecast.completion.mean, forecast.quantile(0.9))
+            for order, forecast in run.orders.items()
+        }
+        for run in runs
+    ]
+    assert first == second
+    assert runs[0].orders[2000].completion.count == 40
+    assert runs[0].orders[2000].completion.std_dev > 0
+
+
+def test_sample_hours_uses_default_and_overrides():
+    factory = build_shop()
+    original = pickle.loads(pickle.dumps(factory))
+    sample_hours(factory, replication_rng(0, 0), {(1000, 10): Uniform(5, 6)})
+
+    hours = {
+        (router.order_number, seq): op.hours
+        for router in factory.routers
+        for seq, op in router.operations.items()
+    }
+    assert 5 <= hours[(1000, 10)] <= 6
+    assert hours[(2000, 10)] == original.routers[1].operations[10].hours
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import pytest
+
+from shop_forecasting.planning_objects import Factory, WorkCenter
+from shop_forecasting.prioritizers import (
+    CriticalRatioPrioritizer,
+    EarliestDueDatePrioritizier,
+    FifoPrioritizer,
+)
+from shop_forecasting.service import ForecastService, start_unix_server
+
+
+def build_service() -> ForecastService:
+    factory = Factory()
+    WorkCenter("saw", FifoPrioritizer(), factory)
+    WorkCenter("lathe", EarliestDueDatePrioritizier(), factory)
+    factory.release()
+    return ForecastService(factory)
+
+
+def release(service, order_number, saw_hours, lathe_hours, due_date=0.0):
+    service.release(
+        order_number,
+        [
+            {"sequence_number": 10, "work_center": "saw", "hours": saw_hours},
+            {
+                "sequence_number": 20,
+                "work_center": "lathe",
+                "hours": lathe_hours,
+                "due_date": due_date,
+            },
+        ],
+    )
+
+
+def test_forecast_follows_updates():
+    async def scenario():
+        service = build_service()
+        release(service, 1, 2, 3)
+        assert await service.completion(1) == 5
+
+        # reported done an hour early
+        service.complete(1, 10, timestamp=1)
+        assert service.factory.elapsed_hours == 1
+        assert await service.completion(1) == 4
+
+        service.advance(until_hours=4)
+        assert await service.completion(1) == 4
+        assert service.factory.logger.completions == {1: 4}
+
+    asyncio.run(scenario())
+
+
+def test_due_date_changes_reprioritize_queued_operations():
+    async def scenario():
+        service = build_service()
+        # order 1 holds the lathe while orders 2 and 3 queue up behind it
+        release(service, 1, 0, 10)
+        release(service, 2, 1, 1, due_date=5)
+        release(service, 3, 1, 1, due_date=9)
+        service.advance(until_hours=3)
+        assert await service.completion(2) < await service.completion(3)
+
+        service.set_due_date(3, 1)
+        assert await service.completion(3) < await service.completion(2)
+
+    asyncio.run(scenario())
+
+
+def test_updates_during_forecast_are_coalesced():
+    async def scenario():
+        service = build_service()
+        for order_number in range(10):
+            release(service, order_number, 1, 1)
+        assert await service.completion(9) == 11
+        return service.forecasts_run
+
+    # updates arriving before the forecast they started gets to run share it
+    assert asyncio.run(scenario()) == 1
+
+
+def test_complete_withdraws_queued_operations():
+    factory = Factory()
+    saw = WorkCenter("saw", CriticalRatioPrioritizer(), factory)
+    factory.release()
+    service = ForecastService(factory)
+    for order_number in (1, 2):
+        service.release(
+            order_number,
+            [{"sequence_number": 10, "work_center": "saw", "hours": 2, "due_date": 5}],
+        )
+    # order 2 waits behind order 1
+    service.complete(2, 10)
+    assert saw.queue.empty()
+    assert not saw.prioritizer._remaining
+
+
+def test_complete_rejects_operations_not_reached():
+    service = build_service()
+    release(service, 1, 2, 3)
+    with pytest.raises(ValueError):
+        service.complete(1, 20)
+
+
+def test_serve_newline_delimited_json(tmp_path):
+    async def scenario():
+        service = build_service()
+        path = str(tmp_path / "forecast.sock")
+        server = await start_unix_server(service, path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        messages = [
+            {
+                "type": "release",
+                "order_number": 7,
+                "operations": [
+                    {"sequence_number": 10, "work_center": "saw", "hours": 2}
+                ],
+            },
+            {"type": "query", "order_number": 7},
+            {"type": "launch"},
+        ]
+        replies = []
+        for message in messages:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    ack, forecast, error = asyncio.run(scenario())
+    assert ack == {"type": "ack", "version": 1}
+    assert forecast["completion_hours"] == 2
+    assert error["type"] == "error"
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.shifts import ShiftCalendar
+
+
+def test_finish_time_within_and_across_shifts():
+    # 06:00 to 14:00 on weekdays
+    calendar = ShiftCalendar.weekdays([(6, 14)])
+    assert calendar.finish_time(7, 2) == 9
+    assert calendar.finish_time(0, 8) == 14
+    # an hour left on Monday, seven more on Tuesday
+    assert calendar.finish_time(13, 8) == 24 + 13
+    # Friday afternoon to Monday morning
+    assert calendar.finish_time(4 * 24 + 12, 4) == 7 * 24 + 8
+    # a whole year of work
+    assert calendar.finish_time(0, 52 * 40) == 51 * 168 + 4 * 24 + 14
+
+
+def test_shifts_over_midnight_and_rates():
+    calendar = ShiftCalendar.weekdays([(22, 6, 0.5)], days=[0])
+    assert calendar.capacity_per_period == 4
+    assert calendar.finish_time(0, 2) == 26
+    with pytest.raises(ValueError):
+        ShiftCalendar([(0, 10), (5, 15)])
+
+
+def test_downtime_and_offset_match_stepping():
+    calendar = ShiftCalendar.weekdays(
+        [(6, 14), (22, 6, 0.5)],
+        downtime=[(30, 40), (35, 50), (200, 210)],
+        offset=13,
+    )
+
+    def rate(t):
+        if any(start <= t < end for start, end in [(30, 50), (200, 210)]):
+            return 0.0
+        day, hour = divmod((t + 13) % 168, 24)
+        if day < 5 and 6 <= hour < 14:
+            return 1.0
+        if (day < 5 and hour >= 22) or (0 < day <= 5 and hour < 6):
+            return 0.5
+        return 0.0
+
+    rng = random.Random(3)
+    for _ in range(20):
+        start = rng.randrange(1200) / 4
+        hours = rng.uniform(0.1, 30)
+        finish = calendar.finish_time(start, hours)
+        # integrate the rate at a resolution every breakpoint falls on
+        step = 0.25
+        t = start
+        worked = 0.0
+        while worked + rate(t) * step < hours - 1e-9:
+            worked += rate(t) * step
+            t += step
+        assert finish == pytest.approx(t + (hours - worked) / rate(t))
+
+
+def test_work_center_on_shifts():
+    factory = Factory()
+    saw = WorkCenter(
+        "saw",
+        FifoPrioritizer(),
+        factory,
+        shift_calendar=ShiftCalendar.weekdays([(8, 16)]),
+    )
+    router = Router({}, 10, factory)
+    router.operations = {
+        10: RouterOperation(saw, router, 10, 6),
+        20: RouterOperation(saw, router, 20, 6),
+    }
+    factory.release()
+    factory.run()
+    assert factory.elapsed_hours == 24 + 12
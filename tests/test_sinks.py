@@ -0,0 +1,80 @@
+import pytest
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.sinks import (
+    BinaryEventSink,
+    JsonLinesEventSink,
+    read_binary,
+    read_json_lines,
+)
+from shop_forecasting.util import ColumnarEventLogger
+
+sink_formats = [
+    (JsonLinesEventSink, read_json_lines),
+    (BinaryEventSink, read_binary),
+]
+
+
+def simulate(logger):
+    """Run a two router shop, logging through the given logger."""
+    factory = Factory(logger=logger)
+    saw = WorkCenter(name="saw", prioritizer=FifoPrioritizer(), factory=factory)
+    lathe = WorkCenter(name="lathe", prioritizer=FifoPrioritizer(), factory=factory)
+    for order_number in [1000, 2000]:
+        router = Router(
+            operations={},
+            current_sequence=10,
+            order_number=order_number,
+            factory=factory,
+        )
+        router.operations = {
+            10: RouterOperation(saw, router, 10, hours=1),
+            20: RouterOperation(lathe, router, 20, hours=2),
+        }
+        factory.enqueue_at_workcenter(router.current_operation)
+    while factory.complete_next():
+        pass
+
+
+@pytest.mark.parametrize("sink_type, reader", sink_formats)
+def test_sink_round_trip(tmp_path, sink_type, reader):
+    path = str(tmp_path / "events.log")
+    columnar = ColumnarEventLogger()
+    simulate(columnar)
+    with sink_type(path, batch_size=3) as sink:
+        simulate(sink)
+
+    assert list(reader(path)) == list(columnar.events)
+
+
+@pytest.mark.parametrize("sink_type, reader", sink_formats)
+def test_sink_appends_to_existing_log(tmp_path, sink_type, reader):
+    path = str(tmp_path / "events.log")
+    columnar = ColumnarEventLogger()
+    simulate(columnar)
+    for _ in range(2):
+        with sink_type(path) as sink:
+            simulate(sink)
+
+    assert list(reader(path)) == 2 * list(columnar.events)
+
+
+def test_sink_buffer_is_bounded(tmp_path):
+    sink = BinaryEventSink(str(tmp_path / "events.log"), batch_size=4)
+    buffer_sizes = []
+    original_flush = sink.flush
+
+    def flush():
+        buffer_sizes.append(len(sink._buffer))
+        original_flush()
+
+    sink.flush = flush
+    simulate(sink)
+    sink.close()
+    assert max(buffer_sizes) == 4
@@ -0,0 +1,42 @@
+import random
+import statistics
+
+import pytest
+
+from shop_forecasting.stats import P2Quantile, RunningStats
+
+
+def test_running_stats_matches_batch_statistics():
+    rng = random.Random(3)
+    values = [rng.gauss(10, 2) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    assert (stats.minimum, stats.maximum) == (min(values), max(values))
+
+
+def test_p2_quantile_is_exact_for_few_values():
+    estimator = P2Quantile(0.5)
+    for value in [3, 1, 2]:
+        estimator.add(value)
+    assert estimator.value == 2
+
+
+def test_p2_quantile_tracks_large_streams():
+    rng = random.Random(5)
+    values = [rng.expovariate(1) for _ in range(20000)]
+    estimator = P2Quantile(0.9)
+    for value in values:
+        estimator.add(value)
+
+    exact = sorted(values)[int(0.9 * len(values))]
+    assert estimator.value == pytest.approx(exact, rel=0.02)
+
+
+def test_p2_quantile_rejects_invalid_quantile():
+    with pytest.raises(ValueError):
+        P2Quantile(1.5)
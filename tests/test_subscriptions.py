@@ -0,0 +1,119 @@
+import pickle
+
+import pytest
+
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import CompletionLogger, EventLogger
+
+SHOP_ARGS = dict(seed=2, num_work_centers=3, num_routers=20)
+
+
+def _run(factory):
+    factory.release()
+    factory.run()
+    return factory
+
+
+def test_subscriptions_match_event_log():
+    factory = generate_shop(logger=EventLogger(), **SHOP_ARGS)
+    everything = []
+    started = []
+    factory.subscribe(lambda *event: everything.append(event))
+    factory.subscribe(
+        lambda *event: started.append(event), events=[EventLogger.OPERATION_STARTED]
+    )
+    _run(factory)
+
+    logged = [
+        (event["timestamp"], event["event"], event["planning_object"])
+        for event in factory.logger.events
+    ]
+    assert everything == logged
+    assert started == [e for e in logged if e[1] == EventLogger.OPERATION_STARTED]
+
+
+def test_filters_and_sampling():
+    factory = generate_shop(**SHOP_ARGS)
+    factory.logger = None
+    name = next(iter(factory.work_centers))
+    order_number = factory.routers[0].order_number
+    at_work_center = []
+    of_router = []
+    sampled = []
+    factory.subscribe(
+        lambda *event: at_work_center.append(event),
+        events=[EventLogger.OPERATION_COMPLETED],
+        work_centers=[name],
+    )
+    factory.subscribe(lambda *event: of_router.append(event), routers=[order_number])
+    factory.subscribe(
+        lambda *event: sampled.append(event),
+        events=[EventLogger.OPERATION_COMPLETED],
+        every=3,
+    )
+    _run(factory)
+
+    reference = _run(generate_shop(logger=EventLogger(), **SHOP_ARGS))
+    completed = [
+        event
+        for event in reference.logger.events
+        if event["event"] == EventLogger.OPERATION_COMPLETED
+    ]
+    assert len(at_work_center) == sum(
+        event["planning_object"].work_center.name == name for event in completed
+    )
+    assert [e[1] for e in sampled] == [e["event"] for e in completed[::3]]
+    assert [e[0] for e in sampled] == [e["timestamp"] for e in completed[::3]]
+    assert of_router[-1][1] == EventLogger.ROUTER_COMPLETED
+    assert of_router[-1][2] is factory.routers[0]
+    assert all(
+        getattr(e[2], "router", e[2]).order_number == order_number for e in of_router
+    )
+
+
+def test_unwanted_events_are_not_dispatched():
+    factory = generate_shop(logger=CompletionLogger(), **SHOP_ARGS)
+    assert factory._on_queued is None
+    assert factory._on_started is None
+    assert factory._on_completed is None
+
+    subscription = factory.subscribe(
+        lambda *event: None, events=[EventLogger.OPERATION_STARTED]
+    )
+    assert factory._on_started is subscription.handler
+    factory.unsubscribe(subscription)
+    assert factory._on_started is None
+
+    with pytest.raises(ValueError):
+        factory.subscribe(lambda *event: None, events=["paused"])
+    with pytest.raises(ValueError):
+        factory.subscribe(lambda *event: None, every=0)
+
+
+def test_logger_replacement_forks_and_pickles():
+    factory = generate_shop(logger=EventLogger(), **SHOP_ARGS)
+    seen = []
+    factory.subscribe(lambda *event: seen.append(event))
+    factory.logger = CompletionLogger()
+
+    fork = factory.fork(CompletionLogger())
+    assert fork._on_started is None
+    _run(fork)
+    assert seen == []
+    assert len(fork.logger.completions) == 20
+
+    copy = pickle.loads(pickle.dumps(generate_shop(logger=EventLogger(), **SHOP_ARGS)))
+    _run(copy)
+    assert copy.logger.events
+
+
+def test_assigning_a_logger_rewires_dispatch():
+    factory = generate_shop(**SHOP_ARGS)
+    factory.logger = None
+    factory.release()
+    factory.run(max_events=10)
+    factory.logger = logger = CompletionLogger()
+    factory.run()
+    assert len(logger.completions) == 20
+    factory.logger = None
+    assert factory._on_router_completed is None
@@ -0,0 +1,80 @@
+import pytest
+
+from shop_forecasting.planning_objects import DelayWorkCenter
+from shop_forecasting.prioritizers import FifoPrioritizer
+from shop_forecasting.sweep import Variant, apply_overrides, grid, sweep
+from shop_forecasting.synthetic import generate_shop
+
+
+def test_grid_combines_axes():
+    variants = grid(
+        {("*", "prioritizer"): ["fifo", "spt"], ("wc0", "num_slots"): [1, 2]}
+    )
+    assert len(variants) == 4
+    assert variants[1].name == "*.prioritizer=fifo,wc0.num_slots=2"
+    assert variants[1].overrides == {
+        "*": {"prioritizer": "fifo"},
+        "wc0": {"num_slots": 2},
+    }
+
+
+def test_apply_overrides():
+    factory = generate_shop(num_work_centers=2, num_routers=5)
+    apply_overrides(factory, {"*": {"prioritizer": "spt"}, "wc1": {"num_slots": 4}})
+    assert factory.work_centers["wc1"].available_slots == 4
+    with pytest.raises(ValueError):
+        apply_overrides(factory, {"wc0": {"color": "red"}})
+    with pytest.raises(ValueError):
+        apply_overrides(factory, {"nowhere": {"num_slots": 1}})
+
+
+def test_apply_overrides_to_delay_work_centers():
+    factory = generate_shop(num_work_centers=2, num_routers=5)
+    cure = DelayWorkCenter("cure", factory=factory)
+    apply_overrides(factory, {"*": {"num_slots": 3, "prioritizer": "spt"}})
+    assert factory.work_centers["wc0"].num_slots == 3
+    assert cure.num_slots == float("inf") and cure.prioritizer is None
+    with pytest.raises(ValueError):
+        apply_overrides(factory, {"cure": {"num_slots": 3}})
+    apply_overrides(factory, {"cure": {"time_passage_ratio": 0.5}})
+    assert cure.time_passage_ratio == 0.5
+
+
+def test_apply_overrides_retimes_compact_operations():
+    def makespan(overrides):
+        factory = generate_shop(
+            seed=2, num_work_centers=3, num_routers=30, compact=True
+        )
+        apply_overrides(factory, overrides)
+        factory.release()
+        return factory.run().elapsed_hours
+
+    as_built = makespan({})
+    assert makespan({"*": {"time_passage_ratio": 0.25}}) == pytest.approx(4 * as_built)
+    assert makespan({"wc0": {"time_passage_ratio": 0.5}}) > as_built
+
+
+def test_sweep_rows_follow_variants():
+    factory = generate_shop(seed=4, num_work_centers=3, num_routers=30)
+    variants = [
+        Variant("one slot", {"*": {"num_slots": 1}}),
+        Variant("fast", {"*": {"num_slots": 3, "prioritizer": FifoPrioritizer()}}),
+        Variant("as built"),
+    ]
+    result = sweep(factory, variants, max_workers=2)
+    assert [row["variant"] for row in result.rows] == ["one slot", "fast", "as built"]
+    assert all(row["orders_completed"] == 30 for row in result.rows)
+    assert result.best()["variant"] == "fast"
+    assert result.rows[0]["makespan"] > result.rows[1]["makespan"]
+
+
+def test_sweep_cancels_dominated_variants():
+    factory = generate_shop(seed=4, num_work_centers=3, num_routers=200)
+    variants = [
+        Variant("fast", {"*": {"num_slots": 5}}),
+        Variant("slow", {"*": {"num_slots": 1, "time_passage_ratio": 0.25}}),
+    ]
+    result = sweep(factory, variants, max_workers=1, prune_margin=0.1, check_every=64)
+    assert result.rows[0]["stop_reason"] == "exhausted"
+    assert result.rows[1]["stop_reason"] == "dominated"
+    assert result.rows[1]["orders_completed"] < 200
@@ -0,0 +1,35 @@
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.util import ColumnarEventLogger
+
+
+def simulate(**shop_args):
+    factory = generate_shop(logger=ColumnarEventLogger(), **shop_args)
+    factory.release()
+    factory.run()
+    return list(factory.logger.events)
+
+
+def test_generate_shop_is_seeded():
+    shop_args = dict(num_routers=30, prioritizer_mix={"fifo": 1, "spt": 1, "edd": 1})
+    assert simulate(seed=1, **shop_args) == simulate(seed=1, **shop_args)
+    assert simulate(seed=1, **shop_args) != simulate(seed=2, **shop_args)
+
+
+def test_generate_shop_shape():
+    factory = generate_shop(
+        num_work_centers=4, num_routers=20, operations_per_router=(3, 3), slots=(2, 2)
+    )
+    assert len(factory.work_centers) == 4
+    assert len(factory.routers) == 20
+    assert all(len(router.operations) == 3 for router in factory.routers)
+    assert all(wc.num_slots == 2 for wc in factory.work_centers.values())
+
+
+def test_generate_compact_shop_completes_every_router():
+    events = simulate(num_routers=25, compact=True)
+    assert sum(event.event == "router_completed" for event in events) == 25
+
+
+def test_generate_compact_shop_matches_object_shop():
+    shop_args = dict(num_routers=25, prioritizer_mix={"fifo": 1, "edd": 1, "cr": 1})
+    assert simulate(compact=True, **shop_args) == simulate(**shop_args)
@@ -0,0 +1,120 @@
+import pickle
+import pytest
+
+from shop_forecasting.planning_objects import (
+    Factory,
+    Router,
+    RouterOperation,
+    WorkCenter,
+)
+from shop_forecasting.prioritizers import (
+    EarliestDueDatePrioritizier,
+    FifoPrioritizer,
+    LeastSlackPrioritizer,
+)
+from shop_forecasting.templates import RoutingTemplate, share_routings
+from shop_forecasting.util import EventLogger, describe
+
+
+def _work_centers(factory):
+    saw = WorkCenter("saw", FifoPrioritizer(), factory, num_slots=2)
+    lathe = WorkCenter(
+        "lathe", EarliestDueDatePrioritizier(), factory, time_passage_ratio=2
+    )
+    mill = WorkCenter("mill", LeastSlackPrioritizer(), factory)
+    return saw, lathe, mill
+
+
+def _events(factory):
+    factory.release()
+    factory.run()
+    return [
+        (event["timestamp"], event["event"], describe(event["planning_object"]))
+        for event in factory.logger.events
+    ]
+
+
+def _orders(factory, saw, lathe, mill):
+    for order_number in range(12):
+        router = Router(
+            {}, 10, factory, item_number=order_number % 2, order_number=order_number
+        )
+        scale = 1 + order_number % 3
+        router.operations = {
+            10: RouterOperation(saw, router, 10, 1.5 * scale),
+            20: RouterOperation(lathe, router, 20, (2.0 + order_number % 2) * scale),
+            30: RouterOperation(mill, router, 30, 0.5 * scale),
+        }
+        for operation in router.operations.values():
+            operation.due_date = 20 - order_number
+
+
+def test_templated_orders_match_object_orders():
+    factory = Factory()
+    saw, lathe, mill = _work_centers(factory)
+    _orders(factory, saw, lathe, mill)
+
+    templated = Factory()
+    saw, lathe, mill = _work_centers(templated)
+    templates = {
+        item: RoutingTemplate(
+            item, {10: (saw, 1.5), 20: (lathe, 2.0 + item), 30: (mill, 0.5)}
+        )
+        for item in range(2)
+    }
+    for order_number in range(12):
+        templates[order_number % 2].create_router(
+            templated,
+            order_number,
+            quantity_scale=1 + order_number % 3,
+            due_date=20 - order_number,
+        )
+    assert _events(templated) == _events(factory)
+
+
+def test_share_routings_and_overrides():
+    factory = Factory()
+    saw, lathe, mill = _work_centers(factory)
+    _orders(factory, saw, lathe, mill)
+    factory.routers[4].operations[30].hours = 7.0
+    reference = factory.fork()
+    templates = share_routings(factory)
+    assert sorted(templates) == [0, 1]
+    assert all(
+        router.operations.template is templates[router.item_number]
+        for router in factory.routers
+    )
+    assert factory.routers[2].operations[20].hours == pytest.approx(6.0)
+    assert factory.routers[2].operations[20].due_date == 18
+    # orders whose hours are a multiple of the template's keep none of their own
+    assert factory.routers[2].operations.quantity_scale == 3
+    assert factory.routers[2].operations._hours is None
+    irregular = factory.routers[4].operations
+    assert irregular.quantity_scale == 1
+    assert irregular[10].hours == 3.0
+    assert irregular[30].hours == 7.0
+
+    # forks and pickles keep the template and the per-order hours
+    assert _events(pickle.loads(pickle.dumps(factory.fork()))) == _events(reference)
+    assert _events(factory) == _events(reference)
+
+
+def test_completed_hours_and_hour_changes():
+    factory = Factory(logger=EventLogger())
+    saw, lathe, mill = _work_centers(factory)
+    template = RoutingTemplate(7, {10: (saw, 4.0), 20: (lathe, 2.0)})
+    router = template.create_router(factory, 1, completed_hours={10: 3.0})
+    other = template.create_router(factory, 2, quantity_scale=0.5)
+    assert router.operations[10].hours == 1.0
+    assert other.operations[10].hours == 2.0
+    other.operations[20].hours = 10.0
+    assert other.operations[20].wall_clock_hours == 5.0
+    assert router.operations[20].hours == 2.0
+    assert router.operations[10] == router.operations[10]
+    assert router.operations[10] != other.operations[10]
+    with pytest.raises(AttributeError):
+        router.operations[10].due_date
+    # routers of one template share the sorted sequence index
+    router.reindex()
+    other.reindex()
+    assert router._sequences is other._sequences
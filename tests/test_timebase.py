@@ -0,0 +1,104 @@
+import pytest
+
+from shop_forecasting.synthetic import generate_shop
+from shop_forecasting.timebase import TimeBase
+from shop_forecasting.util import ColumnarEventLogger
+
+
+def quarter_hour_shop(**shop_args):
+    factory = generate_shop(
+        seed=3,
+        num_routers=40,
+        logger=ColumnarEventLogger(),
+        prioritizer_mix={"fifo": 1, "spt": 1, "edd": 1},
+        **shop_args
+    )
+    for router in factory.routers:
+        for operation in router.operations.values():
+            operation.hours = round(operation.hours * 4) / 4
+    return factory
+
+
+def test_time_base_rejects_bad_ticks():
+    with pytest.raises(ValueError):
+        TimeBase(0)
+    with pytest.raises(ValueError):
+        TimeBase(1.5)
+
+
+def test_time_base_conversions():
+    time_base = TimeBase(4)
+    assert time_base.to_ticks(1.1) == 4
+    assert time_base.to_ticks(1.2) == 5
+    assert time_base.ticks_until(1.2) == 4
+    assert TimeBase(100).ticks_until(1.15) == 115
+    assert time_base.to_hours(5) == 1.25
+
+
+def test_ticks_match_hours_on_the_tick_grid():
+    by_hours = quarter_hour_shop()
+    by_ticks = quarter_hour_shop(time_base=TimeBase(4))
+    for factory in (by_hours, by_ticks):
+        factory.release()
+        factory.run()
+    assert list(by_ticks.logger.events) == list(by_hours.logger.events)
+    assert by_ticks.elapsed_ticks == by_ticks.elapsed_hours * 4
+
+
+def test_durations_round_to_whole_ticks():
+    factory = generate_shop(
+        seed=1, num_routers=30, logger=ColumnarEventLogger(), time_base=TimeBase(60)
+    )
+    factory.release()
+    factory.run()
+    time_base = factory.time_base
+    assert all(
+        time_base.to_hours(time_base.to_ticks(event.timestamp)) == event.timestamp
+        for event in factory.logger.events
+    )
+    assert factory.elapsed_hours == factory.elapsed_ticks / 60
+
+
+def test_clock_does_not_drift():
+    factory = generate_shop(
+        num_work_centers=1,
+        num_routers=100000,
+        operations_per_router=(1, 1),
+        slots=(1, 1),
+        hours=(0.1, 0.1),
+        logger=None,
+        time_base=TimeBase(10),
+    )
+    factory.release()
+    factory.run()
+    assert factory.elapsed_ticks == 100000
+    assert factory.elapsed_hours == 10000.0
+
+
+def run_one_operation(hours, until_hours, time_base):
+    factory = generate_shop(
+        num_work_centers=1,
+        num_routers=1,
+        operations_per_router=(1, 1),
+        hours=(hours, hours),
+        logger=ColumnarEventLogger(),
+        time_base=time_base,
+    )
+    factory.release()
+    factory.run(until_hours=until_hours)
+    return factory
+
+
+def test_run_until_hours():
+    factory = quarter_hour_shop(time_base=TimeBase(4))
+    factory.release()
+    factory.run(until_hours=10.1)
+    assert factory.elapsed_ticks == 40
+    assert factory.elapsed_hours == 10.0
+    assert all(event.timestamp <= 10.0 for event in factory.logger.events)
+
+    # 1.15 * 100 falls just short of 115 ticks
+    by_ticks = run_one_operation(1.15, 1.15, TimeBase(100))
+    assert by_ticks.elapsed_ticks == 115
+    by_hours = run_one_operation(1.15, 1.15, None)
+    assert list(by_ticks.logger.events) == list(by_hours.logger.events)
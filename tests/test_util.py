@@ -0,0 +1,75 @@
+import csv
+from unittest.mock import Mock
+
+import pytest
+
+from shop_forecasting.util import ColumnarEventLogger, EventLogger, EventRecord
+
+router = Mock(order_number=1000, router=None)
+operation = Mock(router=router, sequence_number=20)
+operation.work_center.name = "machining"
+
+
+def test_columnar_logger_records_identifiers():
+    logger = ColumnarEventLogger(chunk_size=2)
+    logger.log_event(0.5, EventLogger.OPERATION_QUEUED, operation)
+    logger.log_event(1.0, EventLogger.OPERATION_STARTED, operation)
+    logger.log_event(2.0, EventLogger.ROUTER_COMPLETED, router)
+
+    assert len(logger.events) == 3
+    assert logger.events[0] == EventRecord(
+        0.5, EventLogger.OPERATION_QUEUED, 1000, 20, "machining"
+    )
+    assert logger.events[-1] == EventRecord(
+        2.0, EventLogger.ROUTER_COMPLETED, 1000, -1, None
+    )
+    assert [record.timestamp for record in logger.events] == [0.5, 1.0, 2.0]
+    # the operation is interned once no matter how often it is logged
+    assert len(logger.objects) == 2
+
+
+def test_event_records_support_mapping_access():
+    logger = ColumnarEventLogger()
+    logger.log_event(0.5, EventLogger.OPERATION_QUEUED, operation)
+    record = logger.events[0]
+    assert record["timestamp"] == 0.5
+    assert record["event"] == EventLogger.OPERATION_QUEUED
+    assert record["work_center"] == "machining"
+    assert record[0] == 0.5 and record[-1] == "machining"
+    assert record[1:3] == (EventLogger.OPERATION_QUEUED, 1000)
+    # planning objects are reduced to identifiers when logged
+    with pytest.raises(KeyError):
+        record["planning_object"]
+
+
+def test_columnar_logger_index_out_of_range():
+    logger = ColumnarEventLogger()
+    logger.log_event(0, EventLogger.OPERATION_QUEUED, operation)
+    with pytest.raises(IndexError):
+        logger.events[1]
+
+
+def test_columnar_logger_to_csv(tmp_path):
+    logger = ColumnarEventLogger()
+    logger.log_event(1.0, EventLogger.OPERATION_STARTED, operation)
+    logger.to_csv(tmp_path / "events.csv")
+
+    with open(tmp_path / "events.csv", newline="") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert rows == [
+        list(EventRecord._fields),
+        ["1.0", EventLogger.OPERATION_STARTED, "1000", "20", "machining"],
+    ]
+
+
+def test_columnar_logger_to_numpy():
+    np = pytest.importorskip("numpy")
+    logger = ColumnarEventLogger()
+    logger.log_event(1.0, EventLogger.OPERATION_STARTED, operation)
+    logger.log_event(2.0, EventLogger.ROUTER_COMPLETED, router)
+
+    exported = logger.to_numpy()
+    assert exported["timestamp"].tolist() == [1.0, 2.0]
+    assert exported["order_number"].tolist() == [1000, 1000]
+    assert exported["work_center"].tolist() == ["machining", ""]
+    assert np.array_equal(exported["event"], [1, 0])